@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
 
 from database import get_db
 from services.credit_service import CreditService
+from services.transaction_export_service import (
+    TransactionExportService, EXPORT_FORMATS, streaming_export_headers
+)
 from schemas.credits import (
     AddCreditsRequest, RemoveCreditsRequest, PauseCreditServiceRequest,
     ResumeCreditServiceRequest, DisputeResolutionRequest
@@ -176,6 +180,28 @@ async def admin_get_user_transactions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get transaction history: {str(e)}")
 
+@router.get("/transactions/export")
+async def admin_export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    user_id: Optional[int] = Query(None, description="Only export this user's transactions"),
+    transaction_type: Optional[str] = Query(None, description="Filter by transaction type"),
+    start_date: Optional[datetime] = Query(None, description="Export transactions from this date"),
+    end_date: Optional[datetime] = Query(None, description="Export transactions until this date"),
+    current_admin = Depends(get_current_admin)
+):
+    """Admin endpoint to stream credit transactions (all users or one) as CSV or NDJSON"""
+    return StreamingResponse(
+        TransactionExportService().stream(
+            format,
+            user_id=user_id,
+            transaction_type=transaction_type,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers=streaming_export_headers(format, user_id)
+    )
+
 @router.get("/user/{user_id}/summary")
 async def admin_get_user_summary(
     user_id: int,
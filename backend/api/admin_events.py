@@ -0,0 +1,67 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from api.auth import get_current_admin
+from config import config
+from services.event_bus import event_bus
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def _sse(item: dict) -> str:
+    return f"id: {item['id']}\nevent: {item['type']}\ndata: {json.dumps(item['data'])}\n\n"
+
+@router.get("/events")
+async def stream_admin_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Server-sent events with dashboard deltas: chat messages and sessions, change requests,
+    appointments and new mail (Admin only).
+
+    Load the lists once, then apply events. Reconnects send Last-Event-ID and
+    receive what they missed; a `resync` event means refetch the lists.
+    """
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    async def event_stream():
+        yield f"retry: {config.EVENT_STREAM_RETRY_MS}\n\n"
+        events = event_bus.subscribe(resume_from).__aiter__()
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while not await request.is_disconnected():
+                done, _ = await asyncio.wait({next_event}, timeout=config.EVENT_STREAM_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keepalive\n\n"  # Keeps proxies from closing an idle stream
+                    continue
+                yield _sse(next_event.result())
+                next_event = asyncio.ensure_future(events.__anext__())
+        finally:
+            # Cancelling the pending read runs the subscription's cleanup
+            next_event.cancel()
+            try:
+                await next_event
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/events/stats")
+async def get_event_bus_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Connected dashboards and published event counts for this worker (Admin only)"""
+    return {
+        "status": "success",
+        "events": event_bus.stats()
+    }
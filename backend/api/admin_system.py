@@ -0,0 +1,170 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse
+from api.auth import get_current_admin
+from config import config
+from core.request_metrics import route_metrics
+from database import get_db
+from database.engine import pool_stats
+from database.query_profiler import query_profiler
+from services.background_jobs import get_job_stats, retry_failed_jobs
+from services.chat_message_buffer import chat_message_buffer
+from services.customer_service import caller_cache
+from services.openai_service import prompt_usage
+from services.maintenance import maintenance_scheduler
+from services.password_hasher import get_hasher_stats
+from utils.idempotency import completed_responses
+
+router = APIRouter(prefix="/admin/system", tags=["admin"])
+metrics_router = APIRouter(tags=["metrics"])
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Connection pool telemetry per engine: size, overflow, waiters and checkout wait times (Admin only)"""
+    return {
+        "status": "success",
+        "pools": pool_stats()
+    }
+
+@router.get("/queries")
+async def get_query_profile(
+    order_by: str = Query("total_ms", pattern="^(total_ms|p95_ms|max_ms|mean_ms|count|errors)$"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Statement statistics grouped by normalized SQL fingerprint (Admin only)"""
+    return {
+        "status": "success",
+        "summary": query_profiler.summary(),
+        "queries": query_profiler.report(order_by=order_by, limit=limit)
+    }
+
+@router.post("/queries/reset")
+async def reset_query_profile(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Clear collected statement statistics (Admin only)"""
+    query_profiler.reset()
+    return {"status": "success", "message": "Query profile reset"}
+
+@router.get("/requests")
+async def get_request_metrics(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Per-route request latency, SQL statement counts and DB time (Admin only)"""
+    return {
+        "status": "success",
+        "budgets": {
+            "queries": config.REQUEST_QUERY_BUDGET,
+            "latency_ms": config.REQUEST_LATENCY_BUDGET_MS
+        },
+        "routes": route_metrics.summary()
+    }
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """bcrypt pool occupancy, queue wait distribution and rejections (Admin only)"""
+    return {
+        "status": "success",
+        "hasher": get_hasher_stats()
+    }
+
+@router.get("/caller-cache")
+async def get_caller_cache_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Voice agent caller cache size and hit rate for this worker (Admin only)"""
+    return {
+        "status": "success",
+        "cache": caller_cache.stats()
+    }
+
+@router.get("/idempotency-cache")
+async def get_idempotency_cache_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Completed idempotency responses cached for replays on this worker (Admin only)"""
+    return {
+        "status": "success",
+        "cache": completed_responses.stats()
+    }
+
+@router.get("/chat-buffer")
+async def get_chat_buffer_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Write-behind chat message buffer depth, batches and flush times for this worker (Admin only)"""
+    return {
+        "status": "success",
+        "buffer": chat_message_buffer.stats()
+    }
+
+@router.get("/openai-usage")
+async def get_openai_usage(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Prompt and completion tokens per OpenAI operation on this worker (Admin only)"""
+    return {
+        "status": "success",
+        "operations": prompt_usage.snapshot()
+    }
+
+@router.get("/jobs")
+async def get_background_job_stats(
+    current_user: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Background job queue depth and lag per job type, plus this worker's runner counters (Admin only)"""
+    return {
+        "status": "success",
+        **get_job_stats(db)
+    }
+
+@router.post("/jobs/retry")
+async def retry_failed_background_jobs(
+    current_user: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Re-queue background jobs that exhausted their attempts (Admin only)"""
+    requeued = retry_failed_jobs(db)
+    return {"status": "success", "requeued": requeued}
+
+@router.get("/maintenance")
+async def get_maintenance_stats(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Maintenance schedule, leadership and per-task duration and rows affected on this worker (Admin only)"""
+    return {
+        "status": "success",
+        "maintenance": maintenance_scheduler.stats()
+    }
+
+@router.post("/maintenance/{task_name}/run")
+def run_maintenance_task(
+    task_name: str,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Run one maintenance task now on this worker (Admin only)"""
+    # Plain def: FastAPI runs it in the threadpool, off the event loop
+    task = maintenance_scheduler.run_now(task_name)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown maintenance task: {task_name}")
+    return {
+        "status": "success",
+        "task": task
+    }
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text exposition of per-route request metrics (requires METRICS_TOKEN)"""
+    if not config.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {config.METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -2,17 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
-import openai
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 router = APIRouter()
 
-# Configure OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 class ProjectPlanRequest(BaseModel):
     project_title: str
     project_goals: Optional[str] = None
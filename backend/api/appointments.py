@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime, date, time, timedelta
 from database import get_db
+from database.postgresql import get_async_db
 from models import Appointment, User
-from services.appointment_service import AppointmentService
+from services.appointment_service import AppointmentService, day_slots, get_booked_times_async
 from services.google_calendar_service import google_calendar_service
-from services.email_service import email_service
+from services.background_jobs import enqueue_job
+from services.job_handlers import SEND_APPOINTMENT_CONFIRMATION, SEND_APPOINTMENT_UPDATE
 from api.auth import get_current_user
 from pydantic import BaseModel
 import logging
@@ -15,362 +18,18 @@ import logging
 router = APIRouter(prefix="/appointments")
 logger = logging.getLogger(__name__)
 
-async def send_appointment_confirmation_email(
-    customer_name: str,
-    customer_email: str,
-    appointment_date: date,
-    appointment_time: time,
-    duration_minutes: int,
-    meeting_type: str,
-    notes: Optional[str] = None,
-    calendar_link: Optional[str] = None
-):
-    """
-    Send appointment confirmation email to customer
-    """
-    try:
-        # Format the appointment details
-        formatted_date = appointment_date.strftime('%A, %B %d, %Y')
-        formatted_time = appointment_time.strftime('%I:%M %p')
-        meeting_type_display = meeting_type.replace('_', ' ').title()
-        
-        # Email subject
-        subject = f"Appointment Confirmation - {formatted_date} at {formatted_time}"
-        
-        # Email body (plain text)
-        body = f"""
-Dear {customer_name},
-
-Thank you for scheduling an appointment with StreamlineAI! We truly appreciate your business and look forward to working with you to streamline and automate your business processes.
-
-APPOINTMENT DETAILS:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📅 Date: {formatted_date}
-🕐 Time: {formatted_time}
-⏱️  Duration: {duration_minutes} minutes
-💻 Meeting Type: {meeting_type_display}
-{f'📝 Notes: {notes}' if notes else ''}
-
-WHAT TO EXPECT:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-During our consultation, we'll discuss:
-• Your current business processes and pain points
-• Automation opportunities tailored to your needs
-• Custom solutions to increase efficiency and productivity
-• Next steps for implementing streamlined workflows
-
-NEXT STEPS:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-1. Mark your calendar - We've included an "Add to Calendar" link below
-2. Prepare any questions about your business processes
-3. Have details about your current workflows ready to discuss
-
-{f'📅 ADD TO YOUR CALENDAR: {calendar_link}' if calendar_link else ''}
-
-We're excited to help transform your business operations and look forward to our upcoming meeting!
-
-If you need to reschedule or have any questions before our appointment, please don't hesitate to reach out.
-
-Best regards,
-The StreamlineAI Team
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-StreamlineAI - Automating Your Success
-🌐 Website: https://stream-lineai.com
-📧 Email: sales@stream-lineai.com
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-
-        # HTML email body
-        html_body = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f8fafc; margin: 0; padding: 20px; }}
-                .container {{ max-width: 650px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); overflow: hidden; }}
-                .header {{ background: linear-gradient(135deg, #00d4ff 0%, #0099cc 100%); color: white; padding: 30px; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
-                .content {{ padding: 40px 30px; }}
-                .greeting {{ font-size: 18px; color: #333; margin-bottom: 25px; line-height: 1.5; }}
-                .section {{ margin: 30px 0; }}
-                .section-title {{ font-size: 16px; font-weight: 600; color: #00d4ff; margin-bottom: 15px; border-bottom: 2px solid #00d4ff; padding-bottom: 5px; }}
-                .details-box {{ background: #f8fafc; border: 1px solid #e2e8f0; border-radius: 8px; padding: 20px; margin: 20px 0; }}
-                .detail-item {{ display: flex; align-items: center; margin: 10px 0; font-size: 15px; }}
-                .detail-icon {{ font-size: 18px; margin-right: 12px; min-width: 25px; }}
-                .detail-text {{ color: #4a5568; }}
-                .calendar-button {{ display: inline-block; background: #00d4ff; color: white; padding: 15px 25px; text-decoration: none; border-radius: 6px; font-weight: 600; margin: 20px 0; text-align: center; }}
-                .calendar-button:hover {{ background: #0099cc; }}
-                .expectations {{ background: #f0f9ff; border-left: 4px solid #00d4ff; padding: 20px; margin: 20px 0; }}
-                .expectations ul {{ margin: 10px 0; padding-left: 20px; }}
-                .expectations li {{ margin: 8px 0; color: #4a5568; }}
-                .footer {{ background: #f8fafc; padding: 25px 30px; text-align: center; border-top: 1px solid #e2e8f0; }}
-                .footer-links {{ margin: 15px 0; }}
-                .footer-links a {{ color: #00d4ff; text-decoration: none; margin: 0 10px; }}
-                .logo {{ font-size: 20px; font-weight: 700; color: #00d4ff; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🚀 Appointment Confirmed!</h1>
-                    <p>We're excited to help streamline your business</p>
-                </div>
-                
-                <div class="content">
-                    <div class="greeting">
-                        Dear <strong>{customer_name}</strong>,
-                        <br><br>
-                        Thank you for scheduling an appointment with <strong>StreamlineAI</strong>! We truly appreciate your business and look forward to working with you to transform and automate your business processes.
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">📅 Appointment Details</div>
-                        <div class="details-box">
-                            <div class="detail-item">
-                                <span class="detail-icon">📅</span>
-                                <span class="detail-text"><strong>Date:</strong> {formatted_date}</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">🕐</span>
-                                <span class="detail-text"><strong>Time:</strong> {formatted_time}</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">⏱️</span>
-                                <span class="detail-text"><strong>Duration:</strong> {duration_minutes} minutes</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">💻</span>
-                                <span class="detail-text"><strong>Meeting Type:</strong> {meeting_type_display}</span>
-                            </div>
-                            {f'<div class="detail-item"><span class="detail-icon">📝</span><span class="detail-text"><strong>Notes:</strong> {notes}</span></div>' if notes else ''}
-                        </div>
-                        
-                        {f'<div style="text-align: center;"><a href="{calendar_link}" class="calendar-button">📅 Add to Google Calendar</a></div>' if calendar_link else ''}
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">🎯 What to Expect</div>
-                        <div class="expectations">
-                            During our consultation, we'll discuss:
-                            <ul>
-                                <li>Your current business processes and pain points</li>
-                                <li>Automation opportunities tailored to your specific needs</li>
-                                <li>Custom solutions to increase efficiency and productivity</li>
-                                <li>Next steps for implementing streamlined workflows</li>
-                            </ul>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">✅ Next Steps</div>
-                        <div style="color: #4a5568; line-height: 1.6;">
-                            <strong>1.</strong> Mark your calendar using the button above<br>
-                            <strong>2.</strong> Prepare any questions about your business processes<br>
-                            <strong>3.</strong> Have details about your current workflows ready to discuss
-                        </div>
-                    </div>
-                    
-                    <div style="background: #f0f9ff; border: 1px solid #00d4ff; border-radius: 8px; padding: 20px; margin: 30px 0; text-align: center;">
-                        <p style="margin: 0; color: #0066cc; font-weight: 600;">
-                            We're excited to help transform your business operations!
-                        </p>
-                        <p style="margin: 10px 0 0 0; color: #4a5568;">
-                            If you need to reschedule or have questions, please contact us anytime.
-                        </p>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <div class="logo">StreamlineAI</div>
-                    <p style="margin: 5px 0; color: #718096; font-size: 14px;">Automating Your Success</p>
-                    <div class="footer-links">
-                        <a href="https://stream-lineai.com">🌐 Website</a>
-                        <a href="mailto:tech@stream-lineai.com">📧 Contact</a>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Send email
-        success = email_service.send_email(
-            from_account='no-reply',
-            to_emails=[customer_email],
-            subject=subject,
-            body=body,
-            html_body=html_body
-        )
-        
-        return success
-        
-    except Exception as e:
-        logger.error(f"Error sending appointment confirmation email: {str(e)}")
-        return False
-
-async def send_appointment_update_email(
-    customer_name: str,
-    customer_email: str,
-    appointment_date: date,
-    appointment_time: time,
-    duration_minutes: int,
-    meeting_type: str,
-    notes: Optional[str] = None,
-    calendar_link: Optional[str] = None
-):
-    """
-    Send appointment update notification email to customer
-    """
-    try:
-        # Format the appointment details
-        formatted_date = appointment_date.strftime('%A, %B %d, %Y')
-        formatted_time = appointment_time.strftime('%I:%M %p')
-        meeting_type_display = meeting_type.replace('_', ' ').title()
-        
-        # Email subject
-        subject = f"Appointment Updated - {formatted_date} at {formatted_time}"
-        
-        # Email body (plain text)
-        body = f"""
-Dear {customer_name},
-
-Your StreamlineAI appointment has been updated. Please review the new details below:
-
-UPDATED APPOINTMENT DETAILS:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📅 Date: {formatted_date}
-🕐 Time: {formatted_time}
-⏱️  Duration: {duration_minutes} minutes
-💻 Meeting Type: {meeting_type_display}
-{f'📝 Notes: {notes}' if notes else ''}
-
-{f'📅 ADD TO YOUR CALENDAR: {calendar_link}' if calendar_link else ''}
-
-We look forward to our upcoming meeting and appreciate your flexibility with this schedule change.
-
-If you have any questions or concerns about this update, please don't hesitate to contact us.
-
-Best regards,
-The StreamlineAI Team
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-StreamlineAI - Automating Your Success
-🌐 Website: https://stream-lineai.com
-📧 Email: sales@stream-lineai.com
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-
-        # HTML email body
-        html_body = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f8fafc; margin: 0; padding: 20px; }}
-                .container {{ max-width: 650px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); overflow: hidden; }}
-                .header {{ background: linear-gradient(135deg, #f39c12 0%, #e67e22 100%); color: white; padding: 30px; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
-                .content {{ padding: 40px 30px; }}
-                .greeting {{ font-size: 18px; color: #333; margin-bottom: 25px; line-height: 1.5; }}
-                .section {{ margin: 30px 0; }}
-                .section-title {{ font-size: 16px; font-weight: 600; color: #f39c12; margin-bottom: 15px; border-bottom: 2px solid #f39c12; padding-bottom: 5px; }}
-                .details-box {{ background: #fff5e6; border: 1px solid #f39c12; border-radius: 8px; padding: 20px; margin: 20px 0; }}
-                .detail-item {{ display: flex; align-items: center; margin: 10px 0; font-size: 15px; }}
-                .detail-icon {{ font-size: 18px; margin-right: 12px; min-width: 25px; }}
-                .detail-text {{ color: #4a5568; }}
-                .calendar-button {{ display: inline-block; background: #f39c12; color: white; padding: 15px 25px; text-decoration: none; border-radius: 6px; font-weight: 600; margin: 20px 0; text-align: center; }}
-                .calendar-button:hover {{ background: #e67e22; }}
-                .footer {{ background: #f8fafc; padding: 25px 30px; text-align: center; border-top: 1px solid #e2e8f0; }}
-                .footer-links {{ margin: 15px 0; }}
-                .footer-links a {{ color: #f39c12; text-decoration: none; margin: 0 10px; }}
-                .logo {{ font-size: 20px; font-weight: 700; color: #f39c12; }}
-                .update-notice {{ background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 20px; margin: 20px 0; text-align: center; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>📝 Appointment Updated</h1>
-                    <p>Your appointment details have been changed</p>
-                </div>
-                
-                <div class="content">
-                    <div class="greeting">
-                        Dear <strong>{customer_name}</strong>,
-                        <br><br>
-                        Your <strong>StreamlineAI</strong> appointment has been updated. Please review the new details below and update your calendar accordingly.
-                    </div>
-                    
-                    <div class="update-notice">
-                        <p style="margin: 0; color: #856404; font-weight: 600;">
-                            ⚠️ Please note the updated appointment details
-                        </p>
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">📅 Updated Appointment Details</div>
-                        <div class="details-box">
-                            <div class="detail-item">
-                                <span class="detail-icon">📅</span>
-                                <span class="detail-text"><strong>Date:</strong> {formatted_date}</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">🕐</span>
-                                <span class="detail-text"><strong>Time:</strong> {formatted_time}</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">⏱️</span>
-                                <span class="detail-text"><strong>Duration:</strong> {duration_minutes} minutes</span>
-                            </div>
-                            <div class="detail-item">
-                                <span class="detail-icon">💻</span>
-                                <span class="detail-text"><strong>Meeting Type:</strong> {meeting_type_display}</span>
-                            </div>
-                            {f'<div class="detail-item"><span class="detail-icon">📝</span><span class="detail-text"><strong>Notes:</strong> {notes}</span></div>' if notes else ''}
-                        </div>
-                        
-                        {f'<div style="text-align: center;"><a href="{calendar_link}" class="calendar-button">📅 Update Your Calendar</a></div>' if calendar_link else ''}
-                    </div>
-                    
-                    <div style="background: #f0f9ff; border: 1px solid #00d4ff; border-radius: 8px; padding: 20px; margin: 30px 0; text-align: center;">
-                        <p style="margin: 0; color: #0066cc; font-weight: 600;">
-                            Thank you for your flexibility with this schedule change!
-                        </p>
-                        <p style="margin: 10px 0 0 0; color: #4a5568;">
-                            If you have any questions or concerns about this update, please contact us anytime.
-                        </p>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <div class="logo">StreamlineAI</div>
-                    <p style="margin: 5px 0; color: #718096; font-size: 14px;">Automating Your Success</p>
-                    <div class="footer-links">
-                        <a href="https://stream-lineai.com">🌐 Website</a>
-                        <a href="mailto:tech@stream-lineai.com">📧 Contact</a>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Send email
-        success = email_service.send_email(
-            from_account='no-reply',
-            to_emails=[customer_email],
-            subject=subject,
-            body=body,
-            html_body=html_body
-        )
-        
-        return success
-        
-    except Exception as e:
-        logger.error(f"Error sending appointment update email: {str(e)}")
-        return False
-
+def _appointment_email_payload(appointment, customer, calendar_link: Optional[str]) -> dict:
+    """Job payload for the appointment emails (services.appointment_emails), with the date and time as ISO strings"""
+    return {
+        "customer_name": customer.name,
+        "customer_email": customer.email,
+        "appointment_date": appointment.scheduled_date.date().isoformat(),
+        "appointment_time": appointment.scheduled_date.time().isoformat(),
+        "duration_minutes": appointment.duration_minutes,
+        "meeting_type": appointment.appointment_type,
+        "notes": appointment.customer_notes,
+        "calendar_link": calendar_link
+    }
 
 
 # Pydantic models for API
@@ -501,12 +160,10 @@ async def get_smart_appointment_slots(
     preferred_date: str = None,
     duration_minutes: int = 30,
     days_ahead: int = 14,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get smart appointment recommendations with available dates and times"""
     try:
-        appointment_service = AppointmentService(db)
-        
         # If no preferred date, start from today
         if preferred_date:
             try:
@@ -521,9 +178,13 @@ async def get_smart_appointment_slots(
         recommended_times = []
         next_available = None
         
+        # One query for the whole window instead of one per day
+        window_start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        booked_times = await get_booked_times_async(db, window_start, window_start + timedelta(days=days_ahead))
+        
         for i in range(days_ahead):
             check_date = start_date + timedelta(days=i)
-            available_slots = appointment_service.get_available_slots(check_date, duration_minutes)
+            available_slots = [slot for slot in day_slots(check_date, duration_minutes) if slot not in booked_times]
             
             if available_slots:
                 # Format date info
@@ -879,24 +540,17 @@ async def create_appointment(
             logger.error(f"Error creating Google Calendar event: {str(calendar_error)}")
             # Don't fail the appointment creation if calendar sync fails
         
-        # Send appointment confirmation email
+        # Queue appointment confirmation email
         try:
             if customer.email:
-                await send_appointment_confirmation_email(
-                    customer_name=customer.name,
-                    customer_email=customer.email,
-                    appointment_date=appointment.scheduled_date.date(),
-                    appointment_time=appointment.scheduled_date.time(),
-                    duration_minutes=appointment.duration_minutes,
-                    meeting_type=appointment.appointment_type,
-                    notes=appointment.customer_notes,
-                    calendar_link=calendar_link
-                )
-                logger.info(f"Appointment confirmation email sent to {customer.email}")
+                enqueue_job(db, SEND_APPOINTMENT_CONFIRMATION, _appointment_email_payload(appointment, customer, calendar_link))
+                db.commit()
+                logger.info(f"Appointment confirmation email queued for {customer.email}")
             else:
                 logger.warning(f"No email address for customer {customer.name} - confirmation email not sent")
         except Exception as email_error:
-            logger.error(f"Error sending appointment confirmation email: {str(email_error)}")
+            db.rollback()
+            logger.error(f"Error queueing appointment confirmation email: {str(email_error)}")
             # Don't fail the appointment creation if email fails
         
         return {
@@ -1133,24 +787,17 @@ async def update_appointment(
             logger.error(f"Failed to update Google Calendar event for appointment {appointment.id}: {str(e)}")
             # Don't fail the appointment update if calendar fails
         
-        # Send update email notification
+        # Queue update email notification
         try:
             if customer and customer.email:
-                await send_appointment_update_email(
-                    customer_name=customer.name,
-                    customer_email=customer.email,
-                    appointment_date=appointment.scheduled_date.date(),
-                    appointment_time=appointment.scheduled_date.time(),
-                    duration_minutes=appointment.duration_minutes,
-                    meeting_type=appointment.appointment_type,
-                    notes=appointment.customer_notes,
-                    calendar_link=calendar_link
-                )
-                logger.info(f"Appointment update email sent to {customer.email}")
+                enqueue_job(db, SEND_APPOINTMENT_UPDATE, _appointment_email_payload(appointment, customer, calendar_link))
+                db.commit()
+                logger.info(f"Appointment update email queued for {customer.email}")
             else:
                 logger.warning(f"No email address for customer - notification email not sent")
         except Exception as email_error:
-            logger.error(f"Error sending appointment notification email: {str(email_error)}")
+            db.rollback()
+            logger.error(f"Error queueing appointment notification email: {str(email_error)}")
             # Don't fail the appointment update if email fails
         
         return {
@@ -1,8 +1,10 @@
 from fastapi import Depends, HTTPException, Header, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from services.auth_service import AuthService
+from database.postgresql import get_async_db
+from services.auth_service import AuthService, verify_token_async
 from typing import Optional
 
 from utils.cookies import AUTH_COOKIE_NAME
@@ -51,6 +53,23 @@ async def get_current_user(
     return user_data
 
 
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    creds: HTTPAuthorizationCredentials | None = Depends(security),
+):
+    """get_current_user on the AsyncSession (asyncpg) path - no blocking query on the event loop"""
+    token = _extract_token(request, creds)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated (no token)")
+
+    user_data = await verify_token_async(db, token)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    return user_data
+
+
 def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
     """Dependency that requires admin privileges"""
     # Check both is_admin property and user_type for compatibility
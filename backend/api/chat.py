@@ -2,11 +2,38 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
 from api.auth import get_current_admin
+from schemas.chat import ChatRequest, ChatResponse
+from services.background_jobs import enqueue_job
+from services.job_handlers import REFRESH_CHAT_SUMMARY
+from services.openai_service import SYSTEM_PROMPT, OpenAIService
 from services.session_service import SessionService
 from datetime import datetime
 
 router = APIRouter()
 
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+    """Reply to a website chat message.
+
+    The prompt is the session's rolling summary plus the messages it does not
+    cover yet; when enough have piled up, a summary refresh job is queued.
+    """
+    try:
+        session_service = SessionService(db)
+        session_service.add_message(request.session_id, request.message, is_bot=False)
+        
+        prompt = session_service.build_chat_prompt(request.session_id)
+        reply = await OpenAIService().generate_chat_response(prompt.messages, SYSTEM_PROMPT)
+        session_service.add_message(request.session_id, reply, is_bot=True)
+        
+        if prompt.summary_due:
+            enqueue_job(db, REFRESH_CHAT_SUMMARY, {"session_id": request.session_id})
+            db.commit()
+        
+        return ChatResponse(response=reply, session_id=request.session_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/sessions")
 async def get_chat_sessions(
     db: Session = Depends(get_db),
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from datetime import datetime
 import traceback
 
+from models.load_profiles import JOB_LIST_COLUMNS
+
 # Standard API Response Models
 class APIResponse(BaseModel):
     """Standard API response wrapper"""
@@ -294,6 +296,11 @@ def serialize_job(job) -> dict:
         "resources": getattr(job, 'resources', None)
     }
 
+def serialize_job_summary(job) -> dict:
+    """Convert a Job loaded with job_list_profile() to a dictionary for list views.
+    Only touches JOB_LIST_COLUMNS, so no deferred JSON columns are loaded."""
+    return {field: getattr(job, field) for field in JOB_LIST_COLUMNS}
+
 def serialize_time_entry(entry) -> dict:
     """Convert SQLAlchemy TimeEntry model to dictionary"""
     return {
@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
 from database import get_db
-from services.credit_service import CreditService
+from database.postgresql import get_async_db
+from services.credit_service import CreditService, get_user_balance_async
+from services.transaction_export_service import (
+    TransactionExportService, EXPORT_FORMATS, streaming_export_headers
+)
 from schemas.credits import (
     CreditBalance, CreditTransactionHistory, CreditTransaction,
     AddCreditsRequest, RemoveCreditsRequest
 )
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_async
 from core.exceptions import (
     InsufficientCreditsError, CreditServiceError, UserNotFoundError,
     InvalidAmountError, TransactionError
@@ -19,13 +25,12 @@ router = APIRouter(prefix="/credits", tags=["credits"])
 
 @router.get("/balance", response_model=CreditBalance)
 async def get_credit_balance(
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current credit balance for the authenticated user"""
     try:
-        credit_service = CreditService(db)
-        return credit_service.get_user_balance(current_user.id)
+        return await get_user_balance_async(db, current_user["user_id"])
     except UserNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -71,6 +76,27 @@ async def get_transaction_history(
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to get transaction history")
 
+@router.get("/transactions/export")
+async def export_transaction_history(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    transaction_type: Optional[str] = Query(None, description="Filter by transaction type"),
+    start_date: Optional[datetime] = Query(None, description="Export transactions from this date"),
+    end_date: Optional[datetime] = Query(None, description="Export transactions until this date"),
+    current_user = Depends(get_current_user)
+):
+    """Stream the authenticated user's full transaction history as CSV or NDJSON"""
+    return StreamingResponse(
+        TransactionExportService().stream(
+            format,
+            user_id=current_user["user_id"],
+            transaction_type=transaction_type,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers=streaming_export_headers(format, current_user["user_id"])
+    )
+
 @router.post("/purchase/validate")
 async def validate_credit_purchase(
     amount: int = Query(..., gt=0, description="Credits to purchase"),
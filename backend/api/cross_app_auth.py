@@ -3,13 +3,15 @@ Cross-App Authentication API endpoints for external application integration.
 """
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any
 import logging
 from datetime import datetime
 
 from database import get_db
-from services.cross_app_auth_service import CrossAppAuthService
-from services.cross_app_credit_service import CrossAppCreditService
+from database.postgresql import get_async_db
+from services.cross_app_auth_service import CrossAppAuthService, validate_cross_app_token_async
+from services.cross_app_credit_service import CrossAppCreditService, check_credit_balance_async
 from schemas.cross_app import (
     CrossAppAuthRequest, CrossAppAuthResponse, CrossAppTokenValidationRequest,
     CrossAppTokenValidationResponse, CrossAppTokenRefreshRequest, CrossAppTokenRefreshResponse,
@@ -51,7 +53,7 @@ async def authenticate_cross_app_user(
         user_agent = get_user_agent(req)
         
         # Authenticate user
-        result = cross_app_service.authenticate_cross_app_user(
+        result = await cross_app_service.authenticate_cross_app_user(
             app_id=request.app_id,
             email=request.email,
             password=request.password,
@@ -76,14 +78,13 @@ async def authenticate_cross_app_user(
 @router.post("/validate-token", response_model=CrossAppTokenValidationResponse)
 async def validate_cross_app_token(
     request: CrossAppTokenValidationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Validate a cross-app session token"""
     try:
-        cross_app_service = CrossAppAuthService(db)
-        
         # Validate token
-        user_data = cross_app_service.validate_cross_app_token(
+        user_data = await validate_cross_app_token_async(
+            db,
             session_token=request.session_token,
             app_id=request.app_id
         )
@@ -212,14 +213,13 @@ async def get_cross_app_user_info(
 @router.post("/credits/check", response_model=CrossAppCreditCheckResponse)
 async def check_cross_app_credits(
     request: CrossAppCreditCheckRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check user's credit balance and available packages"""
     try:
-        credit_service = CrossAppCreditService(db)
-        
         # Check credits
-        result = credit_service.check_credit_balance(
+        result = await check_credit_balance_async(
+            db,
             session_token=request.session_token,
             app_id=request.app_id,
             required_credits=request.required_credits
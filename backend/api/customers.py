@@ -8,6 +8,8 @@ from models import ChatSession, User as UserModel
 from services.customer_service import CustomerService
 from services.session_service import SessionService
 from services.email_service import email_service
+from services.background_jobs import enqueue_job
+from services.job_handlers import SEND_VERIFICATION_EMAIL
 from utils.file_management import CustomerFileManager
 from schemas.customer import CustomerCreate, CustomerUpdate, Customer
 from api.auth import get_current_admin, get_current_user
@@ -675,9 +677,8 @@ async def set_customer_password(
             raise HTTPException(status_code=404, detail="Customer not found")
         
         # Hash the password
-        from services.auth_service import AuthService
-        auth_service = AuthService(db)
-        hashed_password = auth_service.hash_password(password)
+        from services.password_hasher import hash_password_async
+        hashed_password = await hash_password_async(password)
         
         # Update customer with password
         customer.password_hash = hashed_password
@@ -778,18 +779,14 @@ async def customer_signup(
         # For now, we'll store it in a temporary way
         customer.verification_code = verification_code
         customer.verification_expires = datetime.utcnow() + timedelta(hours=24)
-        db.commit()
         
-        # Send verification email
-        try:
-            await email_service.send_verification_email(
-                to_email=customer.email,
-                customer_name=customer.name or "Customer",
-                verification_code=verification_code
-            )
-        except Exception as email_error:
-            print(f"⚠️ Warning: Failed to send verification email: {email_error}")
-            # Don't fail the signup if email fails
+        # Verification email is sent from the job queue after the commit
+        enqueue_job(db, SEND_VERIFICATION_EMAIL, {
+            "to_email": customer.email,
+            "customer_name": customer.name or "Customer",
+            "verification_code": verification_code
+        })
+        db.commit()
         
         return {
             "message": "Account created successfully. Please check your email for verification code.",
@@ -222,7 +222,7 @@ async def reset_password(request: PasswordResetConfirm, db: Session = Depends(ge
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters long")
     
     from models import User
-    from services.auth_service import AuthService
+    from services.password_hasher import hash_password_async
     
     try:
         # Update password using unified User model
@@ -231,8 +231,7 @@ async def reset_password(request: PasswordResetConfirm, db: Session = Depends(ge
             raise HTTPException(status_code=400, detail="User account not found")
         
         # Hash and update password
-        auth_service = AuthService(db)
-        user.password_hash = auth_service.hash_password(request.new_password)
+        user.password_hash = await hash_password_async(request.new_password)
         db.commit()
         
         # Mark token as used
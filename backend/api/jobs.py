@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
+from database.postgresql import get_async_db
 from models import Job, TimeEntry
 from services.job_service import JobService
-from api.auth import get_current_user, get_current_admin
+from api.auth import get_current_user_async, get_current_admin
 from typing import List, Optional
 from datetime import datetime, date
 from pydantic import BaseModel
 from schemas.jobs import JobCreate, JobUpdate
-from sqlalchemy import or_
+from sqlalchemy import select, func
+from services.search_service import match_clause
+from services.job_statistics_service import JobStatisticsService
 
 from api.common import (
     success_response, 
@@ -21,8 +25,10 @@ from api.common import (
     validate_pagination,
     get_standard_headers,
     serialize_job,
+    serialize_job_summary,
     serialize_time_entry
 )
+from models.load_profiles import job_list_profile
 
 router = APIRouter()
 
@@ -43,11 +49,12 @@ def get_jobs(
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
     status: Optional[str] = Query(None, description="Filter by job status"),
     priority: Optional[str] = Query(None, description="Filter by job priority"),
-    search: Optional[str] = Query(None, description="Search in title and description"),
+    search: Optional[str] = Query(None, description="Full-text search in title, description, business and notes"),
     sort_by: Optional[str] = Query("created_at", description="Sort field"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc/desc)"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date"),
+    view: str = Query("summary", description="Field set: 'summary' (list columns) or 'full' (every field)"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_admin)
 ):
@@ -79,12 +86,9 @@ def get_jobs(
         if end_date:
             query = query.filter(Job.deadline <= end_date)
         
-        # Apply search filter
-        if search:
-            search_filter = or_(
-                Job.title.ilike(f"%{search}%"),
-                Job.description.ilike(f"%{search}%")
-            )
+        # Apply full-text search filter (GIN-indexed search_vector)
+        search_filter = match_clause(Job, search)
+        if search_filter is not None:
             query = query.filter(search_filter)
         
         # Get total count for pagination
@@ -131,12 +135,15 @@ def get_jobs(
         offset = (page - 1) * page_size
         query = query.offset(offset).limit(page_size)
         
-        # Execute query
+        # Execute query - list view skips the heavy JSON columns unless asked for
+        if view != "full":
+            query = query.options(job_list_profile())
         jobs = query.all()
         
         # Convert SQLAlchemy models to dictionaries
         try:
-            jobs_data = [serialize_job(job) for job in jobs]
+            serializer = serialize_job if view == "full" else serialize_job_summary
+            jobs_data = [serializer(job) for job in jobs]
         except Exception as serialize_error:
             import traceback
             traceback.print_exc()
@@ -164,17 +171,18 @@ def get_jobs(
         )
 
 @router.get("/jobs/customer")
-def get_customer_jobs(
+async def get_customer_jobs(
     response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     status: Optional[str] = Query(None, description="Filter by job status"),
     priority: Optional[str] = Query(None, description="Filter by job priority"),
-    search: Optional[str] = Query(None, description="Search in title and description"),
+    search: Optional[str] = Query(None, description="Full-text search in title, description, business and notes"),
     sort_by: Optional[str] = Query("created_at", description="Sort field"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc/desc)"),
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    view: str = Query("summary", description="Field set: 'summary' (list columns) or 'full' (every field)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user_async)
 ):
     """Get jobs for the current customer with filtering, pagination, and sorting"""
     try:
@@ -195,7 +203,7 @@ def get_customer_jobs(
             sort_order = "desc"
         
         # Build base query for current customer
-        query = db.query(Job).filter(Job.customer_id == current_user.get('user_id'))
+        query = select(Job).filter(Job.customer_id == current_user.get('user_id'))
         
         # Apply filters directly
         if status:
@@ -203,16 +211,13 @@ def get_customer_jobs(
         if priority:
             query = query.filter(Job.priority == priority)
         
-        # Apply search filter
-        if search:
-            search_filter = or_(
-                Job.title.ilike(f"%{search}%"),
-                Job.description.ilike(f"%{search}%")
-            )
+        # Apply full-text search filter (GIN-indexed search_vector)
+        search_filter = match_clause(Job, search)
+        if search_filter is not None:
             query = query.filter(search_filter)
         
         # Get total count for pagination
-        total = query.count()
+        total = await db.scalar(query.with_only_columns(func.count(Job.id)))
         
         # Apply sorting directly
         if sort_by == "id":
@@ -255,11 +260,14 @@ def get_customer_jobs(
         offset = (page - 1) * page_size
         query = query.offset(offset).limit(page_size)
         
-        # Execute query
-        jobs = query.all()
+        # Execute query - list view skips the heavy JSON columns unless asked for
+        if view != "full":
+            query = query.options(job_list_profile())
+        jobs = (await db.scalars(query)).all()
         
         # Convert SQLAlchemy models to dictionaries
-        jobs_data = [serialize_job(job) for job in jobs]
+        serializer = serialize_job if view == "full" else serialize_job_summary
+        jobs_data = [serializer(job) for job in jobs]
         
         # Add standard headers
         response.headers.update(get_standard_headers())
@@ -283,6 +291,49 @@ def get_customer_jobs(
         )
 
 
+# Job Statistics Endpoint (registered before /jobs/{job_id} so "statistics" is not parsed as an ID)
+@router.get("/jobs/statistics")
+def get_job_statistics(
+    response: Response,
+    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    period: Optional[str] = Query("30", description="Period in days (7, 30, 90, 365)"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Get job statistics and analytics"""
+    try:
+        try:
+            days = int(period)
+        except (TypeError, ValueError):
+            days = 0
+        if days < 1:
+            raise APIError(
+                status_code=400,
+                error="Period must be a positive number of days",
+                error_code=ERROR_CODES["VALIDATION_ERROR"]
+            )
+        
+        # SQL aggregates over the daily rollup - no Job rows are loaded
+        statistics = JobStatisticsService(db).get_statistics(days, customer_id=customer_id)
+        
+        # Add standard headers
+        response.headers.update(get_standard_headers())
+        
+        return success_response(
+            data=statistics,
+            message="Job statistics retrieved successfully"
+        )
+        
+    except APIError:
+        raise
+    except Exception as e:
+        raise APIError(
+            status_code=500,
+            error=ERROR_MESSAGES["internal_error"],
+            error_code=ERROR_CODES["INTERNAL_ERROR"]
+        )
+
+
 @router.get("/jobs/{job_id}")
 def get_job(
     job_id: int,
@@ -751,93 +802,3 @@ def update_job_deliverable(
             error=ERROR_MESSAGES["internal_error"],
             error_code=ERROR_CODES["INTERNAL_ERROR"]
         )
-
-# Job Statistics Endpoint
-@router.get("/jobs/statistics")
-def get_job_statistics(
-    response: Response,
-    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
-    period: Optional[str] = Query("30", description="Period in days (7, 30, 90, 365)"),
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_admin)
-):
-    """Get job statistics and analytics"""
-    try:
-        from datetime import timedelta
-        
-        # Calculate date range
-        end_date = datetime.now()
-        days = int(period)
-        start_date = end_date - timedelta(days=days)
-        
-        # Build base query
-        query = db.query(Job).filter(Job.created_at >= start_date)
-        
-        if customer_id:
-            query = query.filter(Job.customer_id == customer_id)
-        
-        # Get all jobs in period
-        jobs = query.all()
-        
-        # Calculate statistics
-        total_jobs = len(jobs)
-        completed_jobs = len([j for j in jobs if j.status == "completed"])
-        in_progress_jobs = len([j for j in jobs if j.status == "in_progress"])
-        pending_jobs = len([j for j in jobs if j.status == "pending"])
-        
-        # Calculate financial statistics
-        total_estimated_hours = sum(j.estimated_hours or 0 for j in jobs)
-        total_actual_hours = sum(j.actual_hours or 0 for j in jobs)
-        total_fixed_price = sum(j.fixed_price or 0 for j in jobs)
-        
-        # Calculate priority distribution
-        priority_stats = {}
-        for job in jobs:
-            priority = job.priority or "medium"
-            priority_stats[priority] = priority_stats.get(priority, 0) + 1
-        
-        # Calculate industry distribution
-        industry_stats = {}
-        for job in jobs:
-            industry = job.industry or "Unknown"
-            industry_stats[industry] = industry_stats.get(industry, 0) + 1
-        
-        statistics = {
-            "period_days": days,
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "job_counts": {
-                "total": total_jobs,
-                "completed": completed_jobs,
-                "in_progress": in_progress_jobs,
-                "pending": pending_jobs
-            },
-            "completion_rate": (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
-            "financial": {
-                "total_estimated_hours": total_estimated_hours,
-                "total_actual_hours": total_actual_hours,
-                "total_fixed_price": total_fixed_price,
-                "hours_variance": total_actual_hours - total_estimated_hours
-            },
-            "priority_distribution": priority_stats,
-            "industry_distribution": industry_stats
-        }
-        
-        # Add standard headers
-        response.headers.update(get_standard_headers())
-        
-        return success_response(
-            data=statistics,
-            message="Job statistics retrieved successfully"
-        )
-        
-    except APIError:
-        raise
-    except Exception as e:
-        raise APIError(
-            status_code=500,
-            error=ERROR_MESSAGES["internal_error"],
-            error_code=ERROR_CODES["INTERNAL_ERROR"]
-        )
@@ -4,8 +4,11 @@ from sqlalchemy.orm import Session
 from database import get_db
 from services.auth_service import AuthService
 from services.admin_service import AdminService
+from services.password_hasher import hash_password_async
+from services.background_jobs import enqueue_job
+from services.job_handlers import SEND_VERIFICATION_EMAIL
 from models import Admin
-from api.auth import get_current_user, get_current_super_admin
+from api.auth import get_current_user, get_current_user_async, get_current_super_admin
 import logging
 import os
 
@@ -54,7 +57,7 @@ async def unified_login(request: LoginRequest, response: Response,
                         req: Request, db: Session = Depends(get_db)):
     auth_service = AuthService(db)
     logger.info(f"🔑 Login attempt for email: {request.email}")
-    user_data = auth_service.authenticate_user(request.email, request.password)
+    user_data = await auth_service.authenticate_user_async(request.email, request.password)
     
     if not user_data:
         logger.warning(f"❌ Login failed for email: {request.email}")
@@ -101,12 +104,9 @@ async def unified_login(request: LoginRequest, response: Response,
 async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """Register a new user account - sends verification email"""
     from models import User  # Use same import as other API files
-    from services.email_service import EmailService
     from datetime import datetime, timedelta, timezone
     import random
     
-    auth_service = AuthService(db)
-    email_service = EmailService(db_session=db)  # Pass db session for email account lookup
     logger.info(f"📝 Registration attempt for email: {request.email}")
     
     # Check if user already exists
@@ -120,7 +120,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="user_type must be 'customer' or 'admin'")
     
     # Hash password
-    password_hash = auth_service.hash_password(request.password)
+    password_hash = await hash_password_async(request.password)
     
     # Generate 6-digit verification code
     verification_code = str(random.randint(100000, 999999))
@@ -141,43 +141,20 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     
     try:
         db.add(new_user)
+        
+        # Verification email goes out from the job queue once the account is committed
+        # Get app name and verification URL from request, fallback to environment variables
+        enqueue_job(db, SEND_VERIFICATION_EMAIL, {
+            "to_email": request.email,
+            "customer_name": request.name,
+            "verification_code": verification_code,
+            "app_name": request.app_name or os.getenv('APP_NAME', 'StreamlineAI'),
+            "verification_url": request.verification_url or os.getenv('VERIFICATION_URL')
+        })
         db.commit()
         db.refresh(new_user)
         
-        # Send verification email (run in background to not block response)
-        try:
-            import asyncio
-            
-            # Get app name and verification URL from request, fallback to environment variables
-            app_name = request.app_name or os.getenv('APP_NAME', 'StreamlineAI')
-            verification_url = request.verification_url or os.getenv('VERIFICATION_URL')
-            
-            # Create a background task to send email
-            async def send_email_task():
-                try:
-                    # The send_verification_email is async and runs sync send_email in executor
-                    result = await email_service.send_verification_email(
-                        to_email=request.email,
-                        customer_name=request.name,
-                        verification_code=verification_code,
-                        app_name=app_name,
-                        verification_url=verification_url
-                    )
-                    if result:
-                        logger.info(f"✅ Verification email sent successfully to {request.email}")
-                    else:
-                        logger.warning(f"⚠️ Verification email send returned False for {request.email}")
-                except Exception as e:
-                    logger.error(f"❌ Error sending verification email to {request.email}: {str(e)}", exc_info=True)
-            
-            # Schedule email to be sent in background
-            asyncio.create_task(send_email_task())
-            logger.info(f"📧 Verification email task scheduled for {request.email}")
-        except Exception as email_error:
-            logger.error(f"⚠️ Failed to schedule verification email: {str(email_error)}", exc_info=True)
-            # Don't fail registration if email fails, but log it
-        
-        logger.info(f"✅ Registration successful for email: {request.email} (type: {request.user_type}) - verification email sent")
+        logger.info(f"✅ Registration successful for email: {request.email} (type: {request.user_type}) - verification email queued")
         
         return {
             "message": "Registration successful. Please check your email for verification code.",
@@ -216,7 +193,7 @@ async def verify_email(request: VerifyEmailRequest, db: Session = Depends(get_db
     
     # Check verification code
     if not hasattr(user, 'verification_code') or not user.verification_code:
-        raise HTTPException(status_code=400, detail="No verification code found. Please register again.")
+        raise HTTPException(status_code=400, detail="No valid verification code found. Please request a new one.")
     
     if user.verification_code != request.verification_code:
         logger.warning(f"❌ Invalid verification code for {request.email}")
@@ -269,7 +246,6 @@ async def verify_email(request: VerifyEmailRequest, db: Session = Depends(get_db
 async def resend_verification(request: ResendVerificationRequest, db: Session = Depends(get_db)):
     """Resend verification email"""
     from models import User
-    from services.email_service import EmailService
     from datetime import datetime, timedelta, timezone
     import random
     
@@ -294,22 +270,18 @@ async def resend_verification(request: ResendVerificationRequest, db: Session =
         if hasattr(user, 'verification_expires'):
             user.verification_expires = verification_expires
         
-        db.commit()
-        
-        # Send verification email
-        email_service = EmailService(db_session=db)
+        # Queue the verification email with the new code
         # Get app name and verification URL from request, fallback to environment variables
-        app_name = request.app_name or os.getenv('APP_NAME', 'StreamlineAI')
-        verification_url = request.verification_url or os.getenv('VERIFICATION_URL')
-        await email_service.send_verification_email(
-            to_email=user.email,
-            customer_name=user.name or "User",
-            verification_code=verification_code,
-            app_name=app_name,
-            verification_url=verification_url
-        )
+        enqueue_job(db, SEND_VERIFICATION_EMAIL, {
+            "to_email": user.email,
+            "customer_name": user.name or "User",
+            "verification_code": verification_code,
+            "app_name": request.app_name or os.getenv('APP_NAME', 'StreamlineAI'),
+            "verification_url": request.verification_url or os.getenv('VERIFICATION_URL')
+        })
+        db.commit()
         
-        logger.info(f"✅ Verification email resent to {request.email}")
+        logger.info(f"✅ Verification email queued for {request.email}")
         
         return {
             "message": "Verification email sent successfully. Please check your email."
@@ -328,7 +300,7 @@ async def logout(response: Response, req: Request):
     return {"message": "Logged out successfully"}
 
 @router.get("/me")
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
+async def get_current_user_info(current_user: dict = Depends(get_current_user_async)):
     """Get current user information"""
     return {
         "user": {
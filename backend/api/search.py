@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from database import get_db
+from api.auth import get_current_admin
+from services.search_service import SearchService, SEARCH_TYPES
+from typing import Optional
+import logging
+
+from api.common import success_response, get_standard_headers
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/search")
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (prefix matching)"),
+    types: Optional[str] = Query(None, description="Comma-separated types: jobs, customers, messages, change_requests"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Ranked full-text search across jobs, customers, chat messages and change requests (Admin only)"""
+    requested_types = None
+    if types:
+        requested_types = [t.strip() for t in types.split(",") if t.strip()]
+        invalid = [t for t in requested_types if t not in SEARCH_TYPES]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid search types: {', '.join(invalid)}. Allowed: {', '.join(SEARCH_TYPES)}"
+            )
+
+    try:
+        results = SearchService(db).search(q, types=requested_types, limit=limit)
+    except Exception as e:
+        logger.error(f"Search failed for '{q}': {str(e)}")
+        raise HTTPException(status_code=500, detail="Search failed")
+
+    response.headers.update(get_standard_headers())
+
+    return success_response(
+        data={
+            "query": q,
+            "results": results,
+            "total": len(results)
+        },
+        message="Search completed successfully"
+    )
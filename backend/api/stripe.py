@@ -5,10 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 import logging
-import stripe
 
 from database import get_db
 from services.stripe_service import StripeService
+from services.stripe_webhook_worker import get_queue_stats, retry_failed_events
+from services.stripe_client import get_stripe_metrics
+from api.auth import get_current_admin, get_current_user
 from models import User
 from schemas.stripe import (
     CheckoutSessionCreate, SubscriptionCreate, CustomerPortalResponse,
@@ -113,24 +115,97 @@ async def get_customer_portal_url(
         )
 
 
-@router.post("/webhook")
-async def stripe_webhook(
-    request: Request,
+# Billing reads for the signed-in customer, mounted like webhook_router
+billing_router = APIRouter(prefix="/stripe", tags=["stripe"])
+
+
+@billing_router.get("/customer-billing")
+async def get_customer_billing(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get customer billing information including invoices, subscriptions, and payment methods"""
+    try:
+        stripe_service = StripeService(db)
+        result = await stripe_service.get_customer_billing(current_user["user_id"])
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error getting customer billing: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get customer billing information"
+        )
+
+
+@billing_router.post("/customer-billing/refresh")
+async def refresh_customer_billing(
+    current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Handle Stripe webhook events"""
+    """Re-sync invoices and payment methods from Stripe, then return the billing information"""
     try:
         stripe_service = StripeService(db)
-        result = await stripe_service.process_webhook(request)
+        result = await stripe_service.get_customer_billing(current_user["user_id"], force_refresh=True)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error processing webhook: {str(e)}")
+        logger.error(f"Error refreshing customer billing: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to process webhook"
+            detail="Failed to refresh customer billing information"
+        )
+
+
+# Webhook ingestion is mounted on its own so it can be exposed without the rest of this router
+webhook_router = APIRouter(prefix="/stripe", tags=["stripe"])
+
+
+@webhook_router.post("/webhook")
+async def stripe_webhook(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Verify and queue a Stripe webhook event; processing happens in the webhook workers"""
+    payload = await request.body()
+    signature = request.headers.get("stripe-signature")
+    if not signature:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing Stripe-Signature header"
         )
+    
+    stripe_service = StripeService(db)
+    return await stripe_service.process_webhook(payload, signature)
+
+
+@webhook_router.get("/webhook/queue")
+async def stripe_webhook_queue_stats(
+    current_user: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Webhook queue depth, lag and worker throughput (Admin only)"""
+    return get_queue_stats(db)
+
+
+@webhook_router.post("/webhook/queue/retry")
+async def retry_failed_stripe_webhooks(
+    current_user: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Re-queue webhook events that exhausted their attempts (Admin only)"""
+    requeued = retry_failed_events(db)
+    return {"status": "success", "requeued": requeued}
+
+
+@webhook_router.get("/metrics")
+async def stripe_client_metrics(
+    current_user: dict = Depends(get_current_admin)
+):
+    """Stripe SDK call latency histograms and circuit breaker state (Admin only)"""
+    return get_stripe_metrics()
 
 
 @router.get("/products")
@@ -211,7 +286,8 @@ async def process_refund(
         result = await stripe_service.process_refund(
             payment_intent_id=refund_data.get('payment_intent_id'),
             reason=refund_data.get('reason', 'requested_by_customer'),
-            amount=refund_data.get('amount')  # Optional, full refund if not specified
+            amount=refund_data.get('amount'),  # Optional, full refund if not specified
+            request_id=refund_data.get('request_id')  # Optional, makes retries of this refund safe
         )
         
         return result
@@ -224,26 +300,6 @@ async def process_refund(
         )
 
 
-@router.get("/customer-billing")
-async def get_customer_billing(
-    current_user: User = Depends(lambda: User(id=1, email="test@example.com", user_type="customer")),  # Temporary mock
-    db: Session = Depends(get_db)
-):
-    """Get customer billing information including invoices, subscriptions, and payment methods"""
-    try:
-        stripe_service = StripeService(db)
-        result = await stripe_service.get_customer_billing(current_user.id)
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error getting customer billing: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get customer billing information"
-        )
-
-
 @router.get("/invoices/{invoice_id}/download")
 async def download_invoice(
     invoice_id: str,
@@ -5,14 +5,20 @@ from pydantic import BaseModel
 from typing import Optional, List, Literal, Dict, Any
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import re, logging, asyncio
+import re, logging
 
-from services.change_request_notifications import send_change_request_notification
+from services.background_jobs import enqueue_job
+from services.job_handlers import SEND_CHANGE_REQUEST_NOTIFICATION
 from database import get_db
 from services.customer_service import CustomerService
 from services.appointment_service import AppointmentService
-from services.job_service import ChangeRequestService, JobService                    # <-- make sure this import path matches your project
+from services.job_service import ChangeRequestService                    # <-- make sure this import path matches your project
+from services.voice_context import (
+    OPEN_CHANGE_REQUEST_STATUSES, VoiceContext, cached_voice_context, get_voice_context
+)
 from utils.appointment_helpers import create_appointment_with_notifications
+from utils.phone import normalize_phone
+from utils.speech_parsing import extract_date, extract_time, parse_time_value
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/voice", tags=["voice-agent"])
@@ -25,33 +31,14 @@ def lower(s: Optional[str]) -> Optional[str]:
     return (s or "").strip().lower() or None
 
 def parse_date(s: Optional[str]) -> Optional[str]:
-    if not s: return None
-    s = s.strip().lower()
-    now = datetime.now()
-    if s == "today": return now.strftime("%Y-%m-%d")
-    if s == "tomorrow": return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", s): return s
-    m = re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{4})", s)
-    if m:
-        mm, dd, yy = m.groups()
-        return f"{yy}-{int(mm):02d}-{int(dd):02d}"
-    return None
+    # ISO, 9/30/2025 and spoken forms ("today", "next tuesday", "in two weeks")
+    return extract_date(s) if s else None
 
 def parse_time(s: Optional[str]) -> Optional[str]:
-    if not s: return None
-    t = s.strip().lower()
-    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)", t)
-    if m:
-        h = int(m.group(1)); mn = int(m.group(2) or 0); ap = m.group(3)
-        if ap == "pm" and h != 12: h += 12
-        if ap == "am" and h == 12: h = 0
-        return f"{h:02d}:{mn:02d}:00"
-    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?", t)
-    if m:
-        h = int(m.group(1)); mn = int(m.group(2) or 0)
-        if 0 <= h <= 23 and 0 <= mn <= 59:
-            return f"{h:02d}:{mn:02d}:00"
-    return None
+    t = parse_time_value(s)
+    if t: return t
+    spoken = extract_time(s) if s else None  # "3 p.m.", "ten in the morning", "noon"
+    return f"{spoken}:00" if spoken else None
 
 def pretty(dt_date: str, dt_time: Optional[str]) -> str:
     y, m, d = [int(x) for x in dt_date.split("-")]
@@ -116,6 +103,9 @@ class AgentResponse(BaseModel):
     error: Optional[str] = None
 
 # ---------- shared customers ----------
+# Turns of one call share a context bundle (customer, upcoming appointments,
+# active jobs, open change requests) cached by session_id; see services.voice_context.
+# Committed writes drop it, so the next turn reloads.
 def find_customer_only(db: Session, name: Optional[str], email: Optional[str], phone: Optional[str]):
     cs = CustomerService(db)
     if email:
@@ -141,23 +131,36 @@ def find_or_create_customer(db: Session, name, email, phone, company, notes):
         business_type=company, notes=notes, status="lead"
     ))
 
+def customer_context(db: Session, req: "AgentRequest", name, email, phone, create: bool = False) -> Optional[VoiceContext]:
+    """The call's context bundle; the first turn resolves (or creates) the customer and loads it"""
+    context = cached_voice_context(req.session_id)
+    if context:
+        return context
+    if create:
+        c = find_or_create_customer(db, name, email, phone, req.company, req.notes)
+    else:
+        c = find_customer_only(db, name, email, phone)
+    if not c:
+        return None
+    return get_voice_context(db, req.session_id, c.id)
+
 # ---------- main endpoint ----------
 @router.post("/agent", response_model=AgentResponse)
 async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authorization: Optional[str] = Header(default=None)):
     # if authorization != "Bearer YOUR_SECRET": raise HTTPException(401, "Unauthorized")
     name = (req.name or "").strip() or None
     email = lower(req.email)
-    phone = digits_only(req.phone)
+    phone = normalize_phone(req.phone) or digits_only(req.phone)
 
     # --- customers & appointments (existing cases) ---
     if req.intent == "find_or_create_customer":
-        c = find_or_create_customer(db, name, email, phone, req.company, req.notes)
+        c = customer_context(db, req, name, email, phone, create=True).customer
         who = c.name or "your profile"
         return AgentResponse(speak=f"Great, I found {who}. Would you like to book a time?",
                              customer={"id": c.id, "name": c.name, "email": c.email, "phone": c.phone})
 
     if req.intent == "schedule_appointment":
-        c = find_or_create_customer(db, name, email, phone, req.company, req.notes)
+        c = customer_context(db, req, name, email, phone, create=True).customer
         appt_date = parse_date(req.preferred_date)
         appt_time = parse_time(req.preferred_time) or "10:00:00"
         if not appt_date:
@@ -198,9 +201,8 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
                                  customer={"id": c.id, "name": c.name}, alternatives=alts, error="conflict")
 
     if req.intent == "get_customer_appointments":
-        c = find_or_create_customer(db, name, email, phone, req.company, req.notes)
-        asvc = AppointmentService(db)
-        appts = [a for a in asvc.get_upcoming_appointments() if a.customer_id == c.id]
+        context = customer_context(db, req, name, email, phone, create=True)
+        c, appts = context.customer, context.appointments
         if not appts:
             return AgentResponse(speak="I don't see any upcoming appointments. Want to book one?",
                                  customer={"id": c.id, "name": c.name}, appointments=[])
@@ -249,10 +251,11 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
         return AgentResponse(speak=("Deleted your appointment for " + when) if ok else "I couldn't delete that appointment. Please try again.")
 
     if req.intent == "available_slots":
-        if not req.date:
+        target_date = parse_date(req.preferred_date or req.from_date)
+        if not target_date:
             raise HTTPException(status_code=400, detail="date is required")
         asvc = AppointmentService(db)
-        target = datetime.strptime(req.date, "%Y-%m-%d")
+        target = datetime.strptime(target_date, "%Y-%m-%d")
         slots = asvc.get_available_slots(target, req.duration_minutes or 30) or []
         human = [s.strftime("%I:%M %p") for s in slots]
         if not human:
@@ -262,15 +265,14 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
 
     # --- NEW: Jobs lookup ---
     if req.intent == "jobs_lookup":
-        c = find_customer_only(db, name, email, phone)
-        if not c:
+        context = customer_context(db, req, name, email, phone)
+        if not context:
             return AgentResponse(
                 speak="I couldn't find your record. What's the best email on the project?",
                 error="not_found"
             )
 
-        jsvc = JobService(db)
-        jobs = jsvc.get_active_jobs(c.id) or []
+        c, jobs = context.customer, context.jobs
         if not jobs:
             return AgentResponse(
                 speak=f"I don't see any active jobs for {c.name or 'your account'}."
@@ -287,22 +289,19 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
                 "id": j.id,
                 "title": j.title,
                 "status": j.status,
-                "priority": getattr(j, "priority", None),
-                # show "72%" or omit if None
-                "progress": (f"{int(getattr(j, 'progress_percentage', 0))}%"
-                            if getattr(j, "progress_percentage", None) is not None else None)
+                "priority": j.priority,
+                "progress": f"{j.progress_percentage}%" if j.progress_percentage is not None else None
             } for j in jobs],
             options=[j.title for j in tops] if len(jobs) > 1 else None
         )
 
     # --- NEW: Create change request ---
     if req.intent == "create_change_request":
-        c = find_customer_only(db, name, email, phone)
-        if not c:
+        context = customer_context(db, req, name, email, phone)
+        if not context:
             return AgentResponse(speak="I couldn't find your customer record. What's the best email to look up?", error="not_found")
 
-        jsvc = JobService(db)
-        jobs = jsvc.get_active_jobs(c.id) or []
+        c, jobs = context.customer, context.jobs
         if not jobs:
             return AgentResponse(speak="I don't see any active jobs on your account. Change requests are only for active projects.", error="no_active_jobs")
 
@@ -336,11 +335,9 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
             requested_via="voice",
             session_id=req.session_id
         )
-        # fire-and-forget notify
-        try:
-            asyncio.create_task(send_change_request_notification(cr, target, c))
-        except Exception:
-            logger.exception("notify change request failed")
+        # the tech team is notified from the job queue, off the turn's latency
+        enqueue_job(db, SEND_CHANGE_REQUEST_NOTIFICATION, {"change_request_id": cr.id})
+        db.commit()
 
         return AgentResponse(
             speak=f"Your change request '{req.change_title}' for '{target.title}' has been submitted. Our team will review and follow up.",
@@ -350,11 +347,15 @@ async def voice_agent(req: AgentRequest, db: Session = Depends(get_db), authoriz
 
     # --- NEW: List change requests ---
     if req.intent == "list_change_requests":
-        c = find_customer_only(db, name, email, phone)
-        if not c:
+        context = customer_context(db, req, name, email, phone)
+        if not context:
             return AgentResponse(speak="I couldn't find your record. What's the best email to look up?", error="not_found")
-        crsvc = ChangeRequestService(db)
-        reqs = crsvc.get_customer_change_requests(c.id) or []
+        if not req.status_filter or req.status_filter in OPEN_CHANGE_REQUEST_STATUSES:
+            reqs = context.change_requests
+        else:
+            # Closed requests aren't part of the call context
+            crsvc = ChangeRequestService(db)
+            reqs = crsvc.get_customer_change_requests(context.customer.id) or []
         if req.status_filter:
             reqs = [r for r in reqs if getattr(r, 'status', None) == req.status_filter]
         if not reqs:
@@ -34,15 +34,24 @@ class Config:
     DB_NAME = os.getenv("DB_NAME", "streamlineai")
     DB_USER = os.getenv("DB_USER", "streamlineai")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
+    DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() == "true"  # Dev only; schema changes go through Alembic
     
     # Security
     ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Changing this rehashes passwords on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # Queued hashes before 503
     
     # Stripe Configuration
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
     STRIPE_API_VERSION = os.getenv("STRIPE_API_VERSION", "2023-10-16")
+    STRIPE_WEBHOOK_WORKERS = int(os.getenv("STRIPE_WEBHOOK_WORKERS", "2"))  # 0 disables the in-process worker pool
+    STRIPE_WEBHOOK_MAX_ATTEMPTS = int(os.getenv("STRIPE_WEBHOOK_MAX_ATTEMPTS", "5"))
+    STRIPE_MAX_CONCURRENCY = int(os.getenv("STRIPE_MAX_CONCURRENCY", "8"))  # Threads available for blocking SDK calls
+    STRIPE_TIMEOUT_SECONDS = float(os.getenv("STRIPE_TIMEOUT_SECONDS", "15"))
+    STRIPE_IDEMPOTENCY_WINDOW_SECONDS = float(os.getenv("STRIPE_IDEMPOTENCY_WINDOW_SECONDS", "3600"))  # Identical writes inside one window replay the first
     
     # File Upload SDK Configuration
     UPLOAD_BASE_URL = os.getenv("UPLOAD_BASE_URL", "https://file-server.stream-lineai.com")
@@ -62,6 +71,53 @@ class Config:
     TECH_EMAIL = os.getenv("TECH_EMAIL")
     TECH_PASSWORD = os.getenv("TECH_PASSWORD")
     
+    # Request metrics
+    REQUEST_QUERY_BUDGET = int(os.getenv("REQUEST_QUERY_BUDGET", "25"))  # SQL statements per request before logging
+    REQUEST_LATENCY_BUDGET_MS = float(os.getenv("REQUEST_LATENCY_BUDGET_MS", "1000"))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Bearer token for /metrics; unset disables the endpoint
+    
+    # Voice agent
+    CALLER_CACHE_SIZE = int(os.getenv("CALLER_CACHE_SIZE", "2048"))  # Recent callers kept per worker
+    CALLER_CACHE_TTL_SECONDS = int(os.getenv("CALLER_CACHE_TTL_SECONDS", "900"))
+    VOICE_CONTEXT_CACHE_SIZE = int(os.getenv("VOICE_CONTEXT_CACHE_SIZE", "1024"))  # Concurrent calls kept per worker
+    VOICE_CONTEXT_TTL_SECONDS = int(os.getenv("VOICE_CONTEXT_TTL_SECONDS", "1800"))  # Upper bound on a call's length
+    
+    # Chat history
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "3000"))  # Prompt tokens spent on past messages
+    CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "100"))
+    CHAT_SUMMARY_EVERY_MESSAGES = int(os.getenv("CHAT_SUMMARY_EVERY_MESSAGES", "10"))  # New messages folded per summary update
+    CHAT_SUMMARY_KEEP_RECENT = int(os.getenv("CHAT_SUMMARY_KEEP_RECENT", "10"))  # Newest messages always sent verbatim
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+    CHAT_MESSAGE_FLUSH_INTERVAL_MS = float(os.getenv("CHAT_MESSAGE_FLUSH_INTERVAL_MS", "50"))  # 0 writes every message through
+    CHAT_MESSAGE_BATCH_SIZE = int(os.getenv("CHAT_MESSAGE_BATCH_SIZE", "500"))  # Flush early once this many are buffered
+    CHAT_MESSAGE_MAX_PENDING = int(os.getenv("CHAT_MESSAGE_MAX_PENDING", "5000"))  # Beyond this add_message flushes inline
+    
+    # Admin event stream
+    EVENT_BUS_REPLAY_SIZE = int(os.getenv("EVENT_BUS_REPLAY_SIZE", "500"))  # Recent events kept for Last-Event-ID resumes
+    EVENT_BUS_SUBSCRIBER_QUEUE = int(os.getenv("EVENT_BUS_SUBSCRIBER_QUEUE", "1000"))  # Backlog per dashboard before a resync
+    EVENT_STREAM_KEEPALIVE_SECONDS = float(os.getenv("EVENT_STREAM_KEEPALIVE_SECONDS", "15"))
+    EVENT_STREAM_RETRY_MS = int(os.getenv("EVENT_STREAM_RETRY_MS", "3000"))  # EventSource reconnect delay
+    
+    # Background jobs
+    JOB_RUNNER_ENABLED = os.getenv("JOB_RUNNER_ENABLED", "true").lower() == "true"  # false leaves jobs queued for other processes
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_DRAIN_TIMEOUT_SECONDS = float(os.getenv("JOB_DRAIN_TIMEOUT_SECONDS", "20"))  # Shutdown wait before running jobs are re-queued
+    
+    # Idempotency keys
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT_SECONDS", "300"))  # In-progress claims older than this can be taken over
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))  # Completed responses kept per worker for replays
+    IDEMPOTENCY_CACHE_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_CACHE_TTL_SECONDS", "600"))
+    
+    # Scheduled maintenance (one leader across processes)
+    MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "true").lower() == "true"
+    MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "1000"))  # Rows per committed batch
+    MAINTENANCE_MAX_BATCHES = int(os.getenv("MAINTENANCE_MAX_BATCHES", "50"))  # Per task run; the rest waits for the next run
+    STRIPE_WEBHOOK_RETENTION_DAYS = int(os.getenv("STRIPE_WEBHOOK_RETENTION_DAYS", "90"))  # Processed events older than this are deleted
+    JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "14"))  # Succeeded background jobs older than this are deleted
+    CREDIT_SUMMARY_REBUILD_DAYS = int(os.getenv("CREDIT_SUMMARY_REBUILD_DAYS", "3"))  # Recent days recomputed to catch raw SQL writers
+    EMAIL_SYNC_INTERVAL_MINUTES = int(os.getenv("EMAIL_SYNC_INTERVAL_MINUTES", "2"))  # Mailbox poll per worker; announces email.new
+    EMAIL_SYNC_TIMEOUT_SECONDS = float(os.getenv("EMAIL_SYNC_TIMEOUT_SECONDS", "20"))  # Per IMAP socket operation
+    
     # CORS
     CORS_ALLOW_ALL = os.getenv("CORS_ALLOW_ALL", "true").lower() == "true"
     
@@ -0,0 +1,154 @@
+"""
+CORS policy for the API.
+
+OriginMatcher is built once at startup: exact origins go into a frozenset and
+every pattern (localhost, the office IP range, Vercel previews, miracle-coins
+subdomains) is folded into one compiled alternation, matched against the whole
+origin. Decisions are memoized per origin in a bounded LRU, so a browser
+session costs one dict lookup per request after its first.
+
+CORSPolicyMiddleware is a plain ASGI middleware (no BaseHTTPMiddleware task
+or response re-wrapping). It answers preflights directly and adds the
+headers to responses for allowed origins, including 500s from unhandled errors.
+Preflights echo Access-Control-Request-Headers back, as the old "*" setting
+did, so a new custom header from the frontend needs no change here.
+"""
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+ALLOW_METHODS = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
+ALLOW_HEADERS = "Content-Type, Authorization, X-Requested-With, Accept, X-CSRF-Token"
+PREFLIGHT_MAX_AGE = "86400"
+
+DEFAULT_ALLOWED_ORIGINS = (
+    "https://stream-lineai.com",
+    "https://www.stream-lineai.com",
+    "https://server.stream-lineai.com",
+    # Whatnot app domain
+    "https://whatnot.miracle-coins.com",
+    "http://whatnot.miracle-coins.com",
+)
+
+DEFAULT_ALLOWED_ORIGIN_PATTERNS = (
+    # localhost, 127.0.0.1 and ::1 on any port
+    r"https?://localhost(:\d+)?",
+    r"https?://127\.0\.0\.1(:\d+)?",
+    r"https?://::1(:\d+)?",
+    r"https?://\[::1\](:\d+)?",
+    # Office IP range (67.190.222.*), any port
+    r"https?://67\.190\.222\.\d+(:\d+)?",
+    # Any miracle-coins subdomain
+    r"https?://.*\.miracle-coins\.com",
+    # Vercel deployments
+    r"https://automate-business.*\.vercel\.app",
+    r"https://automate-dev.*\.vercel\.app",
+    r"https://.*-wesman687s-projects\.vercel\.app",
+)
+
+ORIGIN_CACHE_SIZE = 1024
+
+
+class OriginMatcher:
+    """Precompiled allow-list check for the Origin header"""
+
+    def __init__(
+        self,
+        origins: Iterable[str] = DEFAULT_ALLOWED_ORIGINS,
+        patterns: Iterable[str] = DEFAULT_ALLOWED_ORIGIN_PATTERNS,
+        allow_all: bool = False,
+        cache_size: int = ORIGIN_CACHE_SIZE
+    ):
+        self.allow_all = allow_all
+        self.origins = frozenset(origins)
+        patterns = list(patterns)
+        self.pattern = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+        self.is_allowed = lru_cache(maxsize=cache_size)(self._decide)
+
+    def _decide(self, origin: str) -> bool:
+        if self.allow_all or origin in self.origins:
+            return True
+        # fullmatch: "https://x.miracle-coins.com.evil.com" must not pass
+        return self.pattern is not None and self.pattern.fullmatch(origin) is not None
+
+    def cache_info(self):
+        return self.is_allowed.cache_info()
+
+
+def _origin_headers(origin: str, allow_headers: bytes = ALLOW_HEADERS.encode("latin-1")) -> List[Tuple[bytes, bytes]]:
+    return [
+        (b"access-control-allow-origin", origin.encode("latin-1")),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-allow-methods", ALLOW_METHODS.encode("latin-1")),
+        (b"access-control-allow-headers", allow_headers),
+        (b"vary", b"Origin"),
+    ]
+
+
+class CORSPolicyMiddleware:
+    """Single CORS layer: preflight short-circuit plus response headers for allowed origins"""
+
+    def __init__(self, app, matcher: OriginMatcher):
+        self.app = app
+        self.matcher = matcher
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        requested_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+        allowed = origin is not None and self.matcher.is_allowed(origin)
+
+        if scope["method"] == "OPTIONS":
+            if allowed:
+                headers = _origin_headers(origin, requested_headers or ALLOW_HEADERS.encode("latin-1"))
+                headers += [(b"access-control-max-age", PREFLIGHT_MAX_AGE.encode("latin-1"))]
+                await self._respond(send, 204, headers, b"")
+            else:
+                await self._respond(send, 403, [(b"content-type", b"text/plain; charset=utf-8")], b"CORS policy: Origin not allowed")
+            return
+
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        extra_headers = _origin_headers(origin)
+        response_started = False
+
+        async def send_with_cors(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                headers = [(name, value) for name, value in message.get("headers", []) if not name.startswith(b"access-control-allow-")]
+                message = {**message, "headers": headers + extra_headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cors)
+        except Exception as e:
+            if response_started:
+                raise
+            # Keep CORS headers on unhandled errors so the browser shows the real failure
+            logger.exception(f"Unhandled error for {scope['method']} {scope['path']}")
+            body = json.dumps({"detail": str(e)}).encode("utf-8")
+            await self._respond(send, 500, [(b"content-type", b"application/json")] + extra_headers, body)
+
+    @staticmethod
+    async def _respond(send, status_code: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers + [(b"content-length", str(len(body)).encode("latin-1"))]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,321 @@
+"""
+Request-scoped performance instrumentation.
+
+request_metrics_middleware gives every request a RequestMetrics context
+(a ContextVar, so it follows the request into threadpool endpoints and
+Stripe executor calls). SQL statements and outbound HTTP calls made while
+handling the request are added to it:
+
+- SQL via Engine cursor-execute events
+- outbound HTTP by wrapping requests / httpx / aiohttp at the transport,
+  classified by host as stripe, openai, file_server or http
+
+The response gets a ``Server-Timing`` header, per-route Prometheus-style
+histograms are updated, and requests over the query-count or latency budget
+(REQUEST_QUERY_BUDGET, REQUEST_LATENCY_BUDGET_MS) are logged.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import config
+from utils.lazy_import import when_imported
+
+logger = logging.getLogger("performance")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_OUTBOUND_HOSTS = {
+    "api.stripe.com": "stripe",
+    "files.stripe.com": "stripe",
+    "api.openai.com": "openai",
+    urlsplit(config.UPLOAD_BASE_URL).hostname or "": "file_server",
+}
+
+
+class RequestMetrics:
+    """Counters for one request"""
+
+    __slots__ = ("started", "queries", "db_ms", "http_ms", "http_calls")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.http_ms: Dict[str, float] = {}
+        self.http_calls = 0
+
+    def add_query(self, duration_ms: float) -> None:
+        self.queries += 1
+        self.db_ms += duration_ms
+
+    def add_http(self, target: str, duration_ms: float) -> None:
+        self.http_calls += 1
+        self.http_ms[target] = self.http_ms.get(target, 0.0) + duration_ms
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"']
+        parts.extend(f"{target};dur={duration:.1f}" for target, duration in sorted(self.http_ms.items()))
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def record_http(target: str, duration_ms: float) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_http(target, duration_ms)
+
+
+def outbound_target(url: Any) -> str:
+    host = urlsplit(str(url)).hostname or ""
+    return _OUTBOUND_HOSTS.get(host, "http")
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = [
+            f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+            for bound, count in zip(self.buckets, self.counts)
+        ]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RouteMetrics:
+    """Per-route histograms in Prometheus text exposition format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self._queries: Dict[Tuple[str, str], _Histogram] = {}
+        self._db_seconds: Dict[Tuple[str, str], float] = {}
+        self._outbound_seconds: Dict[Tuple[str, str, str], float] = {}
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status_code: int, metrics: RequestMetrics, total_ms: float) -> None:
+        key = (method, route)
+        with self._lock:
+            self._latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(total_ms / 1000)
+            self._queries.setdefault(key, _Histogram(QUERY_COUNT_BUCKETS)).observe(metrics.queries)
+            self._db_seconds[key] = self._db_seconds.get(key, 0.0) + metrics.db_ms / 1000
+            for target, duration in metrics.http_ms.items():
+                outbound_key = (method, route, target)
+                self._outbound_seconds[outbound_key] = self._outbound_seconds.get(outbound_key, 0.0) + duration / 1000
+            response_key = (method, route, status_code)
+            self._responses[response_key] = self._responses.get(response_key, 0) + 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_total Requests by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status_code), count in sorted(self._responses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self._latency.items()):
+                lines += histogram.render("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+            lines += [
+                "# HELP http_request_db_queries SQL statements per request by route.",
+                "# TYPE http_request_db_queries histogram",
+            ]
+            for (method, route), histogram in sorted(self._queries.items()):
+                lines += histogram.render("http_request_db_queries", f'method="{method}",route="{route}"')
+
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent in SQL by route.",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self._db_seconds.items()):
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+            lines += [
+                "# HELP http_request_outbound_seconds_total Time spent in outbound HTTP by route and target.",
+                "# TYPE http_request_outbound_seconds_total counter",
+            ]
+            for (method, route, target), seconds in sorted(self._outbound_seconds.items()):
+                lines.append(
+                    f'http_request_outbound_seconds_total{{method="{method}",route="{route}",target="{target}"}} {seconds:.6f}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-route averages for the admin API"""
+        with self._lock:
+            return sorted(
+                (
+                    {
+                        "method": method,
+                        "route": route,
+                        "requests": histogram.count,
+                        "avg_ms": round(histogram.sum / histogram.count * 1000, 1) if histogram.count else 0.0,
+                        "avg_queries": round(self._queries[(method, route)].sum / histogram.count, 1) if histogram.count else 0.0,
+                        "db_seconds": round(self._db_seconds.get((method, route), 0.0), 3),
+                    }
+                    for (method, route), histogram in self._latency.items()
+                ),
+                key=lambda row: row["avg_ms"] * row["requests"],
+                reverse=True
+            )
+
+
+route_metrics = RouteMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._request_metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, "_request_metrics_started", None)
+    if metrics is not None and started is not None:
+        metrics.add_query((time.perf_counter() - started) * 1000)
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def request_metrics_middleware(request: Request, call_next):
+    """Attach a RequestMetrics context, then report it on the response"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        total_ms = metrics.elapsed_ms
+        response.headers["Server-Timing"] = metrics.server_timing(total_ms)
+        return response
+    finally:
+        _current.reset(token)
+        total_ms = metrics.elapsed_ms
+        route = _route_template(request)
+        route_metrics.observe(request.method, route, status_code, metrics, total_ms)
+
+        if metrics.queries > config.REQUEST_QUERY_BUDGET or total_ms > config.REQUEST_LATENCY_BUDGET_MS:
+            outbound = ", ".join(f"{target}={duration:.0f}ms" for target, duration in metrics.http_ms.items()) or "none"
+            logger.warning(
+                f"Request over budget: {request.method} {route} -> {status_code} "
+                f"total={total_ms:.0f}ms queries={metrics.queries} db={metrics.db_ms:.0f}ms outbound={outbound}"
+            )
+
+
+def _wrap_requests(requests) -> None:
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        if _current.get() is None:
+            return original_send(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original_send(self, request, **kwargs)
+        finally:
+            record_http(outbound_target(request.url), (time.perf_counter() - started) * 1000)
+
+    requests.Session.send = send
+
+
+def _wrap_httpx(httpx) -> None:
+    original_send = httpx.Client.send
+    original_async_send = httpx.AsyncClient.send
+
+    def send(self, request, **kwargs):
+        if _current.get() is None:
+            return original_send(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original_send(self, request, **kwargs)
+        finally:
+            record_http(outbound_target(request.url), (time.perf_counter() - started) * 1000)
+
+    async def async_send(self, request, **kwargs):
+        if _current.get() is None:
+            return await original_async_send(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await original_async_send(self, request, **kwargs)
+        finally:
+            record_http(outbound_target(request.url), (time.perf_counter() - started) * 1000)
+
+    httpx.Client.send = send
+    httpx.AsyncClient.send = async_send
+
+
+def _wrap_aiohttp(aiohttp) -> None:
+    original_request = aiohttp.ClientSession._request
+
+    async def _request(self, method, str_or_url, **kwargs):
+        if _current.get() is None:
+            return await original_request(self, method, str_or_url, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await original_request(self, method, str_or_url, **kwargs)
+        finally:
+            record_http(outbound_target(str_or_url), (time.perf_counter() - started) * 1000)
+
+    aiohttp.ClientSession._request = _request
+
+
+_installed = False
+
+
+def install_request_instrumentation() -> None:
+    """Register SQL listeners and wrap the outbound HTTP clients (idempotent).
+
+    The clients are wrapped when they are first imported, so this does not
+    pull httpx (via openai) or aiohttp into startup.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    when_imported("requests", _wrap_requests)
+    when_imported("httpx", _wrap_httpx)
+    when_imported("aiohttp", _wrap_aiohttp)
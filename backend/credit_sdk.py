@@ -8,11 +8,40 @@ Just copy this file to your project and you're ready to go!
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+import threading
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Inside the backend: share the configured, instrumented pool per URL
+    import database
+    from database.engine import get_shared_engine
+except ImportError:
+    database = None
+    get_shared_engine = None
+
+_engines: Dict[str, Any] = {}
+_engines_lock = threading.Lock()
+
+
+def _engine_for(database_url: str):
+    """One engine (connection pool) per database URL for the life of the process."""
+    if get_shared_engine is not None:
+        if make_url(database_url) == make_url(database.DATABASE_URL):
+            return database.engine  # The app's own database: reuse its pool
+        return get_shared_engine(database_url)
+    engine = _engines.get(database_url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(database_url)
+            if engine is None:
+                engine = create_engine(database_url, pool_pre_ping=True, pool_recycle=1800)
+                _engines[database_url] = engine
+    return engine
+
 
 class CreditSDK:
     """
@@ -32,7 +61,7 @@ class CreditSDK:
     
     def __init__(self, database_url: str):
         """Initialize with your database URL."""
-        self.engine = create_engine(database_url)
+        self.engine = _engine_for(database_url)
         self.Session = sessionmaker(bind=self.engine)
     
     def get_balance(self, user_id: int) -> int:
@@ -1,7 +1,7 @@
 """
 Database configuration and initialization
 """
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.sql import func
@@ -19,8 +19,15 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("sqlite"):
     raise ValueError("SQLite is not allowed. Please use PostgreSQL DATABASE_URL.")
 
-# Create PostgreSQL engine
-engine = create_engine(DATABASE_URL)
+# Create PostgreSQL engine (pool settings and telemetry live in database.engine)
+from database.engine import create_app_engine
+
+engine = create_app_engine(DATABASE_URL, name="primary")
+
+# Sampled per-statement profiling (see database.query_profiler)
+from database.query_profiler import install_query_profiler
+
+install_query_profiler()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,221 @@
+"""
+Engine factory and connection pool telemetry.
+
+Every SQLAlchemy engine in the backend is built here so pool sizing,
+pre-ping, recycle, statement timeout and application_name are configured in
+one place (DB_* environment variables). Pools are instrumented: time spent
+waiting for a connection, current waiters, overflow and checkout timeouts are
+tracked per engine and reported by pool_stats().
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; stay under server/proxy idle limits
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "streamlineai-backend")
+
+# Checkout wait histogram bucket upper bounds in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+
+class PoolStats:
+    """Checkout wait and pool pressure counters for one engine"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def begin_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def end_wait(self, wait_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            for index, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkout_wait_avg_ms": round(self.wait_total_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max_ms, 2),
+                "checkout_wait_buckets": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+                },
+            }
+        if self.pool is not None:
+            stats.update({
+                "size": self.pool.size(),
+                "checked_in": self.pool.checkedin(),
+                "checked_out": self.pool.checkedout(),
+                "overflow": max(self.pool.overflow(), 0),
+                "max_overflow": self.pool._max_overflow,
+            })
+        return stats
+
+
+_pool_stats: Dict[str, PoolStats] = {}
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait for a free connection"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        self.stats.begin_wait()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            logger.warning(f"Connection pool '{self.stats.name}' checkout timed out ({self.stats.waiting} waiting)")
+            raise
+        finally:
+            self.stats.end_wait((time.perf_counter() - started) * 1000, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        self.stats.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _instrument(engine: Engine, name: str) -> None:
+    stats = _pool_stats.setdefault(name, PoolStats(name))
+    pool = engine.pool
+    pool.stats = stats
+    stats.pool = pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+
+def _pool_options(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+    options.update(overrides)
+    return options
+
+
+def create_app_engine(url: str, name: str = "primary", application_name: Optional[str] = None, **overrides) -> Engine:
+    """Build a psycopg2 engine with the shared pool settings and telemetry"""
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        connect_args={
+            "application_name": application_name or APPLICATION_NAME,
+            "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+        },
+        **_pool_options(overrides)
+    )
+    _instrument(engine, name)
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    """The asyncpg form of a postgresql:// URL (sslmode becomes asyncpg's ssl)"""
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(query=query).render_as_string(hide_password=False)
+
+
+def create_async_app_engine(url: str, name: str = "async", application_name: Optional[str] = None, **overrides):
+    """Build an asyncpg engine with the shared pool settings and telemetry"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(
+        async_database_url(url),
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args={
+            "server_settings": {
+                "application_name": application_name or APPLICATION_NAME,
+                "statement_timeout": str(STATEMENT_TIMEOUT_MS),
+            }
+        },
+        **_pool_options(overrides)
+    )
+    _instrument(engine.sync_engine, name)
+    return engine
+
+
+_shared_engines: Dict[str, Engine] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_engine(url: str) -> Engine:
+    """One engine (and pool) per URL for callers that only have a database URL"""
+    engine = _shared_engines.get(url)
+    if engine is None:
+        with _shared_lock:
+            engine = _shared_engines.get(url)
+            if engine is None:
+                engine = create_app_engine(url, name=f"shared-{len(_shared_engines) + 1}", pool_size=5, max_overflow=5)
+                _shared_engines[url] = engine
+    return engine
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Telemetry for every engine built by this module"""
+    return {name: stats.snapshot() for name, stats in _pool_stats.items()}
@@ -0,0 +1,214 @@
+"""
+Sampled SQL query profiler.
+
+Replaces the old per-statement file logger. Timings are kept on each
+statement's execution context (no shared globals), and aggregated in memory by
+statement fingerprint - the SQL with literals and bind parameters stripped -
+so the report groups e.g. every ``SELECT ... WHERE users.id = ?`` together.
+
+Logging is sampled and non-blocking: request threads only put records on a
+queue (QueueHandler) and a QueueListener thread writes logs/database.log.
+Only slow queries, errors and a DB_PROFILER_SAMPLE_RATE fraction of
+statements are logged, so log volume no longer scales with query volume.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILER_ENABLED = os.getenv("DB_PROFILER_ENABLED", "true").lower() == "true"
+SAMPLE_RATE = float(os.getenv("DB_PROFILER_SAMPLE_RATE", "0.01"))  # Fraction of statements logged with parameters
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+MAX_FINGERPRINTS = 1000
+RESERVOIR_SIZE = 512  # Recent durations kept per fingerprint for percentiles
+
+db_logger = logging.getLogger("database")
+db_logger.propagate = False
+
+_listener: Optional[QueueListener] = None
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in values group together"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _POSTCOMPILE.sub("(?)", sql)
+    sql = _BIND_PARAM.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    sql = _VALUES_LIST.sub(r"\1", sql)
+    return sql
+
+
+class _FingerprintStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "durations", "last_seen")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.durations = deque(maxlen=RESERVOIR_SIZE)
+        self.last_seen = 0.0
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class QueryProfiler:
+    """In-memory per-fingerprint statement statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _FingerprintStats] = {}
+        self.started_at = time.time()
+
+    def record(self, statement: str, duration_ms: float, error: bool = False) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    self._evict()
+                stats = self._stats[key] = _FingerprintStats()
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.durations.append(duration_ms)
+            stats.last_seen = time.time()
+            if error:
+                stats.errors += 1
+
+    def _evict(self) -> None:
+        """Drop the least recently seen tenth of fingerprints"""
+        oldest = sorted(self._stats.items(), key=lambda item: item[1].last_seen)[:MAX_FINGERPRINTS // 10]
+        for key, _ in oldest:
+            del self._stats[key]
+
+    def report(self, order_by: str = "total_ms", limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            snapshot = [
+                (key, stats.count, stats.errors, stats.total_ms, stats.max_ms, sorted(stats.durations))
+                for key, stats in self._stats.items()
+            ]
+
+        rows = [
+            {
+                "fingerprint": key,
+                "count": count,
+                "errors": errors,
+                "total_ms": round(total_ms, 2),
+                "mean_ms": round(total_ms / count, 2) if count else 0.0,
+                "p50_ms": round(_percentile(durations, 0.50), 2),
+                "p95_ms": round(_percentile(durations, 0.95), 2),
+                "max_ms": round(max_ms, 2),
+            }
+            for key, count, errors, total_ms, max_ms, durations in snapshot
+        ]
+        rows.sort(key=lambda row: row.get(order_by, 0), reverse=True)
+        return rows[:limit]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": PROFILER_ENABLED,
+                "since": self.started_at,
+                "fingerprints": len(self._stats),
+                "statements": sum(stats.count for stats in self._stats.values()),
+                "sample_rate": SAMPLE_RATE,
+                "slow_query_ms": SLOW_QUERY_MS,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+query_profiler = QueryProfiler()
+
+
+def _truncate(value: Any, length: int = 500) -> str:
+    text = repr(value)
+    return text if len(text) <= length else text[:length] + "..."
+
+
+def _start_log_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = logging.FileHandler(os.path.join(log_dir, "database.log"), encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    db_logger.addHandler(QueueHandler(log_queue))
+    db_logger.setLevel(logging.INFO)
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profiler_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    query_profiler.record(statement, duration_ms)
+
+    if duration_ms >= SLOW_QUERY_MS:
+        db_logger.warning(f"SLOW QUERY ({duration_ms:.1f}ms): {fingerprint(statement)[:1000]} | params={_truncate(parameters)}")
+    elif random.random() < SAMPLE_RATE:
+        db_logger.info(f"QUERY SAMPLE ({duration_ms:.1f}ms): {fingerprint(statement)[:1000]} | params={_truncate(parameters)}")
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    started = getattr(context, "_profiler_started", None) if context is not None else None
+    duration_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+    if exception_context.statement:
+        query_profiler.record(exception_context.statement, duration_ms, error=True)
+    db_logger.error(
+        f"DATABASE ERROR: {exception_context.original_exception} | "
+        f"{fingerprint(exception_context.statement or '')[:1000]} | params={_truncate(exception_context.parameters)}"
+    )
+
+
+def install_query_profiler() -> None:
+    """Attach the profiler to every Engine (sync engines and async engines' sync_engine)"""
+    if not PROFILER_ENABLED or event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    _start_log_listener()
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
@@ -1,5 +1,4 @@
-﻿from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.middleware.cors import CORSMiddleware
+﻿from fastapi import FastAPI, HTTPException, Depends
 from database import Base, engine
 from api.chat import router as chat_router
 from api.users import router as users_router
@@ -24,6 +23,10 @@ from api.admin_credits import router as admin_credits_router
 from api.disputes import router as disputes_router
 from api.cross_app_auth import router as cross_app_router
 from api.admin_cross_app import router as admin_cross_app_router
+from api.search import router as search_router
+from api.stripe import webhook_router as stripe_webhook_router, billing_router as stripe_billing_router
+from api.admin_system import router as admin_system_router, metrics_router
+from api.admin_events import router as admin_events_router
 from api.auth import get_current_user
 import logging
 import os
@@ -31,6 +34,13 @@ from datetime import datetime
 import sys
 from contextlib import asynccontextmanager
 from config import config
+from services.background_jobs import job_runner
+from services.chat_message_buffer import chat_message_buffer
+from services.maintenance import maintenance_scheduler
+import services.job_handlers  # Registers the background job types
+from services.stripe_webhook_worker import webhook_workers
+from core.cors import CORSPolicyMiddleware, OriginMatcher
+from core.request_metrics import install_request_instrumentation, request_metrics_middleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -50,15 +60,31 @@ async def lifespan(app: FastAPI):
     logger.info(f"📧 SMTP Server: {os.getenv('SMTP_SERVER', 'not configured')}")
     logger.info(f"🤖 OpenAI API: {'✅ Configured' if os.getenv('OPENAI_API_KEY') else '❌ Missing'}")
     
-    # Create database tables
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ Database tables created/verified successfully")
-        print("✅ Database tables created/verified")
-    except Exception as e:
-        logger.error(f"❌ Database initialization failed: {e}")
-        print(f"❌ Database initialization failed: {e}")
-        raise
+    # Schema is managed by Alembic (`alembic upgrade head` before deploy);
+    # create_all only runs when explicitly enabled for local development
+    if config.DB_CREATE_ALL:
+        try:
+            Base.metadata.create_all(bind=engine)
+            logger.info("✅ Database tables created/verified successfully")
+        except Exception as e:
+            logger.error(f"❌ Database initialization failed: {e}")
+            raise
+    else:
+        logger.info("🗄️  Skipping create_all (DB_CREATE_ALL not set); run `alembic upgrade head` to migrate")
+    
+    # Start Stripe webhook workers
+    webhook_workers.start(config.STRIPE_WEBHOOK_WORKERS)
+    
+    # Write-behind chat message inserts
+    chat_message_buffer.start()
+    
+    # Background jobs (emails, notifications)
+    if config.JOB_RUNNER_ENABLED:
+        job_runner.start()
+    
+    # Expiry and retention cleanups (one leader across processes)
+    if config.MAINTENANCE_ENABLED:
+        maintenance_scheduler.start()
     
     # Log available routes
     logger.info("🛣️  Available API Routes:")
@@ -83,6 +109,10 @@ async def lifespan(app: FastAPI):
     yield  # This is where the app runs
     
     # Shutdown
+    maintenance_scheduler.stop()  # Releases the leader lock
+    job_runner.stop()  # Drains running jobs, re-queues the rest
+    chat_message_buffer.stop()  # Flushes buffered chat messages
+    webhook_workers.stop()
     logger.info("=" * 80)
     logger.info("🛑 STREAMLINE AI BACKEND SHUTTING DOWN")
     logger.info("=" * 80)
@@ -99,145 +129,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware - Environment-based configuration
-cors_origins = [
-    "http://localhost:3000", 
-    "http://localhost:3001",
-    "http://localhost:3002",
-    "http://localhost:3003",
-    "http://localhost:3004",
-    "http://localhost:3005",
-    "https://stream-lineai.com", 
-    "https://www.stream-lineai.com",
-    "https://server.stream-lineai.com",
-    # Whatnot app domain
-    "https://whatnot.miracle-coins.com",
-    "http://whatnot.miracle-coins.com",
-    # Vercel deployment domains
-    "https://automate-business.*.vercel.app",  # Any automate-business deployment
-    "https://automate-dev.*.vercel.app",  # Any automate-dev deployment
-    "https://*.wesman687s-projects.vercel.app",  # Any of your Vercel projects
-    # Add your current IP
-    "http://67.190.222.150",
-    "https://67.190.222.150",
-    "http://67.190.222.150:3000",
-    "http://67.190.222.150:3001",
-    "http://67.190.222.150:3002",
-    "http://67.190.222.150:3003",
-]
-
-# Check if development mode should allow all origins
-if os.getenv('CORS_ALLOW_ALL', 'false').lower() == 'true':
-    cors_origins = ["*"]  # Allow all origins in development
-
-# Custom CORS configuration for IP ranges and Vercel deployments
-def is_allowed_ip_range(origin: str) -> bool:
-    """Check if origin matches allowed IP patterns or Vercel deployment patterns"""
-    import re
-    # Pattern for your IP range (67.190.222.*)
-    allowed_patterns = [
-        r"https?://67\.190\.222\.\d+",  # Matches 67.190.222.* 
-        r"https?://67\.190\.222\.\d+:\d+",  # With port numbers
-        # Whatnot app domain
-        r"https?://whatnot\.miracle-coins\.com",  # Whatnot app
-        r"https?://.*\.miracle-coins\.com",  # Any miracle-coins subdomain
-        # Vercel deployment patterns
-        r"https://automate-business.*\.vercel\.app",  # Any automate-business deployment
-        r"https://automate-dev.*\.vercel\.app",  # Any automate-dev deployment
-        r"https://.*-wesman687s-projects\.vercel\.app",  # Any of your Vercel projects
-    ]
-    
-    for pattern in allowed_patterns:
-        if re.match(pattern, origin):
-            return True
-    return False
-
-def is_localhost(origin: str) -> bool:
-    """Check if origin is localhost (any port)"""
-    import re
-    # Match localhost, 127.0.0.1, or ::1 with any port
-    localhost_patterns = [
-        r"https?://localhost(:\d+)?",
-        r"https?://127\.0\.0\.1(:\d+)?",
-        r"https?://::1(:\d+)?",
-        r"https?://\[::1\](:\d+)?",
-    ]
-    
-    for pattern in localhost_patterns:
-        if re.match(pattern, origin):
-            return True
-    return False
-
-
-async def custom_cors_handler(request: Request, call_next):
-    """Custom CORS handler that supports IP ranges and handles preflight requests"""
-    origin = request.headers.get("origin")
-    
-    # Check if origin is allowed
-    allowed = False
-    if origin:
-        # Check standard CORS origins
-        if origin in cors_origins or "*" in cors_origins:
-            allowed = True
-        # Check if it's localhost (any port) - allow for local development
-        elif is_localhost(origin):
-            allowed = True
-        # Check IP range patterns
-        elif is_allowed_ip_range(origin):
-            allowed = True
-    
-    # Handle preflight requests (OPTIONS) - must respond with CORS headers if allowed
-    if request.method == "OPTIONS":
-        from fastapi.responses import Response
-        if allowed and origin:
-            response = Response(status_code=204)
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With, Accept"
-            response.headers["Access-Control-Max-Age"] = "86400"
-            return response
-        else:
-            # Return 403 for disallowed origins
-            return Response(status_code=403, content="CORS policy: Origin not allowed")
-    
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        # If there's an error, still add CORS headers if origin is allowed
-        from fastapi.responses import JSONResponse
-        response = JSONResponse(
-            status_code=500,
-            content={"detail": str(e)}
-        )
-        if allowed and origin:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With"
-        return response
-    
-    # Add CORS headers to all responses from allowed origins
-    if allowed and origin:
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With"
-    
-    return response
-
-# Add the custom middleware
-app.middleware("http")(custom_cors_handler)
+# CORS: one precompiled policy layer (exact origins + combined pattern, memoized per origin)
+origin_matcher = OriginMatcher(allow_all=os.getenv('CORS_ALLOW_ALL', 'false').lower() == 'true')
+app.add_middleware(CORSPolicyMiddleware, matcher=origin_matcher)
 
-# Also add the standard CORS middleware as backup
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["*"],
-    max_age=86400,
-)
+# Per-request SQL / outbound HTTP timing (outermost, so totals include CORS handling)
+install_request_instrumentation()
+app.middleware("http")(request_metrics_middleware)
 
 # DONT INCLUDE /API PREFIX HERE
 app.include_router(contact_router)  # No prefix for contact form
@@ -266,6 +164,12 @@ app.include_router(admin_credits_router, prefix="/api")
 app.include_router(disputes_router, prefix="/api")
 app.include_router(cross_app_router, prefix="/api")
 app.include_router(admin_cross_app_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
+app.include_router(stripe_webhook_router, prefix="/api")
+app.include_router(stripe_billing_router, prefix="/api")
+app.include_router(admin_system_router, prefix="/api")
+app.include_router(admin_events_router, prefix="/api")  # /api/admin/events (SSE)
+app.include_router(metrics_router)  # Prometheus scrape endpoint at /metrics
 app.include_router(ai_router, prefix="/api/ai")
 
 
@@ -0,0 +1,67 @@
+"""Add full-text search vectors
+
+Revision ID: 016_add_search_vectors
+Revises: 232974afbfc4
+Create Date: 2025-09-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '016_add_search_vectors'
+down_revision = '232974afbfc4'
+branch_labels = None
+depends_on = None
+
+
+# (table, index name, generated tsvector expression) - kept in sync with the models
+SEARCH_DOCUMENTS = [
+    (
+        'jobs',
+        'ix_jobs_search_vector',
+        "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(business_name, '') || ' ' || "
+        "coalesce(industry, '')), 'B') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'D')",
+    ),
+    (
+        'users',
+        'ix_users_search_vector',
+        "setweight(to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(business_name, '') || ' ' || "
+        "coalesce(business_type, '') || ' ' || coalesce(industry, '')), 'B') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(notes, '')), 'D')",
+    ),
+    (
+        'chat_messages',
+        'ix_chat_messages_search_vector',
+        "to_tsvector('english'::regconfig, coalesce(text, ''))",
+    ),
+    (
+        'customer_change_requests',
+        'ix_customer_change_requests_search_vector',
+        "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(admin_notes, '')), 'D')",
+    ),
+]
+
+
+def upgrade():
+    # STORED generated columns are backfilled by PostgreSQL when added and
+    # recomputed on every INSERT/UPDATE, so no triggers are required
+    for table, index_name, document in SEARCH_DOCUMENTS:
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(document, persisted=True))
+        )
+        op.create_index(index_name, table, ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    for table, index_name, _ in reversed(SEARCH_DOCUMENTS):
+        op.drop_index(index_name, table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,58 @@
+"""Add job_daily_stats rollup table
+
+Revision ID: 017_add_job_daily_stats
+Revises: 016_add_search_vectors
+Create Date: 2025-09-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017_add_job_daily_stats'
+down_revision = '016_add_search_vectors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('priority', sa.String(length=50), nullable=False),
+        sa.Column('industry', sa.String(length=100), nullable=False),
+        sa.Column('job_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('estimated_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('actual_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('fixed_price', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'customer_id', 'status', 'priority', 'industry')
+    )
+    op.create_index('ix_job_daily_stats_customer_day', 'job_daily_stats', ['customer_id', 'day'])
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at'])
+    
+    # Backfill the rollup from existing jobs (UTC creation day)
+    op.execute("""
+        INSERT INTO job_daily_stats
+            (day, customer_id, status, priority, industry,
+             job_count, estimated_hours, actual_hours, fixed_price)
+        SELECT
+            date(timezone('UTC', created_at)),
+            customer_id,
+            coalesce(status, ''),
+            coalesce(nullif(priority, ''), 'medium'),
+            coalesce(nullif(industry, ''), 'Unknown'),
+            count(id),
+            coalesce(sum(estimated_hours), 0),
+            coalesce(sum(actual_hours), 0),
+            coalesce(sum(fixed_price), 0)
+        FROM jobs
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_created_at', 'jobs')
+    op.drop_index('ix_job_daily_stats_customer_day', 'job_daily_stats')
+    op.drop_table('job_daily_stats')
@@ -0,0 +1,47 @@
+"""Add credit_daily_summary rollup table
+
+Revision ID: 018_add_credit_daily_summary
+Revises: 017_add_job_daily_stats
+Create Date: 2025-09-04 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_add_credit_daily_summary'
+down_revision = '017_add_job_daily_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('credit_daily_summary',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('credits_added', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('credits_spent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_index('ix_credits_transactions_created_at', 'credits_transactions', ['created_at'])
+    
+    # Backfill the summary from existing transactions (UTC day)
+    op.execute("""
+        INSERT INTO credit_daily_summary
+            (day, credits_added, credits_spent, revenue, transaction_count)
+        SELECT
+            date(timezone('UTC', created_at)),
+            coalesce(sum(CASE WHEN amount > 0 THEN amount ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN amount < 0 THEN -amount ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN amount > 0 THEN dollar_amount ELSE 0 END), 0),
+            count(id)
+        FROM credits_transactions
+        WHERE created_at IS NOT NULL
+        GROUP BY 1
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_credits_transactions_created_at', 'credits_transactions')
+    op.drop_table('credit_daily_summary')
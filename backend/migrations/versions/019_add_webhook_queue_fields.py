@@ -0,0 +1,51 @@
+"""Add queue fields to stripe_webhook_events
+
+Revision ID: 019_add_webhook_queue_fields
+Revises: 018_add_credit_daily_summary
+Create Date: 2025-09-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019_add_webhook_queue_fields'
+down_revision = '018_add_credit_daily_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('stripe_webhook_events', sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'))
+    op.add_column('stripe_webhook_events', sa.Column('customer_key', sa.String(length=255), nullable=True))
+    op.add_column('stripe_webhook_events', sa.Column('event_created_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('stripe_webhook_events', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('stripe_webhook_events', sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('stripe_webhook_events', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # Events handled inline before the queue existed are finished
+    op.execute("""
+        UPDATE stripe_webhook_events
+        SET status = CASE WHEN error_message IS NULL THEN 'processed' ELSE 'failed' END
+        WHERE processed = true
+    """)
+    
+    op.create_index(
+        'ix_stripe_webhook_events_queue', 'stripe_webhook_events', ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('pending', 'processing')")
+    )
+    op.create_index(
+        'ix_stripe_webhook_events_customer_queue', 'stripe_webhook_events', ['customer_key', 'event_created_at'],
+        postgresql_where=sa.text("status IN ('pending', 'processing')")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_stripe_webhook_events_customer_queue', 'stripe_webhook_events')
+    op.drop_index('ix_stripe_webhook_events_queue', 'stripe_webhook_events')
+    op.drop_column('stripe_webhook_events', 'claimed_at')
+    op.drop_column('stripe_webhook_events', 'next_attempt_at')
+    op.drop_column('stripe_webhook_events', 'attempts')
+    op.drop_column('stripe_webhook_events', 'event_created_at')
+    op.drop_column('stripe_webhook_events', 'customer_key')
+    op.drop_column('stripe_webhook_events', 'status')
@@ -0,0 +1,53 @@
+"""Add stripe_invoices mirror and billing sync timestamp
+
+Revision ID: 020_add_stripe_invoices
+Revises: 019_add_webhook_queue_fields
+Create Date: 2025-09-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020_add_stripe_invoices'
+down_revision = '019_add_webhook_queue_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stripe_invoices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stripe_invoice_id', sa.String(length=255), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('stripe_subscription_id', sa.String(length=255), nullable=True),
+        sa.Column('number', sa.String(length=100), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('amount_due', sa.Integer(), nullable=False),
+        sa.Column('amount_paid', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('stripe_created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('hosted_invoice_url', sa.Text(), nullable=True),
+        sa.Column('invoice_pdf', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['stripe_customers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stripe_invoices_id'), 'stripe_invoices', ['id'], unique=False)
+    op.create_index(op.f('ix_stripe_invoices_stripe_invoice_id'), 'stripe_invoices', ['stripe_invoice_id'], unique=True)
+    op.create_index(op.f('ix_stripe_invoices_customer_id'), 'stripe_invoices', ['customer_id'], unique=False)
+    op.create_index('ix_stripe_invoices_customer_created', 'stripe_invoices', ['customer_id', 'stripe_created_at'], unique=False)
+    
+    op.add_column('stripe_customers', sa.Column('billing_synced_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('stripe_customers', 'billing_synced_at')
+    op.drop_index('ix_stripe_invoices_customer_created', table_name='stripe_invoices')
+    op.drop_index(op.f('ix_stripe_invoices_customer_id'), table_name='stripe_invoices')
+    op.drop_index(op.f('ix_stripe_invoices_stripe_invoice_id'), table_name='stripe_invoices')
+    op.drop_index(op.f('ix_stripe_invoices_id'), table_name='stripe_invoices')
+    op.drop_table('stripe_invoices')
@@ -0,0 +1,46 @@
+"""Add normalized E.164 phone column for caller lookups
+
+Revision ID: 021_add_user_phone_e164
+Revises: 020_add_stripe_invoices
+Create Date: 2025-09-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '021_add_user_phone_e164'
+down_revision = '020_add_stripe_invoices'
+branch_labels = None
+depends_on = None
+
+
+# Kept in sync with PHONE_E164_EXPRESSION in models/user_models.py
+PHONE_DIGITS = "regexp_replace(phone, '[^0-9]', '', 'g')"
+PHONE_E164_EXPRESSION = (
+    f"CASE "
+    f"WHEN btrim(phone) LIKE '+%' AND length({PHONE_DIGITS}) BETWEEN 8 AND 15 THEN '+' || {PHONE_DIGITS} "
+    f"WHEN length({PHONE_DIGITS}) = 10 THEN '+1' || {PHONE_DIGITS} "
+    f"WHEN length({PHONE_DIGITS}) = 11 AND {PHONE_DIGITS} LIKE '1%' THEN '+' || {PHONE_DIGITS} "
+    f"END"
+)
+
+
+def upgrade():
+    # A STORED generated column is backfilled when added and recomputed on every
+    # write, whichever code path sets users.phone
+    op.add_column(
+        'users',
+        sa.Column('phone_e164', sa.String(length=16), sa.Computed(PHONE_E164_EXPRESSION, persisted=True))
+    )
+    # Not unique: existing data has shared numbers (e.g. an admin and a customer record)
+    op.create_index(op.f('ix_users_phone_e164'), 'users', ['phone_e164'], unique=False)
+    op.execute(
+        "CREATE INDEX ix_users_phone_e164_reversed ON users (reverse(phone_e164) text_pattern_ops)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_phone_e164_reversed', table_name='users')
+    op.drop_index(op.f('ix_users_phone_e164'), table_name='users')
+    op.drop_column('users', 'phone_e164')
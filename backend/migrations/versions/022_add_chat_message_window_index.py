@@ -0,0 +1,28 @@
+"""Add (session_id, timestamp) index for windowed chat history
+
+Revision ID: 022_add_chat_message_window_index
+Revises: 021_add_user_phone_e164
+Create Date: 2025-09-10 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '022_add_chat_message_window_index'
+down_revision = '021_add_user_phone_e164'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves "newest N messages of a session" as a backward index scan that
+    # stops after N rows; id breaks ties between messages in the same instant
+    op.create_index(
+        'ix_chat_messages_session_timestamp',
+        'chat_messages',
+        ['session_id', 'timestamp', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_chat_messages_session_timestamp', table_name='chat_messages')
@@ -0,0 +1,27 @@
+"""Add rolling conversation summary to chat_sessions
+
+Revision ID: 023_add_chat_session_summary
+Revises: 022_add_chat_message_window_index
+Create Date: 2025-09-11 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '023_add_chat_session_summary'
+down_revision = '022_add_chat_message_window_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_through_message_id', sa.Integer(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('chat_sessions', 'summary_updated_at')
+    op.drop_column('chat_sessions', 'summary_through_message_id')
+    op.drop_column('chat_sessions', 'summary')
@@ -0,0 +1,31 @@
+"""Add claim status to idempotency_keys
+
+Revision ID: 025_add_idempotency_key_status
+Revises: 024_add_background_jobs
+Create Date: 2025-09-13 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '025_add_idempotency_key_status'
+down_revision = '024_add_background_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('idempotency_keys', sa.Column('status', sa.String(length=20), nullable=False, server_default='in_progress'))
+    op.execute("UPDATE idempotency_keys SET status = 'completed' WHERE response_data IS NOT NULL")
+    # created_at now dates the claim, which decides when an abandoned one can be taken over
+    op.execute("UPDATE idempotency_keys SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('idempotency_keys', 'created_at', nullable=False)
+    # Duplicates the primary key index and slowed every claim insert
+    op.drop_index(op.f('ix_idempotency_keys_id'), table_name='idempotency_keys')
+
+
+def downgrade():
+    op.create_index(op.f('ix_idempotency_keys_id'), 'idempotency_keys', ['id'], unique=False)
+    op.alter_column('idempotency_keys', 'created_at', nullable=True)
+    op.drop_column('idempotency_keys', 'status')
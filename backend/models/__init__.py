@@ -11,6 +11,7 @@ from .file_models import *
 from .cross_app_models import *
 from .email_account import *
 from .stripe_models import *
+from .background_job_models import *
 
 # Re-export commonly used models
 __all__ = [
@@ -36,6 +37,7 @@ __all__ = [
     'CreditDispute',
     'CreditPromotion',
     'CreditTransaction',
+    'CreditDailySummary',
     'TransactionType',
     'TransactionStatus',
     
@@ -43,6 +45,7 @@ __all__ = [
     'Job',
     'JobStatus',
     'JobPriority',
+    'JobDailyStats',
     'CustomerChangeRequest',
     'Video',
     'Appointment',
@@ -68,5 +71,9 @@ __all__ = [
     'StripePaymentIntent',
     'StripePaymentMethod',
     'StripeWebhookEvent',
-    'StripeProduct'
+    'StripeInvoice',
+    'StripeProduct',
+    
+    # Background jobs
+    'BackgroundJob'
 ]
@@ -1,12 +1,27 @@
 """
 Automation-related database models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, Enum, Numeric
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Float, JSON, Enum, Numeric, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
 import enum
 
+# Full-text search documents, maintained by PostgreSQL as STORED generated columns
+JOB_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(business_name, '') || ' ' || "
+    "coalesce(industry, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'D')"
+)
+CHANGE_REQUEST_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(admin_notes, '')), 'D')"
+)
+
 class JobStatus(enum.Enum):
     PLANNING = "planning"
     IN_PROGRESS = "in_progress"
@@ -101,6 +116,9 @@ class Job(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Full-text search (deferred - only read by SearchService)
+    search_vector = deferred(Column(TSVECTOR, Computed(JOB_SEARCH_DOCUMENT, persisted=True)))
+    
     # Relationships
     customer = relationship("User", back_populates="jobs")
     time_entries = relationship("TimeEntry", back_populates="job")
@@ -110,6 +128,25 @@ class Job(Base):
     def __repr__(self):
         return f"<Job(id={self.id}, title='{self.title}', status='{self.status}')>"
 
+class JobDailyStats(Base):
+    """Per-day rollup of job counts and totals, keyed by the day the jobs were created (UTC).
+    Maintained on write by services.job_statistics_service."""
+    __tablename__ = "job_daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    customer_id = Column(Integer, primary_key=True)
+    status = Column(String(50), primary_key=True)  # '' when the job has no status
+    priority = Column(String(50), primary_key=True)  # defaults to 'medium'
+    industry = Column(String(100), primary_key=True)  # defaults to 'Unknown'
+    
+    job_count = Column(Integer, nullable=False, default=0)
+    estimated_hours = Column(Float, nullable=False, default=0)
+    actual_hours = Column(Float, nullable=False, default=0)
+    fixed_price = Column(Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<JobDailyStats(day={self.day}, customer_id={self.customer_id}, status='{self.status}', job_count={self.job_count})>"
+
 class CustomerChangeRequest(Base):
     __tablename__ = "customer_change_requests"
     
@@ -142,6 +179,9 @@ class CustomerChangeRequest(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Full-text search (deferred - only read by SearchService)
+    search_vector = deferred(Column(TSVECTOR, Computed(CHANGE_REQUEST_SEARCH_DOCUMENT, persisted=True)))
+    
     # Relationships
     job = relationship("Job", back_populates="change_requests")
     customer = relationship("User", foreign_keys=[customer_id])
@@ -212,3 +252,11 @@ class Appointment(Base):
     
     def __repr__(self):
         return f"<Appointment(id={self.id}, customer_id={self.customer_id}, scheduled_date='{self.scheduled_date}')>"
+
+# Rollup and period-statistics indexes
+Index('ix_jobs_created_at', Job.created_at)
+Index('ix_job_daily_stats_customer_day', JobDailyStats.customer_id, JobDailyStats.day)
+
+# GIN indexes for full-text search
+Index('ix_jobs_search_vector', Job.search_vector, postgresql_using='gin')
+Index('ix_customer_change_requests_search_vector', CustomerChangeRequest.search_vector, postgresql_using='gin')
@@ -0,0 +1,37 @@
+"""
+Durable background job queue (services.background_jobs).
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class BackgroundJob(Base):
+    """A side effect (email, notification) to run after the request that queued it"""
+    __tablename__ = "background_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    
+    # Queue state
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # pending, processing, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, job_type='{self.job_type}', status='{self.status}', attempts={self.attempts})>"
+
+
+# Claims only ever scan unfinished jobs of one type
+Index(
+    'ix_background_jobs_queue',
+    BackgroundJob.job_type,
+    BackgroundJob.next_attempt_at,
+    postgresql_where=BackgroundJob.status.in_(("pending", "processing"))
+)
@@ -1,7 +1,7 @@
 """
 Credit transaction database models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Float, JSON, Enum, Numeric
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -42,7 +42,7 @@ class CreditTransaction(Base):
     transaction_metadata = Column(JSON, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     user = relationship("User", back_populates="credit_transactions")
@@ -50,3 +50,17 @@ class CreditTransaction(Base):
     
     def __repr__(self):
         return f"<CreditTransaction(id={self.id}, user_id={self.user_id}, amount={self.amount}, description='{self.description}')>"
+
+class CreditDailySummary(Base):
+    """Per-day (UTC) credit and revenue totals for the financial dashboard.
+    Maintained on write by services.credit_summary_service."""
+    __tablename__ = "credit_daily_summary"
+    
+    day = Column(Date, primary_key=True)
+    credits_added = Column(Integer, nullable=False, default=0)  # Sum of positive amounts
+    credits_spent = Column(Integer, nullable=False, default=0)  # Sum of |negative amounts|
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)  # Sum of dollar_amount on credit additions
+    transaction_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<CreditDailySummary(day={self.day}, added={self.credits_added}, spent={self.credits_spent})>"
@@ -0,0 +1,112 @@
+"""
+Column load profiles for list and detail queries.
+
+Job and User each carry many JSON/Text columns (brand assets, links, server
+details, milestones, deliverables, social media...). List views only render a
+handful of scalar fields, so list queries apply the ``*_list_profile`` options:
+the heavy columns are neither sent over the wire nor JSON-decoded per row.
+Detail views keep the default profile (every column) and serialize_job.
+
+Columns left out of a profile are deferred, not forbidden - touching one on a
+list row issues an extra SELECT for that row, so serializers used with a list
+profile must stay within its column set.
+"""
+from sqlalchemy.orm import load_only
+
+from models.automation_models import Job, CustomerChangeRequest
+from models.user_models import User
+
+# Scalar columns rendered by job lists (see api.common.serialize_job_summary)
+JOB_LIST_COLUMNS = (
+    "id",
+    "customer_id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "start_date",
+    "deadline",
+    "completion_date",
+    "estimated_hours",
+    "actual_hours",
+    "hourly_rate",
+    "fixed_price",
+    "progress_percentage",
+    "business_name",
+    "industry",
+    "created_at",
+    "updated_at",
+)
+
+# Columns rendered by the customer list (schemas.customer.Customer)
+CUSTOMER_LIST_COLUMNS = (
+    "id",
+    "name",
+    "email",
+    "phone",
+    "address",
+    "city",
+    "state",
+    "zip_code",
+    "country",
+    "business_name",
+    "business_site",
+    "business_type",
+    "pain_points",
+    "current_tools",
+    "budget",
+    "status",
+    "notes",
+    "created_at",
+    "updated_at",
+)
+
+# Columns rendered by the admin user list (schemas.user.UserListResponse)
+USER_LIST_COLUMNS = (
+    "id",
+    "email",
+    "name",
+    "user_type",
+    "status",
+    "credits",
+    "created_at",
+    "last_login",
+)
+
+CHANGE_REQUEST_LIST_COLUMNS = (
+    "id",
+    "job_id",
+    "customer_id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "estimated_hours",
+    "estimated_cost",
+    "requested_via",
+    "created_at",
+)
+
+
+def _load_only(model, columns):
+    return load_only(*[getattr(model, column) for column in columns])
+
+
+def job_list_profile():
+    """Load only the scalar job columns used by list views"""
+    return _load_only(Job, JOB_LIST_COLUMNS)
+
+
+def customer_list_profile():
+    """Load only the customer columns used by the customer list"""
+    return _load_only(User, CUSTOMER_LIST_COLUMNS)
+
+
+def user_list_profile():
+    """Load only the user columns used by the admin user list"""
+    return _load_only(User, USER_LIST_COLUMNS)
+
+
+def change_request_list_profile():
+    """Load only the change request columns used by list views"""
+    return _load_only(CustomerChangeRequest, CHANGE_REQUEST_LIST_COLUMNS)
@@ -23,6 +23,7 @@ class StripeCustomer(Base):
     preferred_locales = Column(JSON, nullable=True)  # Array of locale strings
     invoice_prefix = Column(String(10), nullable=True)
     next_invoice_sequence = Column(Integer, default=1)
+    billing_synced_at = Column(DateTime(timezone=True), nullable=True)  # Last full invoice/payment method sync from Stripe
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -30,6 +31,7 @@ class StripeCustomer(Base):
     user = relationship("User", back_populates="stripe_customer")
     subscriptions = relationship("StripeSubscription", back_populates="customer")
     payment_methods = relationship("StripePaymentMethod", back_populates="customer")
+    invoices = relationship("StripeInvoice", back_populates="customer")
     
     def __repr__(self):
         return f"<StripeCustomer(id={self.id}, stripe_id='{self.stripe_customer_id}', user_id={self.user_id})>"
@@ -137,6 +139,40 @@ class StripePaymentMethod(Base):
         return f"<StripePaymentMethod(id={self.id}, stripe_id='{self.stripe_payment_method_id}', type='{self.type}')>"
 
 
+class StripeInvoice(Base):
+    """Local mirror of Stripe invoices, kept current by webhooks (services.stripe_billing_cache)"""
+    __tablename__ = "stripe_invoices"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    stripe_invoice_id = Column(String(255), unique=True, nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("stripe_customers.id"), nullable=False, index=True)
+    stripe_subscription_id = Column(String(255), nullable=True)
+    
+    # Invoice details
+    number = Column(String(100), nullable=True)
+    status = Column(String(50), nullable=True)  # draft, open, paid, uncollectible, void
+    amount_due = Column(Integer, nullable=False, default=0)  # Amount in cents
+    amount_paid = Column(Integer, nullable=False, default=0)  # Amount in cents
+    currency = Column(String(3), default="usd")
+    description = Column(Text, nullable=True)
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    stripe_created_at = Column(DateTime(timezone=True), nullable=True)
+    hosted_invoice_url = Column(Text, nullable=True)
+    invoice_pdf = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    customer = relationship("StripeCustomer", back_populates="invoices")
+    
+    def __repr__(self):
+        return f"<StripeInvoice(id={self.id}, stripe_id='{self.stripe_invoice_id}', status='{self.status}')>"
+
+
+Index('ix_stripe_invoices_customer_created', StripeInvoice.customer_id, StripeInvoice.stripe_created_at)
+
+
 class StripeWebhookEvent(Base):
     """Tracks Stripe webhook events for audit and idempotency"""
     __tablename__ = "stripe_webhook_events"
@@ -154,11 +190,33 @@ class StripeWebhookEvent(Base):
     processed_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
     
+    # Queue state (services.stripe_webhook_worker)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # pending, processing, processed, failed
+    customer_key = Column(String(255), nullable=True)  # Stripe customer id; events for one customer are processed in order
+    event_created_at = Column(DateTime(timezone=True), nullable=True)  # Stripe's event.created
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Raw event data
     event_data = Column(JSON, nullable=True)
     
     def __repr__(self):
-        return f"<StripeWebhookEvent(id={self.id}, stripe_event_id='{self.stripe_event_id}', type='{self.event_type}')>"
+        return f"<StripeWebhookEvent(id={self.id}, stripe_event_id='{self.stripe_event_id}', type='{self.event_type}', status='{self.status}')>"
+
+
+# Queue scans only ever look at unfinished events
+Index(
+    'ix_stripe_webhook_events_queue',
+    StripeWebhookEvent.next_attempt_at,
+    postgresql_where=StripeWebhookEvent.status.in_(("pending", "processing"))
+)
+Index(
+    'ix_stripe_webhook_events_customer_queue',
+    StripeWebhookEvent.customer_key,
+    StripeWebhookEvent.event_created_at,
+    postgresql_where=StripeWebhookEvent.status.in_(("pending", "processing"))
+)
 
 
 class StripeProduct(Base):
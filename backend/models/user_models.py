@@ -1,12 +1,33 @@
 """
 User-related database models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Enum, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
 import enum
 
+# Full-text search documents, maintained by PostgreSQL as STORED generated columns.
+# Names, emails and business terms are not stemmed, so users use the 'simple' config.
+USER_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(business_name, '') || ' ' || "
+    "coalesce(business_type, '') || ' ' || coalesce(industry, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(notes, '')), 'D')"
+)
+CHAT_MESSAGE_SEARCH_DOCUMENT = "to_tsvector('english'::regconfig, coalesce(text, ''))"
+
+# E.164 form of users.phone, same rules as utils.phone.normalize_phone
+_PHONE_DIGITS = "regexp_replace(phone, '[^0-9]', '', 'g')"
+PHONE_E164_EXPRESSION = (
+    f"CASE "
+    f"WHEN btrim(phone) LIKE '+%' AND length({_PHONE_DIGITS}) BETWEEN 8 AND 15 THEN '+' || {_PHONE_DIGITS} "
+    f"WHEN length({_PHONE_DIGITS}) = 10 THEN '+1' || {_PHONE_DIGITS} "
+    f"WHEN length({_PHONE_DIGITS}) = 11 AND {_PHONE_DIGITS} LIKE '1%' THEN '+' || {_PHONE_DIGITS} "
+    f"END"
+)
+
 class UserType(enum.Enum):
     ADMIN = "admin"
     CUSTOMER = "customer"
@@ -32,6 +53,7 @@ class User(Base):
     name = Column(String(255), nullable=True)  # Full name for customers, display name for admins
     username = Column(String(100), nullable=True, unique=True, index=True)  # Optional username (mainly for admins)
     phone = Column(String(50), nullable=True, index=True)
+    phone_e164 = Column(String(16), Computed(PHONE_E164_EXPRESSION, persisted=True), index=True)  # Caller lookups
     
     # Address fields (mainly for customers)
     address = Column(Text, nullable=True)
@@ -87,6 +109,9 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
     
+    # Full-text search (deferred - only read by SearchService)
+    search_vector = deferred(Column(TSVECTOR, Computed(USER_SEARCH_DOCUMENT, persisted=True)))
+    
     # Relationships - these will be set up after all models are defined
     chat_sessions = relationship("ChatSession", foreign_keys="[ChatSession.customer_id]", back_populates="user")
     appointments = relationship("Appointment", back_populates="customer")
@@ -145,6 +170,11 @@ class ChatSession(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_seen = Column(Boolean, default=False)
     
+    # Rolling summary of messages up to summary_through_message_id (services/conversation_summary.py)
+    summary = Column(Text, nullable=True)
+    summary_through_message_id = Column(Integer, nullable=True)
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Relationships
     user = relationship("User", foreign_keys=[customer_id])
     messages = relationship("ChatMessage", back_populates="session")
@@ -162,6 +192,9 @@ class ChatMessage(Base):
     is_bot = Column(Boolean, nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Full-text search (deferred - only read by SearchService)
+    search_vector = deferred(Column(TSVECTOR, Computed(CHAT_MESSAGE_SEARCH_DOCUMENT, persisted=True)))
+    
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
     
@@ -182,3 +215,17 @@ class Admin(Base):
     
     def __repr__(self):
         return f"<Admin(id={self.id}, user_id={self.user_id}, admin_level='{self.admin_level}')>"
+
+# GIN indexes for full-text search
+Index('ix_users_search_vector', User.search_vector, postgresql_using='gin')
+Index('ix_chat_messages_search_vector', ChatMessage.search_vector, postgresql_using='gin')
+
+# Keyset path for "last N messages of a session" (ORDER BY timestamp DESC, id DESC)
+Index('ix_chat_messages_session_timestamp', ChatMessage.session_id, ChatMessage.timestamp, ChatMessage.id)
+
+# Reversed digits turn "number ends with 4567" into an indexable prefix match
+Index(
+    'ix_users_phone_e164_reversed',
+    func.reverse(User.phone_e164).label('phone_e164_reversed'),
+    postgresql_ops={'phone_e164_reversed': 'text_pattern_ops'}
+)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark the AsyncSession read path against blocking Session queries under concurrency.
+
+Each simulated request does what /api/auth/me + /api/jobs/customer do: a
+token user lookup, then a count and a 20-row page of the customer's jobs.
+Three handler styles are compared at several concurrency levels:
+
+- blocking: sync Session inside ``async def`` (the old handlers - the event loop stalls)
+- threadpool: sync Session via asyncio.to_thread (what a plain ``def`` handler gets)
+- async: AsyncSession on asyncpg (the migrated handlers)
+
+Seeds an isolated schema, reports requests/second and p95 latency, then drops it.
+
+Usage (from backend/, requires DATABASE_URL):
+    python scripts/benchmark_async_endpoints.py --requests 2000 --concurrency 1 10 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from database import Base, DATABASE_URL, engine
+from database.engine import async_database_url
+from models import Job, User
+from models.load_profiles import job_list_profile
+
+SCHEMA = "bench_async_endpoints"
+STATUSES = ["planning", "in_progress", "review", "completed", "pending"]
+
+
+def seed(connection, customers: int, jobs_per_customer: int) -> None:
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    connection.execute(User.__table__.insert(), [
+        {"id": i, "email": f"bench{i}@example.com", "password_hash": "x", "user_type": "customer",
+         "is_active": True, "credits": 100}
+        for i in range(1, customers + 1)
+    ])
+    connection.execute(Job.__table__.insert(), [
+        {
+            "customer_id": customer_id,
+            "title": f"Benchmark job {customer_id}-{n}",
+            "description": "Seeded job used for async endpoint benchmarking",
+            "status": random.choice(STATUSES),
+            "priority": "medium",
+            "milestones": [{"id": m, "name": f"Milestone {m}"} for m in range(5)],
+            "created_at": now - timedelta(minutes=random.randint(0, 500_000)),
+        }
+        for customer_id in range(1, customers + 1)
+        for n in range(jobs_per_customer)
+    ])
+
+
+def page_query(user_id: int):
+    return select(Job).where(Job.customer_id == user_id)
+
+
+def blocking_request(session_factory, user_id: int) -> None:
+    with session_factory() as db:
+        db.scalar(select(User.is_active).where(User.id == user_id))
+        query = page_query(user_id)
+        db.scalar(query.with_only_columns(func.count(Job.id)))
+        db.scalars(query.order_by(Job.created_at.desc()).limit(20).options(job_list_profile())).all()
+
+
+async def async_request(session_factory, user_id: int) -> None:
+    async with session_factory() as db:
+        await db.scalar(select(User.is_active).where(User.id == user_id))
+        query = page_query(user_id)
+        await db.scalar(query.with_only_columns(func.count(Job.id)))
+        (await db.scalars(query.order_by(Job.created_at.desc()).limit(20).options(job_list_profile()))).all()
+
+
+async def run(style: str, handler, total: int, concurrency: int, customers: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(user_id: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await handler(user_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(random.randint(1, customers)) for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return total / elapsed, latencies[int(len(latencies) * 0.95) - 1]
+
+
+async def bench(args) -> None:
+    sync_engine = create_engine(
+        DATABASE_URL, pool_size=max(args.concurrency), max_overflow=0,
+        connect_args={"options": f"-c search_path={SCHEMA}"}
+    )
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL), pool_size=max(args.concurrency), max_overflow=0,
+        connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    sync_sessions = lambda: Session(bind=sync_engine)
+    async_sessions = lambda: AsyncSession(bind=async_engine, expire_on_commit=False)
+
+    async def blocking(user_id):
+        blocking_request(sync_sessions, user_id)
+
+    async def threadpool(user_id):
+        await asyncio.to_thread(blocking_request, sync_sessions, user_id)
+
+    async def asyncpg_path(user_id):
+        await async_request(async_sessions, user_id)
+
+    styles = [("blocking", blocking), ("threadpool", threadpool), ("async", asyncpg_path)]
+
+    # Warm both pools
+    for _, handler in styles:
+        await run("warmup", handler, 50, max(args.concurrency), args.customers)
+
+    print(f"\n{'concurrency':>11} | {'style':>10} | {'req/s':>8} | {'p95 ms':>8}")
+    print("-" * 48)
+    for concurrency in args.concurrency:
+        for style, handler in styles:
+            throughput, p95 = await run(style, handler, args.requests, concurrency, args.customers)
+            print(f"{concurrency:>11} | {style:>10} | {throughput:>8.0f} | {p95:>8.1f}")
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AsyncSession vs blocking Session reads")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="Concurrent requests")
+    parser.add_argument("--customers", type=int, default=200, help="Customers to seed")
+    parser.add_argument("--jobs-per-customer", type=int, default=50, help="Jobs seeded per customer")
+    args = parser.parse_args()
+
+    with engine.connect() as raw_connection:
+        raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        raw_connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        raw_connection.commit()
+
+        connection = raw_connection.execution_options(schema_translate_map={None: SCHEMA})
+        try:
+            Base.metadata.create_all(connection, tables=[User.__table__, Job.__table__])
+            print(f"🌱 Seeding {args.customers:,} customers x {args.jobs_per_customer} jobs...")
+            seed(connection, args.customers, args.jobs_per_customer)
+            connection.commit()
+            connection.execute(text(f"ANALYZE {SCHEMA}.jobs"))
+            connection.commit()
+
+            asyncio.run(bench(args))
+        finally:
+            raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            raw_connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Chat message insert throughput: per-message commits vs the write-behind buffer.
+
+Simulates chat widget traffic. --concurrency threads each play one
+conversation at a time and add --messages messages to it through
+SessionService.add_message. Each thread uses its own database session, like
+concurrent requests. Two modes run:
+
+- legacy: the previous add_message (session lookup, INSERT, COMMIT, refresh)
+- buffered: the write-behind ChatMessageBuffer with its flusher thread
+
+Reports messages/second (including the final flush) and checks that every
+message reached chat_messages. Seeds an isolated schema and drops it
+afterwards.
+
+Usage (from backend/, requires DATABASE_URL):
+    python scripts/benchmark_chat_messages.py --conversations 200 --messages 20 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from database import Base, DATABASE_URL, engine
+from models import ChatMessage, ChatSession, User
+from services.chat_message_buffer import ChatMessageBuffer
+from services.session_service import SessionService
+
+SCHEMA = "bench_chat_messages"
+TABLES = [User.__table__, ChatSession.__table__, ChatMessage.__table__]
+
+
+def legacy_add_message(db: Session, session_id: str, text: str, is_bot: bool) -> ChatMessage:
+    """add_message as it was before the write-behind buffer"""
+    session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+    if not session:
+        session = ChatSession(session_id=session_id)
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+
+    message = ChatMessage(message_id=str(uuid.uuid4()), session_id=session.id, text=text, is_bot=is_bot)
+    db.add(message)
+    db.commit()
+    db.refresh(message)
+    return message
+
+
+def play_conversations(session_factory, conversations: int, messages: int, add) -> None:
+    with session_factory() as db:
+        for _ in range(conversations):
+            session_id = f"bench-{uuid.uuid4()}"
+            for n in range(messages):
+                add(db, session_id, f"Message {n}: we need help automating our intake forms and invoicing", n % 2 == 1)
+
+
+def run_mode(session_factory, args, add):
+    per_thread = args.conversations // args.concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(play_conversations, session_factory, per_thread, args.messages, add)
+            for _ in range(args.concurrency)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - started, per_thread * args.concurrency * args.messages
+
+
+def count_messages(session_factory) -> int:
+    with session_factory() as db:
+        return db.execute(select(func.count(ChatMessage.id))).scalar_one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat message inserts, per-message commit vs write-behind")
+    parser.add_argument("--conversations", type=int, default=200, help="Conversations per mode")
+    parser.add_argument("--messages", type=int, default=20, help="Messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent writers")
+    parser.add_argument("--interval-ms", type=float, default=50, help="Buffer flush interval")
+    args = parser.parse_args()
+
+    with engine.connect() as raw_connection:
+        raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        raw_connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        raw_connection.commit()
+
+        connection = raw_connection.execution_options(schema_translate_map={None: SCHEMA})
+        try:
+            Base.metadata.create_all(connection, tables=TABLES)
+            connection.commit()
+
+            bench_engine = create_engine(
+                DATABASE_URL,
+                pool_size=args.concurrency + 2,
+                connect_args={"options": f"-c search_path={SCHEMA}"}
+            )
+            session_factory = lambda: Session(bind=bench_engine)
+
+            print(f"💬 {args.conversations:,} conversations x {args.messages} messages, {args.concurrency} writers\n")
+            results = {}
+
+            elapsed, sent = run_mode(session_factory, args, legacy_add_message)
+            results["legacy"] = (elapsed, sent)
+
+            buffer = ChatMessageBuffer(session_factory=session_factory, interval_ms=args.interval_ms)
+            buffer.start()
+            before = count_messages(session_factory)
+            elapsed, sent = run_mode(
+                session_factory, args,
+                lambda db, session_id, text, is_bot: SessionService(db, message_buffer=buffer).add_message(session_id, text, is_bot)
+            )
+            flush_started = time.perf_counter()
+            buffer.stop()
+            elapsed += time.perf_counter() - flush_started
+            results["buffered"] = (elapsed, sent)
+            stored = count_messages(session_factory) - before
+            bench_engine.dispose()
+        finally:
+            raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            raw_connection.commit()
+
+    print(f"{'mode':>10} | {'messages':>9} | {'seconds':>8} | {'msgs/s':>9}")
+    print("-" * 46)
+    for mode, (elapsed, sent) in results.items():
+        print(f"{mode:>10} | {sent:>9,} | {elapsed:>8.2f} | {sent / elapsed:>9,.0f}")
+
+    legacy_rate = results["legacy"][1] / results["legacy"][0]
+    buffered_rate = results["buffered"][1] / results["buffered"][0]
+    print(f"\n⚡ Write-behind: {buffered_rate / legacy_rate:.1f}x messages/second")
+    print(f"buffer: {buffer.stats()}")
+    if stored != results["buffered"][1]:
+        print(f"❌ {stored:,} of {results['buffered'][1]:,} buffered messages stored")
+        sys.exit(1)
+    print(f"✅ All {stored:,} buffered messages stored")
+
+
+if __name__ == "__main__":
+    main()
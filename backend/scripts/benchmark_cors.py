@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CORS layer: the legacy custom_cors_handler + CORSMiddleware pair
+vs the precompiled OriginMatcher / CORSPolicyMiddleware.
+
+Part 1 times the origin decision alone over a realistic mix of origins.
+Part 2 (needs starlette) drives a trivial ASGI app through each middleware
+stack directly, without a server, and reports the per-request cost.
+
+Usage (from backend/, no database needed):
+    python scripts/benchmark_cors.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics as stats
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cors import CORSPolicyMiddleware, OriginMatcher
+
+LEGACY_ORIGINS = [
+    "http://localhost:3000", "http://localhost:3001", "http://localhost:3002",
+    "http://localhost:3003", "http://localhost:3004", "http://localhost:3005",
+    "https://stream-lineai.com", "https://www.stream-lineai.com", "https://server.stream-lineai.com",
+    "https://whatnot.miracle-coins.com", "http://whatnot.miracle-coins.com",
+    "https://automate-business.*.vercel.app", "https://automate-dev.*.vercel.app",
+    "https://*.wesman687s-projects.vercel.app",
+    "http://67.190.222.150", "https://67.190.222.150",
+    "http://67.190.222.150:3000", "http://67.190.222.150:3001",
+    "http://67.190.222.150:3002", "http://67.190.222.150:3003",
+]
+
+SAMPLE_ORIGINS = [
+    "https://www.stream-lineai.com",
+    "https://stream-lineai.com",
+    "http://localhost:3000",
+    "http://127.0.0.1:8080",
+    "https://automate-business-git-main-abc123.vercel.app",
+    "https://preview-42-wesman687s-projects.vercel.app",
+    "http://67.190.222.17:3002",
+    "https://shop.miracle-coins.com",
+    "https://evil.example.com",
+]
+
+
+def legacy_is_allowed(origin: str) -> bool:
+    """The original decision: list scan, then uncompiled re.match per pattern"""
+    if origin in LEGACY_ORIGINS:
+        return True
+    for pattern in [
+        r"https?://localhost(:\d+)?",
+        r"https?://127\.0\.0\.1(:\d+)?",
+        r"https?://::1(:\d+)?",
+        r"https?://\[::1\](:\d+)?",
+    ]:
+        if re.match(pattern, origin):
+            return True
+    for pattern in [
+        r"https?://67\.190\.222\.\d+",
+        r"https?://67\.190\.222\.\d+:\d+",
+        r"https?://whatnot\.miracle-coins\.com",
+        r"https?://.*\.miracle-coins\.com",
+        r"https://automate-business.*\.vercel\.app",
+        r"https://automate-dev.*\.vercel\.app",
+        r"https://.*-wesman687s-projects\.vercel\.app",
+    ]:
+        if re.match(pattern, origin):
+            return True
+    return False
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return stats.median(samples)
+
+
+def bench_decision(iterations: int, repeat: int) -> None:
+    matcher = OriginMatcher()
+    for origin in SAMPLE_ORIGINS:
+        assert legacy_is_allowed(origin) == matcher.is_allowed(origin), origin
+
+    origins = SAMPLE_ORIGINS * (iterations // len(SAMPLE_ORIGINS))
+    legacy = timed(lambda: [legacy_is_allowed(origin) for origin in origins], repeat)
+    uncached = timed(lambda: [matcher._decide(origin) for origin in origins], repeat)
+    cached = timed(lambda: [matcher.is_allowed(origin) for origin in origins], repeat)
+
+    per_call = lambda seconds: seconds / len(origins) * 1e6
+    print(f"\nOrigin decision ({len(origins):,} calls)")
+    print(f"{'strategy':>20} | {'us/call':>8} | {'speedup':>8}")
+    print("-" * 44)
+    print(f"{'legacy re.match':>20} | {per_call(legacy):>8.2f} | {1:>7.1f}x")
+    print(f"{'combined regex':>20} | {per_call(uncached):>8.2f} | {legacy / uncached:>7.1f}x")
+    print(f"{'combined + LRU':>20} | {per_call(cached):>8.2f} | {legacy / cached:>7.1f}x")
+
+
+def bench_stack(requests: int, repeat: int) -> None:
+    try:
+        from starlette.middleware.base import BaseHTTPMiddleware
+        from starlette.middleware.cors import CORSMiddleware
+        from starlette.responses import JSONResponse, Response
+    except ImportError:
+        print("\nstarlette is not installed; skipping the middleware stack benchmark")
+        return
+
+    async def endpoint(scope, receive, send):
+        await JSONResponse({"ok": True})(scope, receive, send)
+
+    async def legacy_handler(request, call_next):
+        origin = request.headers.get("origin")
+        allowed = bool(origin) and legacy_is_allowed(origin)
+        if request.method == "OPTIONS":
+            if allowed:
+                response = Response(status_code=204)
+                response.headers["Access-Control-Allow-Origin"] = origin
+                response.headers["Access-Control-Max-Age"] = "86400"
+                return response
+            return Response(status_code=403, content="CORS policy: Origin not allowed")
+        response = await call_next(request)
+        if allowed:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
+            response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With"
+        return response
+
+    legacy_app = BaseHTTPMiddleware(
+        CORSMiddleware(endpoint, allow_origins=LEGACY_ORIGINS, allow_credentials=True, allow_methods=["*"], allow_headers=["*"]),
+        dispatch=legacy_handler
+    )
+    new_app = CORSPolicyMiddleware(endpoint, matcher=OriginMatcher())
+
+    def scope_for(method: str, origin: str):
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "https", "path": "/api/health", "raw_path": b"/api/health", "root_path": "",
+            "query_string": b"", "server": ("testserver", 443), "client": ("127.0.0.1", 50000),
+            "headers": [(b"host", b"testserver"), (b"origin", origin.encode())],
+        }
+
+    scopes = [scope_for("OPTIONS" if i % 10 == 0 else "GET", SAMPLE_ORIGINS[i % len(SAMPLE_ORIGINS)]) for i in range(requests)]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def drive(app):
+        for scope in scopes:
+            await app(dict(scope), receive, send)
+
+    loop = asyncio.new_event_loop()
+    try:
+        legacy = timed(lambda: loop.run_until_complete(drive(legacy_app)), repeat)
+        new = timed(lambda: loop.run_until_complete(drive(new_app)), repeat)
+    finally:
+        loop.close()
+
+    print(f"\nMiddleware stack ({requests:,} requests, 10% preflight)")
+    print(f"{'stack':>32} | {'us/request':>10}")
+    print("-" * 46)
+    print(f"{'custom handler + CORSMiddleware':>32} | {legacy / requests * 1e6:>10.1f}")
+    print(f"{'CORSPolicyMiddleware':>32} | {new / requests * 1e6:>10.1f}")
+    print(f"saved per request: {(legacy - new) / requests * 1e6:.1f} us ({legacy / new:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CORS origin matcher and middleware")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests / origin checks per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    bench_decision(args.requests, args.repeat)
+    bench_stack(args.requests, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/jobs/statistics: legacy Python loops vs SQL aggregates vs the daily rollup.
+
+Seeds an isolated schema with N jobs (default 100k), runs each strategy for
+several periods and reports median latency. The schema is dropped afterwards.
+
+Usage (from backend/, requires DATABASE_URL):
+    python scripts/benchmark_job_statistics.py --jobs 100000 --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics as stats
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import Base, engine
+from models import Job, JobDailyStats, User
+from services.job_statistics_service import JobStatisticsService, rebuild_job_daily_stats
+
+SCHEMA = "bench_job_statistics"
+STATUSES = ["planning", "in_progress", "review", "completed", "pending", "on_hold", "cancelled", None]
+PRIORITIES = ["low", "medium", "high", "urgent", None]
+INDUSTRIES = ["Retail", "Healthcare", "Finance", "Education", "Hospitality", "Technology", None]
+
+
+def legacy_statistics(db: Session, days: int, now: datetime) -> dict:
+    """The original implementation: load every Job in the period and loop in Python"""
+    start_date = now - timedelta(days=days)
+    jobs = db.query(Job).filter(Job.created_at >= start_date).all()
+
+    priority_stats, industry_stats = {}, {}
+    for job in jobs:
+        priority = job.priority or "medium"
+        priority_stats[priority] = priority_stats.get(priority, 0) + 1
+        industry = job.industry or "Unknown"
+        industry_stats[industry] = industry_stats.get(industry, 0) + 1
+
+    return {
+        "job_counts": {
+            "total": len(jobs),
+            "completed": len([j for j in jobs if j.status == "completed"]),
+            "in_progress": len([j for j in jobs if j.status == "in_progress"]),
+            "pending": len([j for j in jobs if j.status == "pending"]),
+        },
+        "total_estimated_hours": sum(j.estimated_hours or 0 for j in jobs),
+        "priority_distribution": priority_stats,
+        "industry_distribution": industry_stats,
+    }
+
+
+def seed(connection, job_count: int, customer_count: int, now: datetime):
+    random.seed(42)
+    connection.execute(User.__table__.insert(), [
+        {"id": i, "email": f"bench{i}@example.com", "password_hash": "x", "user_type": "customer",
+         "is_active": True, "credits": 0}
+        for i in range(1, customer_count + 1)
+    ])
+
+    batch = []
+    for i in range(job_count):
+        batch.append({
+            "customer_id": random.randint(1, customer_count),
+            "title": f"Benchmark job {i}",
+            "description": "Seeded job used for statistics benchmarking " * 4,
+            "status": random.choice(STATUSES),
+            "priority": random.choice(PRIORITIES),
+            "industry": random.choice(INDUSTRIES),
+            "estimated_hours": round(random.uniform(1, 200), 1),
+            "actual_hours": round(random.uniform(0, 220), 1),
+            "fixed_price": round(random.uniform(100, 20000), 2),
+            "milestones": [{"id": n, "name": f"Milestone {n}", "completed": False} for n in range(5)],
+            "deliverables": [{"id": n, "name": f"Deliverable {n}"} for n in range(5)],
+            "brand_colors": ["#0088ff", "#ffffff", "#111111"],
+            "created_at": now - timedelta(seconds=random.randint(0, 2 * 365 * 86400)),
+        })
+        if len(batch) == 5000:
+            connection.execute(Job.__table__.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(Job.__table__.insert(), batch)
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return stats.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job statistics strategies")
+    parser.add_argument("--jobs", type=int, default=100_000, help="Number of jobs to seed")
+    parser.add_argument("--customers", type=int, default=500, help="Number of customers to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+
+    with engine.connect() as raw_connection:
+        raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        raw_connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        raw_connection.commit()
+
+        connection = raw_connection.execution_options(schema_translate_map={None: SCHEMA})
+        try:
+            Base.metadata.create_all(connection, tables=[User.__table__, Job.__table__, JobDailyStats.__table__])
+            print(f"🌱 Seeding {args.jobs:,} jobs...")
+            seed(connection, args.jobs, args.customers, now)
+            connection.commit()
+            connection.execute(text(f"ANALYZE {SCHEMA}.jobs"))
+
+            db = Session(bind=connection)
+            rebuild_job_daily_stats(db)
+            connection.execute(text(f"ANALYZE {SCHEMA}.job_daily_stats"))
+            service = JobStatisticsService(db)
+
+            print(f"\n{'period':>8} | {'legacy ms':>10} | {'aggregate ms':>12} | {'rollup ms':>10} | {'speedup':>8}")
+            print("-" * 62)
+            for days in (7, 30, 90, 365):
+                legacy = legacy_statistics(db, days, now)
+                rollup = service.get_statistics(days, now=now)
+                assert legacy["job_counts"] == rollup["job_counts"], (legacy["job_counts"], rollup["job_counts"])
+                assert legacy["priority_distribution"] == rollup["priority_distribution"]
+                db.expunge_all()
+
+                legacy_ms = timed(lambda: (legacy_statistics(db, days, now), db.expunge_all()), args.repeat)
+                aggregate_ms = timed(lambda: service.get_statistics(days, use_rollup=False, now=now), args.repeat)
+                rollup_ms = timed(lambda: service.get_statistics(days, now=now), args.repeat)
+                print(f"{days:>7}d | {legacy_ms:>10.1f} | {aggregate_ms:>12.1f} | {rollup_ms:>10.1f} | {legacy_ms / rollup_ms:>7.1f}x")
+
+            db.close()
+        finally:
+            connection.rollback()
+            raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            raw_connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark login latency under concurrent bcrypt load.
+
+Simulates bursts of concurrent logins, each doing one bcrypt verify, while a
+stream of lightweight requests (e.g. /health, a cached read) keeps arriving on
+the same event loop. Two login styles are compared:
+
+- inline: pwd_context.verify inside ``async def`` (the old handlers - the loop stalls)
+- pool: services.password_hasher.verify_password_async (bounded bcrypt thread pool)
+
+Reports login p50/p99 and the p99 of the lightweight requests, which is what
+every other user of the worker sees while logins are in progress. No database
+is needed.
+
+Usage (from backend/):
+    python scripts/benchmark_login.py --logins 200 --concurrency 10 50 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+async def run(style: str, login, total: int, concurrency: int, interval_ms: float):
+    login_latencies, light_latencies = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def one_login():
+        async with semaphore:
+            started = time.perf_counter()
+            await login()
+            login_latencies.append((time.perf_counter() - started) * 1000)
+
+    async def light_traffic():
+        # A request that needs almost no CPU; its latency is pure event-loop delay
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            light_latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(interval_ms / 1000)
+
+    light = asyncio.create_task(light_traffic())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await light
+
+    return {
+        "logins_per_s": total / elapsed,
+        "login_p50": percentile(login_latencies, 0.50),
+        "login_p99": percentile(login_latencies, 0.99),
+        "light_p99": percentile(light_latencies, 0.99) if light_latencies else 0.0,
+    }
+
+
+async def bench(args) -> None:
+    from services import password_hasher
+    from services.password_hasher import pwd_context, verify_password_async
+
+    stored_hash = pwd_context.hash(PASSWORD)
+
+    async def inline():
+        pwd_context.verify(PASSWORD, stored_hash)
+
+    async def pool():
+        await verify_password_async(PASSWORD, stored_hash)
+
+    styles = [("inline", inline), ("pool", pool)]
+    print(f"bcrypt rounds {args.rounds}, pool workers {password_hasher.config.PASSWORD_HASH_WORKERS}, "
+          f"max pending {password_hasher.config.PASSWORD_HASH_MAX_PENDING}")
+    print(f"\n{'concurrency':>11} | {'style':>6} | {'logins/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'light p99 ms':>12}")
+    print("-" * 70)
+    for concurrency in args.concurrency:
+        for style, login in styles:
+            result = await run(style, login, args.logins, concurrency, args.interval_ms)
+            print(f"{concurrency:>11} | {style:>6} | {result['logins_per_s']:>8.1f} | {result['login_p50']:>8.1f} | "
+                  f"{result['login_p99']:>8.1f} | {result['light_p99']:>12.2f}")
+
+    snapshot = password_hasher.get_hasher_stats()
+    print(f"\npool: completed {snapshot['completed']}, rejected {snapshot['rejected']}, "
+          f"avg queue wait {snapshot['queue_wait_avg_ms']}ms, avg hash {snapshot['hash_avg_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login latency with inline vs pooled bcrypt")
+    parser.add_argument("--logins", type=int, default=200, help="Logins per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50], help="Concurrent logins")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing pool size (default: PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--interval-ms", type=float, default=5, help="Gap between lightweight requests")
+    args = parser.parse_args()
+
+    # The hashing pool reads these at import
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(max(args.concurrency)))
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark voice transcript parsing: the legacy TwilioVoiceHelper scans vs the
+compiled matcher and date/time grammars in utils/speech_parsing.py.
+
+Runs intent, date and time extraction over a corpus of transcripts and reports
+utterances per second for each. It also reports how often the two intent
+resolvers agree and lists examples where they differ, since the compiled
+matcher scores keyword hits instead of taking the first intent with any
+substring hit.
+
+--corpus reads one transcript per line. Without it, a synthetic corpus of
+caller utterances is generated.
+
+Usage (from backend/, no database needed):
+    python scripts/benchmark_speech_parsing.py --utterances 20000
+    python scripts/benchmark_speech_parsing.py --corpus transcripts.txt
+"""
+import argparse
+import os
+import random
+import re
+import statistics as stats
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.speech_parsing import extract_date, extract_time
+from utils.twilio_helpers import TwilioVoiceHelper
+
+OPENERS = ["", "hi, ", "hello there, ", "yeah so ", "um, ", "good morning, ", "hey it's sam, "]
+REQUESTS = [
+    "I'd like to book an appointment {day} at {time}",
+    "can you schedule a meeting for {day} around {time}",
+    "I need to cancel my appointment {day}",
+    "please reschedule my meeting to {day} at {time}",
+    "what are my upcoming appointments",
+    "when is my next appointment",
+    "what's the status of my website project",
+    "how is the progress on my jobs",
+    "I want to change the homepage banner color",
+    "can you add a contact form to the site",
+    "what change requests do I have pending",
+    "are there any available slots {day}",
+    "what times are free {day} {time}",
+    "my name is jordan and my email is jordan@example.com",
+    "call me back at 555-123-4567",
+]
+DAYS = ["today", "tomorrow", "next tuesday", "friday", "in two weeks", "on 9/30", "september 30th", "the day after tomorrow", ""]
+TIMES = ["3pm", "10:30 am", "ten in the morning", "noon", "four thirty p.m.", "15:00", "the afternoon", ""]
+CLOSERS = ["", " please", " if that works", ", thanks", " I think"]
+
+
+# ---------- legacy implementations (as they were before the compiled engine) ----------
+
+def legacy_intent(speech_text: str) -> str:
+    text_lower = speech_text.lower()
+    for intent, keywords in TwilioVoiceHelper.INTENT_KEYWORDS.items():
+        if any(keyword in text_lower for keyword in keywords):
+            return intent
+    return "find_or_create_customer"
+
+
+def legacy_date(speech_text: str):
+    text_lower = speech_text.lower()
+    if "today" in text_lower:
+        return datetime.now().strftime("%Y-%m-%d")
+    if "tomorrow" in text_lower:
+        return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+    for i, day in enumerate(days):
+        if day in text_lower:
+            today = datetime.now()
+            days_ahead = (i - today.weekday()) % 7
+            if days_ahead == 0:
+                days_ahead = 7
+            return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+    date_match = re.search(r"(\d{1,2})[\/\-](\d{1,2})(?:[\/\-](\d{4}))?", speech_text)
+    if date_match:
+        month, day, year = date_match.groups()
+        year = year or str(datetime.now().year)
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    return None
+
+
+def legacy_time(speech_text: str):
+    text_lower = speech_text.lower()
+    time_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)", text_lower)
+    if time_match:
+        hour, minute, period = time_match.groups()
+        hour, minute = int(hour), int(minute or 0)
+        if period == "pm" and hour != 12:
+            hour += 12
+        elif period == "am" and hour == 12:
+            hour = 0
+        return f"{hour:02d}:{minute:02d}"
+    time_match = re.search(r"(\d{1,2}):(\d{2})", speech_text)
+    if time_match:
+        hour, minute = time_match.groups()
+        return f"{int(hour):02d}:{int(minute):02d}"
+    for expr, time_val in {"morning": "09:00", "afternoon": "14:00", "evening": "18:00", "noon": "12:00", "midnight": "00:00"}.items():
+        if expr in text_lower:
+            return time_val
+    return None
+
+
+def synthetic_corpus(size: int):
+    random.seed(42)
+    return [
+        (random.choice(OPENERS)
+         + random.choice(REQUESTS).format(day=random.choice(DAYS), time=random.choice(TIMES))
+         + random.choice(CLOSERS)).replace("  ", " ").strip()
+        for _ in range(size)
+    ]
+
+
+def throughput(fn, corpus, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for utterance in corpus:
+            fn(utterance)
+        samples.append(time.perf_counter() - started)
+    return len(corpus) / stats.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs compiled transcript parsing")
+    parser.add_argument("--corpus", help="File with one transcript per line (default: synthetic corpus)")
+    parser.add_argument("--utterances", type=int, default=20_000, help="Synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--examples", type=int, default=8, help="Intent disagreements to print")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as handle:
+            corpus = [line.strip() for line in handle if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.utterances)
+    print(f"📜 {len(corpus):,} transcripts\n")
+
+    print(f"{'extractor':>10} | {'legacy/s':>10} | {'compiled/s':>10} | {'speedup':>7}")
+    print("-" * 48)
+    for name, legacy, compiled in (
+        ("intent", legacy_intent, TwilioVoiceHelper.extract_intent),
+        ("date", legacy_date, extract_date),
+        ("time", legacy_time, extract_time),
+    ):
+        legacy_rate = throughput(legacy, corpus, args.repeat)
+        compiled_rate = throughput(compiled, corpus, args.repeat)
+        print(f"{name:>10} | {legacy_rate:>10,.0f} | {compiled_rate:>10,.0f} | {compiled_rate / legacy_rate:>6.1f}x")
+
+    disagreements = [(u, legacy_intent(u), TwilioVoiceHelper.extract_intent(u)) for u in corpus]
+    disagreements = [row for row in disagreements if row[1] != row[2]]
+    agreement = 1 - len(disagreements) / len(corpus)
+    print(f"\nIntent agreement with legacy resolver: {agreement:.1%}")
+    seen = set()
+    for utterance, old, new in disagreements:
+        if utterance in seen or len(seen) >= args.examples:
+            continue
+        seen.add(utterance)
+        print(f"  {old:>26} -> {new:<26} {utterance!r}")
+
+    date_found = sum(1 for u in corpus if extract_date(u)) / len(corpus)
+    legacy_date_found = sum(1 for u in corpus if legacy_date(u)) / len(corpus)
+    print(f"\nDates recognised: legacy {legacy_date_found:.1%}, compiled {date_found:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Startup import-time benchmark and profile.
+
+Each run imports ``main`` in a fresh interpreter (what every worker pays on
+boot). It reports the median import time and checks that the heavy SDKs
+(stripe, openai, Google API client, aiohttp) are not loaded by startup. Exits
+non-zero when the median exceeds --budget-ms or a deferred SDK was imported,
+so it can run as a regression check in CI.
+
+--profile runs one import under ``python -X importtime`` and lists the
+slowest modules (cumulative) and top-level packages (self time).
+
+Usage (from backend/):
+    python scripts/benchmark_startup.py --runs 5 --budget-ms 1500
+    python scripts/benchmark_startup.py --profile --top 30
+"""
+import argparse
+import json
+import os
+import statistics as stats
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED_MODULES = ("stripe", "openai", "googleapiclient", "google_auth_oauthlib", "aiohttp")
+
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "modules": len(sys.modules),
+    "deferred_loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def run_child(extra_args=()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+
+
+def measure(runs: int, budget_ms: float) -> int:
+    samples, result = [], None
+    for _ in range(runs):
+        completed = run_child()
+        if completed.returncode != 0:
+            print(completed.stderr)
+            print("❌ import main failed")
+            return 1
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        samples.append(result["elapsed_ms"])
+
+    median_ms = stats.median(samples)
+    print(f"{'runs':>12}: {runs}")
+    print(f"{'median ms':>12}: {median_ms:.0f}")
+    print(f"{'min / max':>12}: {min(samples):.0f} / {max(samples):.0f}")
+    print(f"{'modules':>12}: {result['modules']}")
+    print(f"{'deferred':>12}: {', '.join(result['deferred_loaded']) or 'none loaded'}")
+
+    failed = False
+    if result["deferred_loaded"]:
+        print(f"❌ Heavy SDKs imported at startup: {', '.join(result['deferred_loaded'])}")
+        failed = True
+    if budget_ms and median_ms > budget_ms:
+        print(f"❌ Startup import time {median_ms:.0f}ms exceeds budget {budget_ms:.0f}ms")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    return 1 if failed else 0
+
+
+def profile(top: int) -> int:
+    completed = run_child(("-X", "importtime"))
+    if completed.returncode != 0:
+        print(completed.stderr)
+        print("❌ import main failed")
+        return 1
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    by_package = {}
+    for name, self_us, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"\nSlowest modules by cumulative import time (top {top})")
+    print(f"{'cumulative ms':>14} | {'self ms':>8} | module")
+    print("-" * 60)
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} | {self_us / 1000:>8.1f} | {name}")
+
+    print(f"\nTop-level packages by self import time (top {top})")
+    print(f"{'self ms':>8} | package")
+    print("-" * 40)
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:>8.1f} | {package}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and profile backend startup imports")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Fail when the median import exceeds this (0 = no budget)")
+    parser.add_argument("--profile", action="store_true", help="Show a per-module import-time profile instead")
+    parser.add_argument("--top", type=int, default=25, help="Rows to show in the profile")
+    args = parser.parse_args()
+
+    sys.exit(profile(args.top) if args.profile else measure(args.runs, args.budget_ms))
+
+
+if __name__ == "__main__":
+    main()
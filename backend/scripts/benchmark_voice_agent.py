@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Voice agent turn latency benchmark with a per-intent p95 budget.
+
+Simulates calls against /api/voice/agent by invoking the handler directly:
+each call opens with find_or_create_customer (identified by phone), then
+makes a series of random turns (appointments, jobs, change requests,
+available slots, bookings). Every call runs twice:
+
+- cached: turns carry a session_id, so they share the call's context bundle
+- per-turn: no session_id, so every turn resolves the customer and reloads
+
+Reports p50/p95 per intent for both modes. Exits non-zero when a cached-mode
+intent's p95 exceeds --budget-ms, so it can run as a regression check. Seeds
+an isolated schema and drops it afterwards.
+
+Usage (from backend/, requires DATABASE_URL):
+    python scripts/benchmark_voice_agent.py --calls 200 --turns 6 --budget-ms 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from database import Base, DATABASE_URL, engine
+from models import Appointment, BackgroundJob, CustomerChangeRequest, Job, User
+from api.voice_agent import AgentRequest, voice_agent
+from services.customer_service import caller_cache
+from services.voice_context import voice_contexts
+
+SCHEMA = "bench_voice_agent"
+TABLES = [User.__table__, Job.__table__, CustomerChangeRequest.__table__, Appointment.__table__, BackgroundJob.__table__]
+TURN_INTENTS = [
+    "get_customer_appointments",
+    "jobs_lookup",
+    "list_change_requests",
+    "available_slots",
+    "create_change_request",
+    "schedule_appointment",
+]
+
+
+def phone_for(customer_id: int) -> str:
+    return f"(555) {customer_id // 10000:03d}-{customer_id % 10000:04d}"
+
+
+def seed(connection, customers: int) -> None:
+    random.seed(42)
+    now = datetime.now()
+    connection.execute(User.__table__.insert(), [
+        {"id": i, "email": f"caller{i}@example.com", "password_hash": "x", "user_type": "customer",
+         "is_active": True, "name": f"Caller {i}", "phone": phone_for(i)}
+        for i in range(1, customers + 1)
+    ])
+    connection.execute(Job.__table__.insert(), [
+        {"id": (i - 1) * 3 + n + 1, "customer_id": i, "title": f"Project {n} for {i}",
+         "status": random.choice(["planning", "in_progress", "completed"]), "priority": "medium",
+         "created_at": now - timedelta(days=random.randint(1, 300))}
+        for i in range(1, customers + 1) for n in range(3)
+    ])
+    connection.execute(CustomerChangeRequest.__table__.insert(), [
+        {"job_id": (i - 1) * 3 + 1, "customer_id": i, "title": f"Change {n}", "description": "Seeded change request",
+         "status": random.choice(["pending", "reviewing", "implemented"]), "priority": "normal", "requested_via": "portal"}
+        for i in range(1, customers + 1) for n in range(4)
+    ])
+    connection.execute(Appointment.__table__.insert(), [
+        {"customer_id": i, "scheduled_date": (now + timedelta(days=random.randint(1, 60))).replace(minute=0, second=0, microsecond=0),
+         "duration_minutes": 30, "appointment_type": "consultation", "status": "scheduled", "created_at": now}
+        for i in range(1, customers + 1) for _ in range(3)
+    ])
+    connection.execute(text(f"SELECT setval(pg_get_serial_sequence('{SCHEMA}.jobs', 'id'), max(id)) FROM {SCHEMA}.jobs"))
+
+
+def turn_request(intent: str, customer_id: int, session_id) -> AgentRequest:
+    day = (datetime.now() + timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d")
+    return AgentRequest(
+        intent=intent,
+        phone=phone_for(customer_id),
+        session_id=session_id,
+        preferred_date=day,
+        preferred_time=f"{random.randint(10, 20)}:{random.choice(['00', '30'])}",
+        job_title=f"Project 0 for {customer_id}",
+        change_title="Voice change",
+        change_description="Requested during a benchmark call",
+    )
+
+
+async def run_calls(session_factory, calls: int, turns: int, customers: int, cached: bool):
+    latencies = defaultdict(list)
+    random.seed(7)
+    for _ in range(calls):
+        customer_id = random.randint(1, customers)
+        session_id = str(uuid.uuid4()) if cached else None
+        intents = ["find_or_create_customer"] + [random.choice(TURN_INTENTS) for _ in range(turns)]
+        with session_factory() as db:
+            for intent in intents:
+                started = time.perf_counter()
+                await voice_agent(turn_request(intent, customer_id, session_id), db=db)
+                latencies[intent].append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+async def bench(args) -> int:
+    bench_engine = create_engine(DATABASE_URL, connect_args={"options": f"-c search_path={SCHEMA}"})
+    session_factory = lambda: Session(bind=bench_engine)
+
+    # Warm the pool and statement caches
+    await run_calls(session_factory, 5, args.turns, args.customers, cached=True)
+
+    results = {}
+    for mode, cached in (("per-turn", False), ("cached", True)):
+        caller_cache.discard_where(lambda _: True)
+        voice_contexts.discard_where(lambda _: True)
+        results[mode] = await run_calls(session_factory, args.calls, args.turns, args.customers, cached)
+    bench_engine.dispose()
+
+    print(f"\n{'intent':>26} | {'mode':>8} | {'turns':>6} | {'p50 ms':>7} | {'p95 ms':>7}")
+    print("-" * 68)
+    over_budget = []
+    for intent in ["find_or_create_customer"] + TURN_INTENTS:
+        for mode in ("per-turn", "cached"):
+            samples = results[mode].get(intent)
+            if not samples:
+                continue
+            p95 = percentile(samples, 0.95)
+            print(f"{intent:>26} | {mode:>8} | {len(samples):>6} | {percentile(samples, 0.50):>7.1f} | {p95:>7.1f}")
+            if mode == "cached" and args.budget_ms and p95 > args.budget_ms:
+                over_budget.append((intent, p95))
+
+    print(f"\ncontext cache: {voice_contexts.stats()}")
+    for intent, p95 in over_budget:
+        print(f"❌ {intent} p95 {p95:.1f}ms exceeds budget {args.budget_ms:.0f}ms")
+    if not over_budget:
+        print(f"✅ Every intent within the {args.budget_ms:.0f}ms p95 budget")
+    return 1 if over_budget else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark voice agent turn latency per intent")
+    parser.add_argument("--calls", type=int, default=200, help="Simulated calls per mode")
+    parser.add_argument("--turns", type=int, default=6, help="Turns per call after identification")
+    parser.add_argument("--customers", type=int, default=2000, help="Customers to seed")
+    parser.add_argument("--budget-ms", type=float, default=100, help="p95 budget per intent, cached mode (0 = no budget)")
+    args = parser.parse_args()
+
+    with engine.connect() as raw_connection:
+        raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        raw_connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        raw_connection.commit()
+
+        connection = raw_connection.execution_options(schema_translate_map={None: SCHEMA})
+        try:
+            Base.metadata.create_all(connection, tables=TABLES)
+            print(f"🌱 Seeding {args.customers:,} customers with jobs, change requests and appointments...")
+            seed(connection, args.customers)
+            connection.commit()
+            for table in TABLES:
+                connection.execute(text(f"ANALYZE {SCHEMA}.{table.name}"))
+            connection.commit()
+
+            exit_code = asyncio.run(bench(args))
+        finally:
+            raw_connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            raw_connection.commit()
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
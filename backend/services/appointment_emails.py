@@ -0,0 +1,377 @@
+"""
+Customer emails for booked and rescheduled appointments.
+
+Sent from the appointment job handlers (services.job_handlers) and the
+appointment helpers; both return False instead of raising on failure.
+"""
+from datetime import date, time
+from services.email_service import email_service
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def send_appointment_confirmation_email(
+    customer_name: str,
+    customer_email: str,
+    appointment_date: date,
+    appointment_time: time,
+    duration_minutes: int,
+    meeting_type: str,
+    notes: Optional[str] = None,
+    calendar_link: Optional[str] = None
+):
+    """
+    Send appointment confirmation email to customer
+    """
+    try:
+        # Format the appointment details
+        formatted_date = appointment_date.strftime('%A, %B %d, %Y')
+        formatted_time = appointment_time.strftime('%I:%M %p')
+        meeting_type_display = meeting_type.replace('_', ' ').title()
+        
+        # Email subject
+        subject = f"Appointment Confirmation - {formatted_date} at {formatted_time}"
+        
+        # Email body (plain text)
+        body = f"""
+Dear {customer_name},
+
+Thank you for scheduling an appointment with StreamlineAI! We truly appreciate your business and look forward to working with you to streamline and automate your business processes.
+
+APPOINTMENT DETAILS:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+📅 Date: {formatted_date}
+🕐 Time: {formatted_time}
+⏱️  Duration: {duration_minutes} minutes
+💻 Meeting Type: {meeting_type_display}
+{f'📝 Notes: {notes}' if notes else ''}
+
+WHAT TO EXPECT:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+During our consultation, we'll discuss:
+• Your current business processes and pain points
+• Automation opportunities tailored to your needs
+• Custom solutions to increase efficiency and productivity
+• Next steps for implementing streamlined workflows
+
+NEXT STEPS:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+1. Mark your calendar - We've included an "Add to Calendar" link below
+2. Prepare any questions about your business processes
+3. Have details about your current workflows ready to discuss
+
+{f'📅 ADD TO YOUR CALENDAR: {calendar_link}' if calendar_link else ''}
+
+We're excited to help transform your business operations and look forward to our upcoming meeting!
+
+If you need to reschedule or have any questions before our appointment, please don't hesitate to reach out.
+
+Best regards,
+The StreamlineAI Team
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+StreamlineAI - Automating Your Success
+🌐 Website: https://stream-lineai.com
+📧 Email: sales@stream-lineai.com
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+        # HTML email body
+        html_body = f"""
+        <html>
+        <head>
+            <style>
+                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f8fafc; margin: 0; padding: 20px; }}
+                .container {{ max-width: 650px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); overflow: hidden; }}
+                .header {{ background: linear-gradient(135deg, #00d4ff 0%, #0099cc 100%); color: white; padding: 30px; text-align: center; }}
+                .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
+                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
+                .content {{ padding: 40px 30px; }}
+                .greeting {{ font-size: 18px; color: #333; margin-bottom: 25px; line-height: 1.5; }}
+                .section {{ margin: 30px 0; }}
+                .section-title {{ font-size: 16px; font-weight: 600; color: #00d4ff; margin-bottom: 15px; border-bottom: 2px solid #00d4ff; padding-bottom: 5px; }}
+                .details-box {{ background: #f8fafc; border: 1px solid #e2e8f0; border-radius: 8px; padding: 20px; margin: 20px 0; }}
+                .detail-item {{ display: flex; align-items: center; margin: 10px 0; font-size: 15px; }}
+                .detail-icon {{ font-size: 18px; margin-right: 12px; min-width: 25px; }}
+                .detail-text {{ color: #4a5568; }}
+                .calendar-button {{ display: inline-block; background: #00d4ff; color: white; padding: 15px 25px; text-decoration: none; border-radius: 6px; font-weight: 600; margin: 20px 0; text-align: center; }}
+                .calendar-button:hover {{ background: #0099cc; }}
+                .expectations {{ background: #f0f9ff; border-left: 4px solid #00d4ff; padding: 20px; margin: 20px 0; }}
+                .expectations ul {{ margin: 10px 0; padding-left: 20px; }}
+                .expectations li {{ margin: 8px 0; color: #4a5568; }}
+                .footer {{ background: #f8fafc; padding: 25px 30px; text-align: center; border-top: 1px solid #e2e8f0; }}
+                .footer-links {{ margin: 15px 0; }}
+                .footer-links a {{ color: #00d4ff; text-decoration: none; margin: 0 10px; }}
+                .logo {{ font-size: 20px; font-weight: 700; color: #00d4ff; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>🚀 Appointment Confirmed!</h1>
+                    <p>We're excited to help streamline your business</p>
+                </div>
+                
+                <div class="content">
+                    <div class="greeting">
+                        Dear <strong>{customer_name}</strong>,
+                        <br><br>
+                        Thank you for scheduling an appointment with <strong>StreamlineAI</strong>! We truly appreciate your business and look forward to working with you to transform and automate your business processes.
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">📅 Appointment Details</div>
+                        <div class="details-box">
+                            <div class="detail-item">
+                                <span class="detail-icon">📅</span>
+                                <span class="detail-text"><strong>Date:</strong> {formatted_date}</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">🕐</span>
+                                <span class="detail-text"><strong>Time:</strong> {formatted_time}</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">⏱️</span>
+                                <span class="detail-text"><strong>Duration:</strong> {duration_minutes} minutes</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">💻</span>
+                                <span class="detail-text"><strong>Meeting Type:</strong> {meeting_type_display}</span>
+                            </div>
+                            {f'<div class="detail-item"><span class="detail-icon">📝</span><span class="detail-text"><strong>Notes:</strong> {notes}</span></div>' if notes else ''}
+                        </div>
+                        
+                        {f'<div style="text-align: center;"><a href="{calendar_link}" class="calendar-button">📅 Add to Google Calendar</a></div>' if calendar_link else ''}
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">🎯 What to Expect</div>
+                        <div class="expectations">
+                            During our consultation, we'll discuss:
+                            <ul>
+                                <li>Your current business processes and pain points</li>
+                                <li>Automation opportunities tailored to your specific needs</li>
+                                <li>Custom solutions to increase efficiency and productivity</li>
+                                <li>Next steps for implementing streamlined workflows</li>
+                            </ul>
+                        </div>
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">✅ Next Steps</div>
+                        <div style="color: #4a5568; line-height: 1.6;">
+                            <strong>1.</strong> Mark your calendar using the button above<br>
+                            <strong>2.</strong> Prepare any questions about your business processes<br>
+                            <strong>3.</strong> Have details about your current workflows ready to discuss
+                        </div>
+                    </div>
+                    
+                    <div style="background: #f0f9ff; border: 1px solid #00d4ff; border-radius: 8px; padding: 20px; margin: 30px 0; text-align: center;">
+                        <p style="margin: 0; color: #0066cc; font-weight: 600;">
+                            We're excited to help transform your business operations!
+                        </p>
+                        <p style="margin: 10px 0 0 0; color: #4a5568;">
+                            If you need to reschedule or have questions, please contact us anytime.
+                        </p>
+                    </div>
+                </div>
+                
+                <div class="footer">
+                    <div class="logo">StreamlineAI</div>
+                    <p style="margin: 5px 0; color: #718096; font-size: 14px;">Automating Your Success</p>
+                    <div class="footer-links">
+                        <a href="https://stream-lineai.com">🌐 Website</a>
+                        <a href="mailto:tech@stream-lineai.com">📧 Contact</a>
+                    </div>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+        
+        # Send email (SMTP runs in a thread pool to not block the event loop)
+        loop = asyncio.get_event_loop()
+        success = await loop.run_in_executor(
+            None,
+            lambda: email_service.send_email(
+                from_account='no-reply',
+                to_emails=[customer_email],
+                subject=subject,
+                body=body,
+                html_body=html_body
+            )
+        )
+        
+        return success
+        
+    except Exception as e:
+        logger.error(f"Error sending appointment confirmation email: {str(e)}")
+        return False
+
+async def send_appointment_update_email(
+    customer_name: str,
+    customer_email: str,
+    appointment_date: date,
+    appointment_time: time,
+    duration_minutes: int,
+    meeting_type: str,
+    notes: Optional[str] = None,
+    calendar_link: Optional[str] = None
+):
+    """
+    Send appointment update notification email to customer
+    """
+    try:
+        # Format the appointment details
+        formatted_date = appointment_date.strftime('%A, %B %d, %Y')
+        formatted_time = appointment_time.strftime('%I:%M %p')
+        meeting_type_display = meeting_type.replace('_', ' ').title()
+        
+        # Email subject
+        subject = f"Appointment Updated - {formatted_date} at {formatted_time}"
+        
+        # Email body (plain text)
+        body = f"""
+Dear {customer_name},
+
+Your StreamlineAI appointment has been updated. Please review the new details below:
+
+UPDATED APPOINTMENT DETAILS:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+📅 Date: {formatted_date}
+🕐 Time: {formatted_time}
+⏱️  Duration: {duration_minutes} minutes
+💻 Meeting Type: {meeting_type_display}
+{f'📝 Notes: {notes}' if notes else ''}
+
+{f'📅 ADD TO YOUR CALENDAR: {calendar_link}' if calendar_link else ''}
+
+We look forward to our upcoming meeting and appreciate your flexibility with this schedule change.
+
+If you have any questions or concerns about this update, please don't hesitate to contact us.
+
+Best regards,
+The StreamlineAI Team
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+StreamlineAI - Automating Your Success
+🌐 Website: https://stream-lineai.com
+📧 Email: sales@stream-lineai.com
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+        # HTML email body
+        html_body = f"""
+        <html>
+        <head>
+            <style>
+                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f8fafc; margin: 0; padding: 20px; }}
+                .container {{ max-width: 650px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); overflow: hidden; }}
+                .header {{ background: linear-gradient(135deg, #f39c12 0%, #e67e22 100%); color: white; padding: 30px; text-align: center; }}
+                .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
+                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
+                .content {{ padding: 40px 30px; }}
+                .greeting {{ font-size: 18px; color: #333; margin-bottom: 25px; line-height: 1.5; }}
+                .section {{ margin: 30px 0; }}
+                .section-title {{ font-size: 16px; font-weight: 600; color: #f39c12; margin-bottom: 15px; border-bottom: 2px solid #f39c12; padding-bottom: 5px; }}
+                .details-box {{ background: #fff5e6; border: 1px solid #f39c12; border-radius: 8px; padding: 20px; margin: 20px 0; }}
+                .detail-item {{ display: flex; align-items: center; margin: 10px 0; font-size: 15px; }}
+                .detail-icon {{ font-size: 18px; margin-right: 12px; min-width: 25px; }}
+                .detail-text {{ color: #4a5568; }}
+                .calendar-button {{ display: inline-block; background: #f39c12; color: white; padding: 15px 25px; text-decoration: none; border-radius: 6px; font-weight: 600; margin: 20px 0; text-align: center; }}
+                .calendar-button:hover {{ background: #e67e22; }}
+                .footer {{ background: #f8fafc; padding: 25px 30px; text-align: center; border-top: 1px solid #e2e8f0; }}
+                .footer-links {{ margin: 15px 0; }}
+                .footer-links a {{ color: #f39c12; text-decoration: none; margin: 0 10px; }}
+                .logo {{ font-size: 20px; font-weight: 700; color: #f39c12; }}
+                .update-notice {{ background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 20px; margin: 20px 0; text-align: center; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>📝 Appointment Updated</h1>
+                    <p>Your appointment details have been changed</p>
+                </div>
+                
+                <div class="content">
+                    <div class="greeting">
+                        Dear <strong>{customer_name}</strong>,
+                        <br><br>
+                        Your <strong>StreamlineAI</strong> appointment has been updated. Please review the new details below and update your calendar accordingly.
+                    </div>
+                    
+                    <div class="update-notice">
+                        <p style="margin: 0; color: #856404; font-weight: 600;">
+                            ⚠️ Please note the updated appointment details
+                        </p>
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">📅 Updated Appointment Details</div>
+                        <div class="details-box">
+                            <div class="detail-item">
+                                <span class="detail-icon">📅</span>
+                                <span class="detail-text"><strong>Date:</strong> {formatted_date}</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">🕐</span>
+                                <span class="detail-text"><strong>Time:</strong> {formatted_time}</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">⏱️</span>
+                                <span class="detail-text"><strong>Duration:</strong> {duration_minutes} minutes</span>
+                            </div>
+                            <div class="detail-item">
+                                <span class="detail-icon">💻</span>
+                                <span class="detail-text"><strong>Meeting Type:</strong> {meeting_type_display}</span>
+                            </div>
+                            {f'<div class="detail-item"><span class="detail-icon">📝</span><span class="detail-text"><strong>Notes:</strong> {notes}</span></div>' if notes else ''}
+                        </div>
+                        
+                        {f'<div style="text-align: center;"><a href="{calendar_link}" class="calendar-button">📅 Update Your Calendar</a></div>' if calendar_link else ''}
+                    </div>
+                    
+                    <div style="background: #f0f9ff; border: 1px solid #00d4ff; border-radius: 8px; padding: 20px; margin: 30px 0; text-align: center;">
+                        <p style="margin: 0; color: #0066cc; font-weight: 600;">
+                            Thank you for your flexibility with this schedule change!
+                        </p>
+                        <p style="margin: 10px 0 0 0; color: #4a5568;">
+                            If you have any questions or concerns about this update, please contact us anytime.
+                        </p>
+                    </div>
+                </div>
+                
+                <div class="footer">
+                    <div class="logo">StreamlineAI</div>
+                    <p style="margin: 5px 0; color: #718096; font-size: 14px;">Automating Your Success</p>
+                    <div class="footer-links">
+                        <a href="https://stream-lineai.com">🌐 Website</a>
+                        <a href="mailto:tech@stream-lineai.com">📧 Contact</a>
+                    </div>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+        
+        # Send email (SMTP runs in a thread pool to not block the event loop)
+        loop = asyncio.get_event_loop()
+        success = await loop.run_in_executor(
+            None,
+            lambda: email_service.send_email(
+                from_account='no-reply',
+                to_emails=[customer_email],
+                subject=subject,
+                body=body,
+                html_body=html_body
+            )
+        )
+        
+        return success
+        
+    except Exception as e:
+        logger.error(f"Error sending appointment update email: {str(e)}")
+        return False
@@ -1,9 +1,40 @@
 from models import Appointment, User
 from services.base_service import BaseService
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Set
 from datetime import datetime, timedelta
 
+# Business hours: 9 AM to 5 PM, 7 days a week (including weekends)
+BUSINESS_START_HOUR = 9
+BUSINESS_END_HOUR = 17
+
+
+def day_slots(date: datetime, duration_minutes: int = 30) -> List[datetime]:
+    """Every slot start inside business hours on ``date``"""
+    slots = []
+    current_time = date.replace(hour=BUSINESS_START_HOUR, minute=0, second=0, microsecond=0)
+    end_time = date.replace(hour=BUSINESS_END_HOUR, minute=0, second=0, microsecond=0)
+    while current_time < end_time:
+        slots.append(current_time)
+        current_time += timedelta(minutes=duration_minutes)
+    return slots
+
+
+async def get_booked_times_async(db: AsyncSession, start: datetime, end: datetime) -> Set[datetime]:
+    """Minute-truncated start times of scheduled appointments in [start, end), in one query"""
+    scheduled = await db.scalars(
+        select(Appointment.scheduled_date).where(
+            Appointment.scheduled_date >= start,
+            Appointment.scheduled_date < end,
+            Appointment.status == "scheduled"
+        )
+    )
+    # Only block the exact time slot, not buffer time
+    return {scheduled_date.replace(second=0, microsecond=0) for scheduled_date in scheduled}
+
+
 class AppointmentService:
     def __init__(self, db: Session):
         self.db = db
@@ -52,19 +83,7 @@ class AppointmentService:
     
     def get_available_slots(self, date: datetime, duration_minutes: int = 30) -> List[datetime]:
         """Get available appointment slots for a given date"""
-        # Business hours: 9 AM to 5 PM, 7 days a week (including weekends)
-        start_hour = 9
-        end_hour = 17
-        slot_duration = duration_minutes
-        
-        # Generate possible slots for any day of the week
-        slots = []
-        current_time = date.replace(hour=start_hour, minute=0, second=0, microsecond=0)
-        end_time = date.replace(hour=end_hour, minute=0, second=0, microsecond=0)
-        
-        while current_time < end_time:
-            slots.append(current_time)
-            current_time += timedelta(minutes=slot_duration)
+        slots = day_slots(date, duration_minutes)
         
         # Remove slots that are already booked (only hard conflicts)
         booked_appointments = self.db.query(Appointment).filter(
@@ -1,19 +1,16 @@
 from models import User, UserType  # Unified model only!
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any
 from jose import jwt, JWTError
-import bcrypt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import os
 import base64
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from database import get_db
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.password_hasher import pwd_context, verify_password_async
 
 # JWT settings - Use environment ENCRYPTION_KEY
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "a24waVZKMmhKNWcybU1fUEV3NU02VjZEUXNNaHZjQnZpOUFNUFhxN2ZhRT0=")
@@ -22,6 +19,51 @@ SECRET_KEY = base64.b64decode(ENCRYPTION_KEY).decode('utf-8')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+def decode_token_claims(token: str) -> Optional[dict]:
+    """Decode an access token into user data without touching the database"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    
+    # Check token type
+    if payload.get("type") != "access_token":
+        return None
+    
+    # Extract user data
+    user_data = {
+        "user_id": payload.get("user_id"),
+        "email": payload.get("email"),
+        "name": payload.get("name"),
+        "user_type": payload.get("user_type"),
+        "is_admin": payload.get("is_admin", False),
+        "is_customer": payload.get("is_customer", False),
+        "is_super_admin": payload.get("is_super_admin", False),
+        "permissions": payload.get("permissions", [])
+    }
+    
+    # Ensure admin flags are properly set based on user_type
+    if user_data["user_type"] == "admin":
+        user_data["is_admin"] = True
+        user_data["is_customer"] = False
+    elif user_data["user_type"] == "customer":
+        user_data["is_admin"] = False
+        user_data["is_customer"] = True
+    
+    return user_data
+
+async def verify_token_async(db: AsyncSession, token: str) -> Optional[dict]:
+    """verify_token for AsyncSession callers: one indexed is_active lookup"""
+    user_data = decode_token_claims(token)
+    if not user_data:
+        return None
+    
+    is_active = await db.scalar(select(User.is_active).where(User.id == user_data["user_id"]))
+    if not is_active:
+        return None
+    
+    return user_data
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
@@ -36,7 +78,38 @@ class AuthService:
     
     def authenticate_user(self, email: str, password: str) -> Optional[dict]:
         """Authenticate user using unified User model"""
+        user = self._login_candidate(email)
+        if not user:
+            return None
+            
+        if not self.verify_password(password, user.password_hash):
+            print(f"❌ Authentication failed: Invalid password for user '{email}'")
+            return None
+        
+        return self._login_result(user, email)
+    
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[dict]:
+        """authenticate_user with the bcrypt check on the hashing pool.
+        
+        Hashes made with an outdated cost factor are replaced on a successful login.
+        """
+        user = self._login_candidate(email)
+        if not user:
+            return None
+        
+        valid, new_hash = await verify_password_async(password, user.password_hash)
+        if not valid:
+            print(f"❌ Authentication failed: Invalid password for user '{email}'")
+            return None
+        
+        if new_hash:
+            user.password_hash = new_hash
+            self.db.commit()
         
+        return self._login_result(user, email)
+    
+    def _login_candidate(self, email: str) -> Optional[User]:
+        """The user for an email, if it has a password to check"""
         # Use unified model - no fallback!
         user = self.db.query(User).filter(User.email.ilike(email)).first()
         
@@ -47,11 +120,11 @@ class AuthService:
         if not user.password_hash:
             print(f"❌ Authentication failed: User '{email}' has no password hash")
             return None
-            
-        if not self.verify_password(password, user.password_hash):
-            print(f"❌ Authentication failed: Invalid password for user '{email}'")
-            return None
-            
+        
+        return user
+    
+    def _login_result(self, user: User, email: str) -> Optional[dict]:
+        """Login response for a user whose password matched"""
         if not user.is_active:
             print(f"❌ Authentication failed: User '{email}' is not active (status: {user.status})")
             return None
@@ -132,43 +205,16 @@ class AuthService:
     
     def verify_token(self, token: str) -> Optional[dict]:
         """Verify JWT token and return user data"""
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            
-            # Check token type
-            if payload.get("type") != "access_token":
-                return None
-            
-            # Extract user data
-            user_data = {
-                "user_id": payload.get("user_id"),
-                "email": payload.get("email"),
-                "name": payload.get("name"),
-                "user_type": payload.get("user_type"),
-                "is_admin": payload.get("is_admin", False),
-                "is_customer": payload.get("is_customer", False),
-                "is_super_admin": payload.get("is_super_admin", False),
-                "permissions": payload.get("permissions", [])
-            }
-            
-            # Ensure admin flags are properly set based on user_type
-            if user_data["user_type"] == "admin":
-                user_data["is_admin"] = True
-                user_data["is_customer"] = False
-            elif user_data["user_type"] == "customer":
-                user_data["is_admin"] = False
-                user_data["is_customer"] = True
-            
-            
-            # Verify user still exists and is active - unified approach only
-            user = self.db.query(User).filter(User.id == user_data["user_id"]).first()
-            if not user or not user.is_active:
-                return None
-            
-            return user_data
-            
-        except JWTError:
+        user_data = decode_token_claims(token)
+        if not user_data:
+            return None
+        
+        # Verify user still exists and is active - unified approach only
+        user = self.db.query(User).filter(User.id == user_data["user_id"]).first()
+        if not user or not user.is_active:
             return None
+        
+        return user_data
     
     def get_user_from_token(self, token: str) -> Optional[dict]:
         """Get user data from JWT token"""
@@ -0,0 +1,425 @@
+"""
+Durable background jobs.
+
+Side effects that should not hold up a response (emails, notifications) are
+queued as rows in background_jobs inside the caller's transaction:
+
+    enqueue_job(db, SEND_VERIFICATION_EMAIL, {"to_email": ..., ...})
+    db.commit()
+
+so a job exists exactly when the change that caused it was committed. A
+runner thread per API process (own event loop, like the Stripe webhook
+workers) claims due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and runs
+the registered handler with the payload as keyword arguments.
+
+Job types are registered with ``@job_handler(name, concurrency=...)``; the
+concurrency is the number of jobs of that type one process runs at once.
+Failures are retried with exponential backoff up to max_attempts, then parked
+as ``failed``. Jobs left in ``processing`` by a crashed process return to the
+queue after PROCESSING_TIMEOUT. On shutdown the runner stops claiming, waits
+up to JOB_DRAIN_TIMEOUT_SECONDS for running jobs, and puts any it had to
+cancel back in the queue. Succeeded jobs are kept for JOB_RETENTION_DAYS
+(services.maintenance); failed ones until retried.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+
+from config import config
+from database import SessionLocal
+from models.background_job_models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+POLL_INTERVAL = 5.0  # seconds; commits that enqueue wake the runner immediately in-process
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+RETRY_BASE_DELAY = 15  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 3600
+
+
+@dataclass
+class JobType:
+    name: str
+    handler: Callable[..., Awaitable[Any]]
+    concurrency: int
+    max_attempts: int
+    timeout: float
+
+
+_job_types: Dict[str, JobType] = {}
+
+
+def job_handler(name: str, concurrency: int = 2, max_attempts: Optional[int] = None, timeout: float = 120.0):
+    """Register an async handler ``handler(db, **payload)`` for a job type"""
+    def register(handler):
+        _job_types[name] = JobType(
+            name=name,
+            handler=handler,
+            concurrency=concurrency,
+            max_attempts=max_attempts or config.JOB_MAX_ATTEMPTS,
+            timeout=timeout
+        )
+        return handler
+    return register
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY))
+
+
+_ENQUEUED_KEY = "background_jobs_enqueued"
+
+
+def enqueue_job(db: Session, job_type: str, payload: Dict[str, Any], run_at: Optional[datetime] = None) -> BackgroundJob:
+    """Add a job to the caller's transaction; it becomes runnable when the caller commits.
+
+    The payload must be JSON-serializable and match the handler's keyword
+    arguments, which is checked here rather than on the first attempt.
+    """
+    spec = _job_types.get(job_type)
+    if spec is None:
+        raise ValueError(f"Unknown job type: {job_type}")
+    try:
+        inspect.signature(spec.handler).bind(db, **payload)
+    except TypeError as e:
+        raise ValueError(f"Invalid payload for {job_type}: {str(e)}")
+
+    job = BackgroundJob(
+        job_type=job_type,
+        payload=payload,
+        status=PENDING,
+        attempts=0,
+        max_attempts=spec.max_attempts
+    )
+    if run_at is not None:
+        job.next_attempt_at = run_at
+    db.add(job)
+    db.info[_ENQUEUED_KEY] = True
+    return job
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session):
+    if session.info.pop(_ENQUEUED_KEY, False):
+        job_runner.notify()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop(_ENQUEUED_KEY, None)
+
+
+def claim_jobs(db: Session, job_type: str, limit: int) -> List[int]:
+    """Lock and mark up to ``limit`` due jobs of one type as processing, oldest first; returns their ids"""
+    now = datetime.now(timezone.utc)
+    jobs = db.query(BackgroundJob).filter(
+        BackgroundJob.job_type == job_type,
+        BackgroundJob.status == PENDING,
+        BackgroundJob.next_attempt_at <= now
+    ).order_by(
+        BackgroundJob.next_attempt_at,
+        BackgroundJob.id
+    ).limit(limit).with_for_update(skip_locked=True).all()
+
+    job_ids = []
+    for job in jobs:
+        job.status = PROCESSING
+        job.claimed_at = now
+        job.attempts = (job.attempts or 0) + 1
+        job_ids.append(job.id)
+    db.commit()
+    return job_ids
+
+
+def release_stale_jobs(db: Session) -> int:
+    """Return jobs stuck in processing (process died mid-job) to the queue"""
+    cutoff = datetime.now(timezone.utc) - PROCESSING_TIMEOUT
+    result = db.execute(
+        update(BackgroundJob).where(
+            BackgroundJob.status == PROCESSING,
+            BackgroundJob.claimed_at < cutoff
+        ).values(status=PENDING, next_attempt_at=func.now())
+    )
+    db.commit()
+    if result.rowcount:
+        logger.warning(f"Released {result.rowcount} stale background jobs")
+    return result.rowcount
+
+
+class JobTypeMetrics:
+    """In-process counters for one job type"""
+
+    def __init__(self):
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def record(self, outcome: str, duration: float) -> None:
+        self.total_seconds += duration
+        if outcome == SUCCEEDED:
+            self.succeeded += 1
+        elif outcome == FAILED:
+            self.failed += 1
+        else:
+            self.retried += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        handled = self.succeeded + self.failed + self.retried
+        return {
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "avg_ms": round(self.total_seconds / handled * 1000, 1) if handled else 0.0
+        }
+
+
+class BackgroundJobRunner:
+    """One thread with its own event loop, running claimed jobs concurrently up to each type's limit"""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._metrics: Dict[str, JobTypeMetrics] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="background-job-runner", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logger.info(f"Started background job runner ({', '.join(sorted(_job_types)) or 'no job types'})")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming, let running jobs finish within the drain timeout, re-queue the rest"""
+        if not self.running:
+            return
+        drain_timeout = config.JOB_DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        self._stopping = True
+        self.notify()
+        # Cancelled jobs still need a moment to write themselves back to the queue
+        self._thread.join(drain_timeout + 5)
+        if self._thread.is_alive():
+            logger.warning("Background job runner did not stop in time")
+        self._thread = None
+
+    def notify(self) -> None:
+        """Wake the runner after jobs were committed or slots freed up"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "job_types": {
+                    name: {"concurrency": spec.concurrency, **self._metrics_for(name).snapshot()}
+                    for name, spec in sorted(_job_types.items())
+                }
+            }
+
+    def _metrics_for(self, job_type: str) -> JobTypeMetrics:
+        metrics = self._metrics.get(job_type)
+        if metrics is None:
+            metrics = self._metrics[job_type] = JobTypeMetrics()
+        return metrics
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._wakeup = asyncio.Event()
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_until_complete(self._main())
+        finally:
+            self._loop = None
+            loop.close()
+
+    async def _main(self) -> None:
+        last_stale_check = 0.0
+        while not self._stopping:
+            if time.monotonic() - last_stale_check > PROCESSING_TIMEOUT.total_seconds() / 2:
+                last_stale_check = time.monotonic()
+                self._with_session(release_stale_jobs)
+
+            self._wakeup.clear()
+            for spec in list(_job_types.values()):
+                with self._lock:
+                    free = spec.concurrency - self._metrics_for(spec.name).running
+                if free <= 0:
+                    continue
+                claimed = self._with_session(lambda db: claim_jobs(db, spec.name, free)) or []
+                for job_id in claimed:
+                    self._spawn(spec, job_id)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+        await self._drain()
+
+    async def _drain(self) -> None:
+        if not self._tasks:
+            return
+        logger.info(f"Waiting for {len(self._tasks)} background job(s) to finish")
+        _, still_running = await asyncio.wait(set(self._tasks), timeout=config.JOB_DRAIN_TIMEOUT_SECONDS)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            await asyncio.gather(*still_running, return_exceptions=True)
+            logger.warning(f"Re-queued {len(still_running)} background job(s) cancelled at shutdown")
+
+    def _spawn(self, spec: JobType, job_id: int) -> None:
+        with self._lock:
+            self._metrics_for(spec.name).running += 1
+        task = asyncio.ensure_future(self._execute(spec, job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._job_done(spec.name))
+
+    def _job_done(self, job_type: str):
+        def done(task: asyncio.Task) -> None:
+            self._tasks.discard(task)
+            with self._lock:
+                self._metrics_for(job_type).running -= 1
+            self._wakeup.set()  # A slot is free
+        return done
+
+    async def _execute(self, spec: JobType, job_id: int) -> None:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+            if not job or job.status != PROCESSING:
+                return
+            payload = dict(job.payload or {})
+            db.commit()  # Don't hold the row's snapshot open while the handler runs
+
+            try:
+                await asyncio.wait_for(spec.handler(db, **payload), spec.timeout)
+            except asyncio.CancelledError:
+                db.rollback()
+                db.execute(
+                    update(BackgroundJob).where(BackgroundJob.id == job_id).values(
+                        status=PENDING,
+                        attempts=BackgroundJob.attempts - 1,
+                        next_attempt_at=func.now()
+                    )
+                )
+                db.commit()
+                raise
+            except Exception as e:
+                db.rollback()
+                error = str(e) or type(e).__name__
+                job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+                job.last_error = error
+                if job.attempts >= job.max_attempts:
+                    job.status = FAILED
+                    job.finished_at = datetime.now(timezone.utc)
+                    outcome = FAILED
+                    logger.error(f"Background job {job_id} ({spec.name}) failed permanently: {error}")
+                else:
+                    job.status = PENDING
+                    job.next_attempt_at = datetime.now(timezone.utc) + retry_delay(job.attempts)
+                    outcome = PENDING
+                    logger.warning(f"Background job {job_id} ({spec.name}) failed (attempt {job.attempts}), will retry: {error}")
+                db.commit()
+            else:
+                db.execute(
+                    update(BackgroundJob).where(BackgroundJob.id == job_id).values(
+                        status=SUCCEEDED,
+                        finished_at=func.now(),
+                        last_error=None
+                    )
+                )
+                db.commit()
+                outcome = SUCCEEDED
+
+            with self._lock:
+                self._metrics_for(spec.name).record(outcome, time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Background job {job_id} ({spec.name}) could not be recorded: {str(e)}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _with_session(fn):
+        db = SessionLocal()
+        try:
+            return fn(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Background job queue error: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+
+job_runner = BackgroundJobRunner()
+
+
+def get_job_stats(db: Session) -> Dict[str, Any]:
+    """Unfinished and failed jobs per type from the database, plus this process's runner counters"""
+    now = datetime.now(timezone.utc)
+    queue: Dict[str, Dict[str, Any]] = {}
+    rows = db.query(
+        BackgroundJob.job_type,
+        BackgroundJob.status,
+        func.count(BackgroundJob.id),
+        func.min(BackgroundJob.next_attempt_at)
+    ).filter(
+        BackgroundJob.status.in_((PENDING, PROCESSING, FAILED))
+    ).group_by(BackgroundJob.job_type, BackgroundJob.status).all()
+
+    for job_type, status, count, oldest_due in rows:
+        entry = queue.setdefault(job_type, {PENDING: 0, PROCESSING: 0, FAILED: 0, "lag_seconds": 0.0})
+        entry[status] = count
+        if status == PENDING and oldest_due is not None and oldest_due < now:
+            entry["lag_seconds"] = round((now - oldest_due).total_seconds(), 1)
+
+    return {"queue": queue, "runner": job_runner.stats()}
+
+
+def retry_failed_jobs(db: Session, job_ids: Optional[List[int]] = None) -> int:
+    """Re-queue failed jobs (all, or the given ids) for another round of attempts"""
+    stmt = update(BackgroundJob).where(BackgroundJob.status == FAILED)
+    if job_ids:
+        stmt = stmt.where(BackgroundJob.id.in_(job_ids))
+    result = db.execute(stmt.values(status=PENDING, attempts=0, finished_at=None, next_attempt_at=func.now()))
+    db.commit()
+    job_runner.notify()
+    return result.rowcount
@@ -2,6 +2,7 @@ from models import CustomerChangeRequest, Job, User
 from services.email_service import EmailService
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 import os
 import logging
 
@@ -192,14 +193,18 @@ StreamlineAI Automation System
         </html>
         """
         
-        # Send to tech team
+        # Send to tech team (SMTP runs in a thread pool to not block the event loop)
         email_service = EmailService()
-        success = email_service.send_email(
-            to_emails=['tech@stream-lineai.com'],
-            from_account='no-reply',
-            subject=subject,
-            body=body,
-            html_body=html_body
+        loop = asyncio.get_event_loop()
+        success = await loop.run_in_executor(
+            None,
+            lambda: email_service.send_email(
+                to_emails=['tech@stream-lineai.com'],
+                from_account='no-reply',
+                subject=subject,
+                body=body,
+                html_body=html_body
+            )
         )
         
         if success:
@@ -0,0 +1,239 @@
+"""
+Write-behind buffer for chat message inserts.
+
+SessionService.add_message used to look up the session, then insert, commit
+and refresh each message. That is two or three round trips and a WAL flush per
+message. Messages now go into an in-process buffer instead. A flusher thread
+writes them with one multi-row INSERT per batch every
+CHAT_MESSAGE_FLUSH_INTERVAL_MS, or as soon as CHAT_MESSAGE_BATCH_SIZE are
+waiting. A message therefore reaches the database within one interval plus
+the insert time.
+
+Read-your-writes: SessionService flushes before reading a session that has
+buffered messages, so reads in the same worker always include them. Other
+workers can see a message up to one interval late.
+
+message_id and timestamp are assigned when the message is added, so
+ordering reflects when messages arrived rather than when they were flushed.
+lifespan flushes what is left on shutdown; a crash loses at most one
+interval of messages. If more than CHAT_MESSAGE_MAX_PENDING messages are
+waiting (e.g. the database is down), add() flushes inline and surfaces the
+error. CHAT_MESSAGE_FLUSH_INTERVAL_MS=0 disables buffering, and add_message
+writes through as before.
+
+Rows carry chat_sessions.id, which SessionService caches per worker. If
+another worker deleted the session, the insert fails its foreign key; the
+flush then looks the public session_id up again (recreating the session if
+needed), repoints the worker's cache and writes the rows there.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from config import config
+from database import SessionLocal
+from models import ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+
+class ChatMessageBuffer:
+    """Batches chat_messages rows and writes them from a background thread"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval_ms: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.interval_ms = config.CHAT_MESSAGE_FLUSH_INTERVAL_MS if interval_ms is None else interval_ms
+        self.batch_size = batch_size or config.CHAT_MESSAGE_BATCH_SIZE
+        self.max_pending = max_pending or config.CHAT_MESSAGE_MAX_PENDING
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One batch in flight at a time keeps inserts in order
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_by_session: Dict[int, int] = {}  # Buffered or in-flight rows per chat_sessions.id
+        self._session_keys: Dict[int, str] = {}  # Public session_id per buffered chat_sessions.id
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.sessions_recovered = 0
+        self.largest_batch = 0
+        self.flush_total_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_ms > 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or not self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chat-message-flusher", daemon=True)
+        self._thread.start()
+        logger.info(f"Started chat message flusher ({self.interval_ms:g} ms interval)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and write everything still buffered"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush(raise_errors=False)
+
+    def add(self, row: Dict[str, Any], session_key: Optional[str] = None) -> None:
+        """Buffer a chat_messages row; session_key is the public session_id, used if the row's session is gone"""
+        with self._lock:
+            self._pending.append(row)
+            self._pending_by_session[row["session_id"]] = self._pending_by_session.get(row["session_id"], 0) + 1
+            if session_key is not None:
+                self._session_keys[row["session_id"]] = session_key
+            self.enqueued += 1
+            waiting = len(self._pending)
+
+        if waiting >= self.max_pending or not self.running:
+            self.flush()
+        elif waiting >= self.batch_size:
+            self._wakeup.set()
+
+    def has_pending(self, session_pk: int) -> bool:
+        return session_pk in self._pending_by_session
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self, raise_errors: bool = True) -> int:
+        """Write every buffered row now; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                try:
+                    db.execute(insert(ChatMessage.__table__), batch)
+                    db.commit()
+                except IntegrityError:
+                    # A session deleted after its messages were buffered
+                    db.rollback()
+                    self._insert_individually(db, batch)
+            except Exception as e:
+                db.rollback()
+                with self._lock:
+                    self._pending = batch + self._pending
+                    self.failures += 1
+                logger.error(f"Chat message flush of {len(batch)} rows failed: {str(e)}")
+                if raise_errors:
+                    raise
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                for row in batch:
+                    remaining = self._pending_by_session[row["session_id"]] - 1
+                    if remaining:
+                        self._pending_by_session[row["session_id"]] = remaining
+                    else:
+                        del self._pending_by_session[row["session_id"]]
+                        self._session_keys.pop(row["session_id"], None)
+                self.flushed += len(batch)
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self.flush_total_ms += (time.perf_counter() - started) * 1000
+            return len(batch)
+
+    def _insert_individually(self, db, batch: List[Dict[str, Any]]) -> None:
+        moved: Dict[int, Optional[int]] = {}  # Deleted chat_sessions.id -> live one (None: unrecoverable)
+        for row in batch:
+            target = moved.get(row["session_id"], row["session_id"])
+            error = self._insert_row(db, row, target) if target is not None else None
+            if error is not None and row["session_id"] not in moved:
+                target = moved[row["session_id"]] = self._recover_session(db, row["session_id"])
+                if target is not None:
+                    error = self._insert_row(db, row, target)
+            if target is None or error is not None:
+                logger.warning(f"Dropped buffered chat message {row['message_id']}: {str(error.orig) if error else 'session is gone'}")
+
+    @staticmethod
+    def _insert_row(db, row: Dict[str, Any], session_pk: int) -> Optional[IntegrityError]:
+        try:
+            db.execute(insert(ChatMessage.__table__), {**row, "session_id": session_pk})
+            db.commit()
+            return None
+        except IntegrityError as e:
+            db.rollback()
+            return e
+
+    def _recover_session(self, db, session_pk: int) -> Optional[int]:
+        """The live chat_sessions.id for a deleted session's public session_id, recreating it if needed"""
+        from services.session_service import session_pks
+
+        with self._lock:
+            session_key = self._session_keys.get(session_pk)
+        if session_key is None:
+            return None
+        try:
+            session = db.query(ChatSession).filter(ChatSession.session_id == session_key).first()
+            if session is not None and session.id == session_pk:
+                return None  # The session exists; the row failed for another reason
+            if session is None:
+                session = ChatSession(session_id=session_key)
+                db.add(session)
+                db.commit()
+            live_pk = session.id
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not recreate chat session {session_key}: {str(e)}")
+            return None
+
+        # Later add_message calls in this worker write to the live session
+        if session_pks.get(session_key) == session_pk:
+            session_pks.put(session_key, live_pk)
+        with self._lock:
+            self.sessions_recovered += 1
+        logger.info(f"Chat session {session_key} was deleted elsewhere; buffered messages moved to {live_pk}")
+        return live_pk
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval_ms / 1000)
+            self._wakeup.clear()
+            self.flush(raise_errors=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self.running,
+                "interval_ms": self.interval_ms,
+                "pending": len(self._pending),
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "failures": self.failures,
+                "sessions_recovered": self.sessions_recovered,
+                "largest_batch": self.largest_batch,
+                "avg_flush_ms": round(self.flush_total_ms / self.batches, 2) if self.batches else 0.0
+            }
+
+
+chat_message_buffer = ChatMessageBuffer()
@@ -0,0 +1,111 @@
+"""
+Rolling conversation summaries for chat sessions.
+
+A chat prompt is the session's summary plus the messages the summary does not
+cover yet (SessionService.build_chat_prompt). Once more than
+CHAT_SUMMARY_EVERY_MESSAGES messages sit behind the CHAT_SUMMARY_KEEP_RECENT
+newest ones, build_chat_prompt reports summary_due. The chat endpoint
+(POST /api/chat) then queues a REFRESH_CHAT_SUMMARY job, which runs
+refresh_conversation_summary on the job runner (services.job_handlers).
+
+The refresh folds the older messages into the summary with one small
+completion, off the request path. Prompt size therefore levels off at about
+summary + KEEP_RECENT + EVERY_MESSAGES messages, however long the session runs.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Set
+
+from config import config
+from database import SessionLocal
+from models import ChatMessage, ChatSession
+from services.chat_message_buffer import chat_message_buffer
+from services.openai_service import OpenAIService
+from utils.tokens import estimate_message_tokens
+
+logger = logging.getLogger(__name__)
+
+# Sessions being summarized by this worker
+_in_flight: Set[str] = set()
+
+
+def _as_chat_message(message: ChatMessage) -> Dict[str, str]:
+    return {"role": "assistant" if message.is_bot else "user", "content": message.text}
+
+
+def _chunks(messages: List[ChatMessage], token_budget: int) -> List[List[ChatMessage]]:
+    """Split messages, oldest first, into runs that each fit one summary prompt"""
+    chunks, current, tokens = [], [], 0
+    for message in messages:
+        cost = estimate_message_tokens(_as_chat_message(message))
+        if current and tokens + cost > token_budget:
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(message)
+        tokens += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def refresh_conversation_summary(session_id: str) -> bool:
+    """Fold messages older than the recent window into the session summary.
+
+    Returns True when the summary was updated. Uses its own database session,
+    so it can run after the request that scheduled it has finished.
+    """
+    if session_id in _in_flight:
+        return False
+    _in_flight.add(session_id)
+
+    db = SessionLocal()
+    try:
+        session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+        if not session:
+            return False
+
+        if chat_message_buffer.has_pending(session.id):
+            chat_message_buffer.flush()
+        previous_through_id = session.summary_through_message_id
+        query = db.query(ChatMessage).filter(ChatMessage.session_id == session.id)
+        if previous_through_id is not None:
+            query = query.filter(ChatMessage.id > previous_through_id)
+        pending = query.order_by(ChatMessage.timestamp, ChatMessage.id).all()
+
+        keep = config.CHAT_SUMMARY_KEEP_RECENT
+        to_fold = pending[:-keep] if keep else pending
+        if len(to_fold) < config.CHAT_SUMMARY_EVERY_MESSAGES:
+            return False
+
+        openai_service = OpenAIService()
+        summary, through_id = session.summary, previous_through_id
+        for chunk in _chunks(to_fold, config.CHAT_HISTORY_TOKEN_BUDGET):
+            updated = await openai_service.summarize_conversation(summary, [_as_chat_message(m) for m in chunk])
+            if not updated:
+                break
+            summary, through_id = updated, chunk[-1].id
+
+        if through_id == previous_through_id:
+            return False
+
+        # Conditional on the boundary we read, so a concurrent refresh from
+        # another worker cannot be overwritten with an older summary
+        updated_rows = db.query(ChatSession)\
+            .filter(
+                ChatSession.id == session.id,
+                ChatSession.summary_through_message_id.is_not_distinct_from(previous_through_id)
+            )\
+            .update({
+                ChatSession.summary: summary,
+                ChatSession.summary_through_message_id: through_id,
+                ChatSession.summary_updated_at: datetime.now(timezone.utc)
+            }, synchronize_session=False)
+        db.commit()
+        return updated_rows == 1
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Conversation summary for {session_id} failed: {str(e)}")
+        return False
+    finally:
+        db.close()
+        _in_flight.discard(session_id)
@@ -4,16 +4,50 @@ Credit service for managing user credits and transactions
 import logging
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
 from models import User, CreditTransaction
+from models.credit_models import UserSubscription, SubscriptionStatus
+from schemas.credits import CreditBalance
+from core.exceptions import UserNotFoundError
 from services.base_service import BaseService
 from services.stripe_service import StripeService
 from services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
+
+def _balance_select(user_id: int):
+    """Balance, status and next billing date in one statement"""
+    next_billing_date = select(UserSubscription.next_billing_date).where(
+        UserSubscription.user_id == User.id,
+        UserSubscription.status == SubscriptionStatus.ACTIVE
+    ).order_by(UserSubscription.next_billing_date).limit(1).scalar_subquery()
+
+    return select(
+        User.id, User.credits, User.credit_status, next_billing_date.label("next_billing_date")
+    ).where(User.id == user_id)
+
+
+def _balance_from_row(row, user_id: int) -> CreditBalance:
+    if row is None:
+        raise UserNotFoundError(f"User {user_id} not found")
+    return CreditBalance(
+        user_id=row.id,
+        current_credits=row.credits or 0,
+        credit_status=row.credit_status or "active",
+        next_billing_date=row.next_billing_date
+    )
+
+
+async def get_user_balance_async(db: AsyncSession, user_id: int) -> CreditBalance:
+    """CreditService.get_user_balance for AsyncSession callers"""
+    row = (await db.execute(_balance_select(user_id))).first()
+    return _balance_from_row(row, user_id)
+
+
 class CreditService(BaseService):
     """Service for managing user credits and transactions"""
     
@@ -33,6 +67,11 @@ class CreditService(BaseService):
             logger.error(f"Error getting credits for user {user_id}: {str(e)}")
             return 0
     
+    def get_user_balance(self, user_id: int) -> CreditBalance:
+        """Current balance, credit status and next billing date for a user"""
+        row = self.db.execute(_balance_select(user_id)).first()
+        return _balance_from_row(row, user_id)
+    
     def add_credits(self, user_id: int, amount: int, description: str, transaction_type: str = "admin") -> bool:
         """Add credits to user account"""
         try:
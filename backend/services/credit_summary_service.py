@@ -0,0 +1,207 @@
+"""
+Daily credit/revenue rollup (credit_daily_summary) for the financial dashboard.
+
+Inserted CreditTransactions are folded into their UTC day with an
+``INSERT ... ON CONFLICT DO UPDATE`` increment in the same transaction as the
+insert. Updated or deleted transactions (rare) cause their days to be
+recomputed from scratch. Writes that bypass the ORM (raw SQL inserts such as
+credit_sdk) are picked up by refresh_recent_days, which the maintenance
+scheduler runs for the last CREDIT_SUMMARY_REBUILD_DAYS days.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import case, delete, event, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import CreditTransaction, CreditDailySummary
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock namespace so writers touching the same day are serialized
+SUMMARY_LOCK_NAMESPACE = 27002
+
+_DIRTY_DAYS_KEY = "credit_summary_dirty_days"
+
+TRANSACTION_DAY = func.date(func.timezone("UTC", CreditTransaction.created_at))
+
+SUMMARY_COLUMNS = ["day", "credits_added", "credits_spent", "revenue", "transaction_count"]
+ADDITIVE_COLUMNS = SUMMARY_COLUMNS[1:]
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _summary_select(*criteria):
+    """Aggregate credit transactions matching ``criteria`` into per-day summary rows"""
+    day = TRANSACTION_DAY.label("day")
+    amount = CreditTransaction.amount
+    return select(
+        day,
+        func.coalesce(func.sum(case((amount > 0, amount), else_=0)), 0).label("credits_added"),
+        func.coalesce(func.sum(case((amount < 0, -amount), else_=0)), 0).label("credits_spent"),
+        func.coalesce(func.sum(case((amount > 0, CreditTransaction.dollar_amount), else_=0)), 0).label("revenue"),
+        func.count(CreditTransaction.id).label("transaction_count"),
+    ).where(
+        CreditTransaction.created_at.isnot(None),
+        *criteria
+    ).group_by(day)
+
+
+def _lock_days(connection, days: Iterable[date]) -> None:
+    for day in sorted(set(days)):
+        connection.execute(select(func.pg_advisory_xact_lock(SUMMARY_LOCK_NAMESPACE, day.toordinal())))
+
+
+def refresh_credit_daily_summary(connection, days: Iterable[date]) -> None:
+    """Recompute the summary rows for the given days on an open connection/transaction"""
+    days = sorted(set(days))
+    if not days:
+        return
+    _lock_days(connection, days)
+    for day in days:
+        connection.execute(delete(CreditDailySummary).where(CreditDailySummary.day == day))
+        connection.execute(
+            CreditDailySummary.__table__.insert().from_select(
+                SUMMARY_COLUMNS,
+                _summary_select(
+                    CreditTransaction.created_at >= _day_start(day),
+                    CreditTransaction.created_at < _day_start(day + timedelta(days=1))
+                )
+            )
+        )
+
+
+def increment_credit_daily_summary(connection, transaction_ids: List[str], skip_days: Set[date]) -> None:
+    """Add newly inserted transactions to their day's summary row"""
+    days = _transaction_days(connection, transaction_ids) - skip_days
+    if not days:
+        return
+    _lock_days(connection, days)
+
+    stmt = pg_insert(CreditDailySummary).from_select(
+        SUMMARY_COLUMNS,
+        _summary_select(CreditTransaction.id.in_(transaction_ids), TRANSACTION_DAY.in_(days))
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CreditDailySummary.day],
+        set_={column: getattr(CreditDailySummary, column) + getattr(stmt.excluded, column) for column in ADDITIVE_COLUMNS}
+    )
+    connection.execute(stmt)
+
+
+def rebuild_credit_daily_summary(db: Session, since: Optional[date] = None) -> None:
+    """Rebuild the summary from scratch (or from ``since``); for backfills and drift repair"""
+    stmt = delete(CreditDailySummary)
+    criteria = []
+    if since:
+        stmt = stmt.where(CreditDailySummary.day >= since)
+        criteria.append(CreditTransaction.created_at >= _day_start(since))
+    db.execute(stmt)
+    db.execute(CreditDailySummary.__table__.insert().from_select(SUMMARY_COLUMNS, _summary_select(*criteria)))
+    db.commit()
+
+
+def refresh_recent_days(db: Session, days: int) -> int:
+    """Recompute today and the previous ``days - 1`` UTC days; returns how many days were refreshed"""
+    today = datetime.now(timezone.utc).date()
+    recent = [today - timedelta(days=offset) for offset in range(days)]
+    refresh_credit_daily_summary(db.connection(), recent)
+    db.commit()
+    return len(recent)
+
+
+def _transaction_days(connection, transaction_ids: List[str]) -> Set[date]:
+    if not transaction_ids:
+        return set()
+    rows = connection.execute(select(TRANSACTION_DAY).where(CreditTransaction.id.in_(transaction_ids)).distinct())
+    return {row[0] for row in rows if row[0] is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_transaction_days_before_flush(session, flush_context, instances):
+    """Remember the current day of transactions about to be updated or deleted"""
+    transaction_ids = [
+        obj.id for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, CreditTransaction) and obj.id is not None
+    ]
+    if transaction_ids:
+        session.info.setdefault(_DIRTY_DAYS_KEY, set()).update(
+            _transaction_days(session.connection(), transaction_ids)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _update_summary_after_flush(session, flush_context):
+    """Fold this flush's credit transaction changes into the summary, in the same transaction"""
+    new_ids = [obj.id for obj in session.new if isinstance(obj, CreditTransaction) and obj.id is not None]
+    dirty_ids = [obj.id for obj in session.dirty if isinstance(obj, CreditTransaction) and obj.id is not None]
+    days = session.info.pop(_DIRTY_DAYS_KEY, set())
+    if not new_ids and not dirty_ids and not days:
+        return
+
+    connection = session.connection()
+    days.update(_transaction_days(connection, dirty_ids))
+    refresh_credit_daily_summary(connection, days)
+    increment_credit_daily_summary(connection, new_ids, skip_days=days)
+
+
+class CreditSummaryService:
+    """Reads period totals from the daily summary"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_period_totals(self, start: datetime) -> Dict[str, Any]:
+        """Credit and revenue totals from ``start`` until now: whole days from the
+        summary plus the partial first day aggregated live"""
+        first_day = start.astimezone(timezone.utc).date()
+
+        summary = self.db.query(
+            func.coalesce(func.sum(CreditDailySummary.credits_added), 0),
+            func.coalesce(func.sum(CreditDailySummary.credits_spent), 0),
+            func.coalesce(func.sum(CreditDailySummary.revenue), 0),
+            func.coalesce(func.sum(CreditDailySummary.transaction_count), 0),
+        ).filter(CreditDailySummary.day > first_day).one()
+
+        partial = self.db.execute(
+            _summary_select(
+                CreditTransaction.created_at >= start,
+                CreditTransaction.created_at < _day_start(first_day + timedelta(days=1))
+            )
+        ).all()
+
+        totals = {
+            "credits_added": int(summary[0]),
+            "credits_spent": int(summary[1]),
+            "revenue": float(summary[2]),
+            "transaction_count": int(summary[3]),
+        }
+        for row in partial:
+            totals["credits_added"] += int(row.credits_added)
+            totals["credits_spent"] += int(row.credits_spent)
+            totals["revenue"] += float(row.revenue)
+            totals["transaction_count"] += int(row.transaction_count)
+
+        return totals
+
+    def get_daily_series(self, start_day: date) -> List[Dict[str, Any]]:
+        """Per-day summary rows from ``start_day`` onwards, oldest first"""
+        rows = self.db.query(CreditDailySummary).filter(
+            CreditDailySummary.day >= start_day
+        ).order_by(CreditDailySummary.day).all()
+
+        return [
+            {
+                "date": row.day.isoformat(),
+                "credits_added": row.credits_added,
+                "credits_spent": row.credits_spent,
+                "revenue": float(row.revenue or 0),
+                "transaction_count": row.transaction_count
+            }
+            for row in rows
+        ]
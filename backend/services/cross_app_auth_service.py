@@ -1,18 +1,76 @@
 from models import User
 from services.base_service import BaseService
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.cross_app_models import AppIntegration, CrossAppSession, AppCreditUsage, AppStatus, CrossAppSessionStatus
 from schemas.cross_app import AppPermission, CrossAppSessionCreate
 from services.auth_service import AuthService
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import secrets
 import logging
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+
+async def validate_cross_app_token_async(db: AsyncSession, session_token: str, app_id: str) -> Optional[Dict[str, Any]]:
+    """CrossAppAuthService.validate_cross_app_token for AsyncSession callers.
+
+    App, session and user are resolved in one joined SELECT; the activity
+    timestamp (or revocation for inactive users) is a single UPDATE.
+    """
+    # asyncpg reads naive datetimes as local time, so pass an aware UTC timestamp
+    now = datetime.now(timezone.utc)
+    row = (await db.execute(
+        select(
+            CrossAppSession.id.label("session_id"),
+            CrossAppSession.permissions_granted,
+            CrossAppSession.expires_at,
+            User.id.label("user_id"),
+            User.email,
+            User.name,
+            User.user_type,
+            User.is_active
+        )
+        .join(AppIntegration, AppIntegration.id == CrossAppSession.app_id)
+        .join(User, User.id == CrossAppSession.user_id)
+        .where(
+            AppIntegration.app_id == app_id,
+            AppIntegration.status == AppStatus.ACTIVE,
+            CrossAppSession.session_token == session_token,
+            CrossAppSession.status == CrossAppSessionStatus.ACTIVE,
+            CrossAppSession.expires_at > now
+        )
+    )).first()
+
+    if row is None:
+        return None
+
+    if not row.is_active:
+        # Revoke session if user is no longer active
+        await db.execute(update(CrossAppSession).where(CrossAppSession.id == row.session_id).values(
+            status=CrossAppSessionStatus.REVOKED, revoked_at=now, revoked_reason="User inactive"
+        ))
+        await db.commit()
+        return None
+
+    await db.execute(update(CrossAppSession).where(CrossAppSession.id == row.session_id).values(last_activity=now))
+    await db.commit()
+
+    return {
+        "user_id": row.user_id,
+        "email": row.email,
+        "name": row.name,
+        "user_type": row.user_type,
+        "is_admin": row.user_type == "admin",
+        "is_customer": row.user_type == "customer",
+        "permissions": row.permissions_granted,
+        "expires_at": row.expires_at
+    }
+
+
 class CrossAppAuthService:
     """Service for managing cross-app authentication and permissions"""
     
@@ -40,11 +98,11 @@ class CrossAppAuthService:
         
         return app
     
-    def authenticate_cross_app_user(self, app_id: str, email: str, password: str, 
-                                  app_user_id: Optional[str] = None, 
-                                  app_metadata: Optional[Dict[str, Any]] = None,
-                                  ip_address: Optional[str] = None,
-                                  user_agent: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def authenticate_cross_app_user(self, app_id: str, email: str, password: str, 
+                                        app_user_id: Optional[str] = None, 
+                                        app_metadata: Optional[Dict[str, Any]] = None,
+                                        ip_address: Optional[str] = None,
+                                        user_agent: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Authenticate a user for cross-app access"""
         
         # Validate app integration
@@ -56,7 +114,7 @@ class CrossAppAuthService:
             )
         
         # Authenticate user
-        user_data = self.auth_service.authenticate_user(email, password)
+        user_data = await self.auth_service.authenticate_user_async(email, password)
         if not user_data:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -327,21 +385,26 @@ class CrossAppAuthService:
         
         return permission in user_data.get("permissions", [])
     
-    def cleanup_expired_sessions(self):
-        """Clean up expired cross-app sessions"""
-        expired_sessions = self.db.query(CrossAppSession).filter(
-            and_(
-                CrossAppSession.status == CrossAppSessionStatus.ACTIVE,
-                CrossAppSession.expires_at <= datetime.utcnow()
-            )
-        ).all()
-        
-        for session in expired_sessions:
-            session.status = CrossAppSessionStatus.EXPIRED
+    def cleanup_expired_sessions(self, batch_size: Optional[int] = None) -> int:
+        """Mark expired cross-app sessions as expired, at most batch_size of them; returns the count"""
+        expired = select(CrossAppSession.id).where(
+            CrossAppSession.status == CrossAppSessionStatus.ACTIVE,
+            CrossAppSession.expires_at <= datetime.now(timezone.utc)
+        ).order_by(CrossAppSession.expires_at)
+        if batch_size:
+            expired = expired.limit(batch_size)
+        
+        result = self.db.execute(
+            update(CrossAppSession)
+            .where(CrossAppSession.id.in_(expired.with_for_update(skip_locked=True)))
+            .values(status=CrossAppSessionStatus.EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
         
-        if expired_sessions:
-            self.db.commit()
-            logger.info(f"Cleaned up {len(expired_sessions)} expired cross-app sessions")
+        if result.rowcount:
+            logger.info(f"Cleaned up {result.rowcount} expired cross-app sessions")
+        return result.rowcount
 
     # Admin methods for managing app integrations
     def create_app_integration(self, app_data, app_id: str, api_key_hash: str, created_by: int, auto_approve: bool = False):
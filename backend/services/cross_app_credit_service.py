@@ -1,12 +1,13 @@
 from models import User, CreditTransaction
 from services.base_service import BaseService
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 from models.credit_models import CreditPackage, UserSubscription
 from models.cross_app_models import AppIntegration, AppCreditUsage, AppStatus
 from schemas.cross_app import AppPermission
-from services.cross_app_auth_service import CrossAppAuthService
+from services.cross_app_auth_service import CrossAppAuthService, validate_cross_app_token_async
 from services.stripe_service import StripeService
 from datetime import datetime, timedelta
 import logging
@@ -14,6 +15,59 @@ from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+
+def _package_dict(pkg: CreditPackage) -> Dict[str, Any]:
+    return {
+        "id": pkg.id,
+        "name": pkg.name,
+        "description": pkg.description,
+        "monthly_price": float(pkg.monthly_price),
+        "credit_amount": pkg.credit_amount,
+        "credit_rate": float(pkg.credit_rate),
+        "features": pkg.features or [],
+        "is_featured": pkg.is_featured,
+        "stripe_price_id": pkg.stripe_price_id
+    }
+
+
+async def check_credit_balance_async(db: AsyncSession, session_token: str, app_id: str,
+                                     required_credits: Optional[int] = None) -> Dict[str, Any]:
+    """CrossAppCreditService.check_credit_balance for AsyncSession callers.
+
+    The session is validated once (the sync path validates it a second time
+    for the permission check).
+    """
+    user_data = await validate_cross_app_token_async(db, session_token, app_id)
+    if not user_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid session token"
+        )
+
+    if AppPermission.READ_CREDITS not in (user_data.get("permissions") or []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions to read credit information"
+        )
+
+    current_credits = await db.scalar(select(User.credits).where(User.id == user_data["user_id"]))
+    if current_credits is None:
+        current_credits = 0
+
+    packages = (await db.scalars(
+        select(CreditPackage).where(CreditPackage.is_active == True)
+        .order_by(CreditPackage.sort_order, CreditPackage.monthly_price)
+    )).all()
+
+    return {
+        "user_id": user_data["user_id"],
+        "current_credits": current_credits,
+        "can_consume": current_credits >= (required_credits or 0),
+        "required_credits": required_credits,
+        "available_packages": [_package_dict(pkg) for pkg in packages]
+    }
+
+
 class CrossAppCreditService:
     """Service for managing credits for cross-app users"""
     
@@ -307,20 +361,7 @@ class CrossAppCreditService:
             CreditPackage.is_active == True
         ).order_by(CreditPackage.sort_order, CreditPackage.monthly_price).all()
         
-        return [
-            {
-                "id": pkg.id,
-                "name": pkg.name,
-                "description": pkg.description,
-                "monthly_price": float(pkg.monthly_price),
-                "credit_amount": pkg.credit_amount,
-                "credit_rate": float(pkg.credit_rate),
-                "features": pkg.features or [],
-                "is_featured": pkg.is_featured,
-                "stripe_price_id": pkg.stripe_price_id
-            }
-            for pkg in packages
-        ]
+        return [_package_dict(pkg) for pkg in packages]
     
     def _find_package_for_credits(self, credits: int) -> Optional[CreditPackage]:
         """Find a package that matches the requested credit amount"""
@@ -1,9 +1,19 @@
 from models import User
 from services.base_service import BaseService
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
+from config import config
 from schemas.customer import CustomerCreate, CustomerUpdate
 from services.auth_service import AuthService
+from services.search_service import match_clause, rank_clause
+from models.load_profiles import customer_list_profile
+from utils.phone import MIN_SUFFIX_DIGITS, normalize_phone, phone_digits
+from utils.ttl_cache import TTLCache
+
+# Recently seen callers: E.164 number -> customer id. Hits are confirmed with a
+# primary-key get, so a changed number or deleted customer is never served.
+caller_cache = TTLCache(config.CALLER_CACHE_SIZE, config.CALLER_CACHE_TTL_SECONDS)
 
 class CustomerService:
     def __init__(self, db: Session):
@@ -53,7 +63,8 @@ class CustomerService:
         ).first()
     
     def get_customers(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return self.db.query(User).filter(
+        """List customers with only the columns the customer list renders"""
+        return self.db.query(User).options(customer_list_profile()).filter(
             User.user_type == 'customer'
         ).offset(skip).limit(limit).all()
     
@@ -142,55 +153,61 @@ class CustomerService:
         return customer
     
     def get_customers_by_phone(self, phone: str) -> List[User]:
-        """Get customers by phone number (exact and partial matches)"""
+        """Get customers by phone number.
+        
+        A full number is one probe on the normalized phone_e164 index, or a
+        primary-key get for a recent caller. A partial number (at least
+        MIN_SUFFIX_DIGITS digits) matches trailing digits via the reversed
+        index and only returns a customer when exactly one matches.
+        """
         if not phone:
             return []
         
-        # First try exact match
-        customers = self.db.query(User).filter(
-            User.phone == phone,
-            User.user_type == 'customer'
-        ).all()
-        
-        if not customers:
-            # Try partial match with last 4 digits
-            phone_suffix = phone[-4:] if len(phone) >= 4 else phone
+        e164 = normalize_phone(phone)
+        if e164:
+            customer_id = caller_cache.get(e164)
+            if customer_id is not None:
+                customer = self.db.get(User, customer_id)
+                if customer and customer.phone_e164 == e164 and customer.user_type == 'customer':
+                    return [customer]
+                caller_cache.discard(e164)
+            
             customers = self.db.query(User).filter(
-                User.phone.ilike(f'%{phone_suffix}'),
+                User.phone_e164 == e164,
                 User.user_type == 'customer'
-            ).all()
+            ).order_by(User.id).all()
+            if customers:
+                caller_cache.put(e164, customers[0].id)
+            return customers
+        
+        digits = phone_digits(phone)
+        if len(digits) < MIN_SUFFIX_DIGITS:
+            return []
         
-        return customers
+        # reverse(phone_e164) LIKE '7654%' uses ix_users_phone_e164_reversed
+        customers = self.db.query(User).filter(
+            func.reverse(User.phone_e164).like(digits[::-1] + '%'),
+            User.user_type == 'customer'
+        ).limit(2).all()
+        return customers if len(customers) == 1 else []
     
     def search_customers_by_name(self, name: str) -> List[User]:
-        """Search customers by name (fuzzy matching)"""
+        """Search customers by name (full-text prefix matching, best match first)"""
         if not name:
             return []
         
-        # Split name into parts and search each part
-        name_parts = name.lower().split()
-        query = self.db.query(User).filter(User.user_type == 'customer')
-        
-        for part in name_parts:
-            query = query.filter(User.name.ilike(f'%{part}%'))
-        
-        customers = query.all()
-        
-        # If no exact matches, try individual parts
-        if not customers:
-            for part in name_parts:
-                matches = self.db.query(User).filter(
-                    User.name.ilike(f'%{part}%'),
-                    User.user_type == 'customer'
-                ).all()
-                customers.extend(matches)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_customers = []
-        for customer in customers:
-            if customer.id not in seen:
-                seen.add(customer.id)
-                unique_customers.append(customer)
-        
-        return unique_customers
+        # Require every name part first, then fall back to any part matching
+        for operator in ("&", "|"):
+            name_filter = match_clause(User, name, operator)
+            if name_filter is None:
+                return []
+            
+            customers = self.db.query(User).filter(
+                User.user_type == 'customer',
+                name_filter
+            ).order_by(rank_clause(User, name, operator).desc()).all()
+            
+            if customers:
+                return customers
+        
+        return []
@@ -4,13 +4,24 @@ import json
 import os
 from datetime import datetime, timedelta
 from email.header import decode_header
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import re
+import threading
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 email_logger = logging.getLogger('email')  # Dedicated email logger
 
+# Newest UID this worker has looked at per mailbox: account email -> (UIDVALIDITY, UID).
+# UIDs only grow and survive expunges, unlike the sequence numbers in email ids.
+_mailbox_marks: Dict[str, Tuple[int, int]] = {}
+_mailbox_marks_lock = threading.Lock()
+
+_STATUS_FIELD = re.compile(r"(UIDNEXT|UIDVALIDITY) (\d+)")
+_FETCH_FLAGS = re.compile(r"FLAGS \(([^)]*)\)")
+SYNC_HEADER_FIELDS = "(FLAGS BODY.PEEK[HEADER.FIELDS (MESSAGE-ID FROM SUBJECT DATE X-PRIORITY)])"
+
 @dataclass
 class EmailAccount:
     email: str
@@ -248,6 +259,118 @@ class EmailReaderService:
         
         return all_emails[:limit]
     
+    def sync_new_emails(self, limit: int = 50, timeout: Optional[float] = None) -> int:
+        """Publish email.new for unread mail that arrived since the last sync; returns messages fetched.
+        
+        A STATUS per mailbox says whether anything arrived (UIDNEXT). Only then
+        are the headers of the new UIDs fetched, never bodies. The first sync
+        of a mailbox in this worker only records where it stands, so a restart
+        does not replay the inbox to dashboards.
+        """
+        if not self.is_server:
+            return 0
+        
+        fetched = []
+        for account in self.accounts:
+            try:
+                fetched.extend(self._fetch_new_headers(account, limit, timeout))
+            except Exception as e:
+                logger.error(f"Mailbox sync failed for {account.email}: {str(e)}")
+        
+        self._announce_new_emails(fetched)
+        return len(fetched)
+    
+    def _fetch_new_headers(self, account: EmailAccount, limit: int, timeout: Optional[float]) -> List[UnreadEmail]:
+        """Headers of messages above the account's mark, newest `limit` at most; advances the mark"""
+        mail = imaplib.IMAP4_SSL(account.imap_server, account.imap_port, timeout=timeout)
+        try:
+            mail.login(account.email, account.password)
+            status, data = mail.status('INBOX', '(UIDNEXT UIDVALIDITY)')
+            if status != 'OK':
+                return []
+            fields = {name: int(value) for name, value in _STATUS_FIELD.findall(data[0].decode())}
+            validity, newest = fields["UIDVALIDITY"], fields["UIDNEXT"] - 1
+            
+            with _mailbox_marks_lock:
+                mark = _mailbox_marks.get(account.email)
+                if mark is None or mark[0] != validity:
+                    # First look, or the mailbox was rebuilt: start from here
+                    _mailbox_marks[account.email] = (validity, newest)
+                    return []
+            last_seen = mark[1]
+            if newest <= last_seen:
+                return []
+            
+            mail.select('INBOX', readonly=True)
+            status, data = mail.uid('search', None, f'UID {last_seen + 1}:*')
+            if status != 'OK':
+                return []
+            # "N:*" also matches the highest UID when it is below N
+            uids = [uid for uid in data[0].split() if int(uid) > last_seen][-limit:]
+            emails = []
+            if uids:
+                status, data = mail.uid('fetch', b','.join(uids), SYNC_HEADER_FIELDS)
+                if status != 'OK':
+                    return []
+                emails = self._parse_header_fetch(account, data)
+            
+            with _mailbox_marks_lock:
+                _mailbox_marks[account.email] = (validity, max([last_seen, *map(int, uids)]))
+            return emails
+        finally:
+            try:
+                mail.logout()
+            except Exception:
+                pass
+    
+    def _parse_header_fetch(self, account: EmailAccount, data: list) -> List[UnreadEmail]:
+        """UnreadEmail (no preview) per message in a UID FETCH of FLAGS and header fields"""
+        emails = []
+        for index, part in enumerate(data):
+            if not isinstance(part, tuple):
+                continue  # Closing ")" of a message
+            envelope = part[0].decode()
+            flags = _FETCH_FLAGS.search(envelope)
+            if flags is None and index + 1 < len(data) and isinstance(data[index + 1], bytes):
+                flags = _FETCH_FLAGS.search(data[index + 1].decode())  # Some servers send FLAGS after the literal
+            msg = email.message_from_bytes(part[1])
+            from_address = self._decode_header_value(msg.get('From', ''))
+            subject = self._decode_header_value(msg.get('Subject', ''))
+            try:
+                received_date = email.utils.parsedate_to_datetime(msg.get('Date', ''))
+            except Exception:
+                received_date = datetime.now()
+            emails.append(UnreadEmail(
+                # Same id shape as the listing (sequence number), so the email endpoints can open it
+                id=f"{account.account_name}_{envelope.split()[0]}",
+                account=account.account_name,
+                from_address=from_address,
+                subject=subject,
+                received_date=received_date,
+                preview="",
+                is_important=self._is_important_email(msg, from_address, subject),
+                is_read=flags is not None and "\\Seen" in flags.group(1)
+            ))
+        return emails
+    
+    @staticmethod
+    def _announce_new_emails(emails: List[UnreadEmail]) -> None:
+        """Publish email.new for the unread ones"""
+        from services.event_bus import event_bus
+        
+        for item in emails:
+            if item.is_read:
+                continue
+            event_bus.publish("email.new", {
+                "id": item.id,
+                "account": item.account,
+                "from_address": item.from_address,
+                "subject": item.subject,
+                "received_date": item.received_date,
+                "preview": item.preview,
+                "is_important": item.is_important
+            })
+    
     def get_unread_emails(self, days_back: int = 7, limit: int = 50) -> List[UnreadEmail]:
         """Get unread emails from all configured accounts (for backward compatibility)"""
         return self.get_all_emails(days_back, limit)
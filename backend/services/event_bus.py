@@ -0,0 +1,187 @@
+"""
+In-process event bus for admin dashboard push updates.
+
+Writes publish small deltas here, and GET /api/admin/events streams them to
+connected admins as server-sent events. Dashboards load their lists once,
+then apply each delta instead of polling the full queries.
+
+Sources:
+- chat.message: SessionService.add_message (before the write-behind flush)
+- change_request.created, appointment.created, chat.session.created: any
+  committed insert through an ORM Session (after_commit hook below). That
+  covers the API, voice agent and service paths alike.
+- email.new: unread mail that arrived since the last poll, from the
+  mailboxes.sync maintenance task in every worker with subscribers
+
+Each event gets an increasing id. The last EVENT_BUS_REPLAY_SIZE events are
+kept, so a reconnecting EventSource (Last-Event-ID) receives what it missed.
+A subscriber that falls more than EVENT_BUS_SUBSCRIBER_QUEUE events behind
+gets a "resync" event and should refetch. The bus is per worker process,
+like the other in-process caches.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import config
+from models import Appointment, ChatSession, CustomerChangeRequest
+
+logger = logging.getLogger(__name__)
+
+RESYNC = "resync"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class EventBus:
+    """Fan-out of published events to async subscribers on any thread"""
+
+    def __init__(self, replay_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._recent: "deque[Dict[str, Any]]" = deque(maxlen=replay_size)
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Queue an event for every subscriber; safe to call from threads"""
+        with self._lock:
+            item = {
+                "id": next(self._ids),
+                "type": event_type,
+                "data": {key: _json_value(value) for key, value in data.items()},
+            }
+            self._recent.append(item)
+            self.published += 1
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, item)
+            except RuntimeError:
+                # Loop already closed; the subscriber is gone
+                with self._lock:
+                    self._subscribers.discard((loop, queue))
+
+    def _deliver(self, queue: asyncio.Queue, item: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too far behind for deltas to be trusted; tell the client to refetch
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"id": item["id"], "type": RESYNC, "data": {}})
+            self.dropped_subscribers += 1
+
+    def replay_since(self, last_event_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Events after last_event_id, or None when they are no longer all retained"""
+        with self._lock:
+            recent = list(self._recent)
+        if not recent or last_event_id >= recent[-1]["id"]:
+            return []
+        if last_event_id < recent[0]["id"] - 1:
+            return None
+        return [item for item in recent if item["id"] > last_event_id]
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events as they are published, starting after last_event_id if given"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (loop, queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            if last_event_id is not None:
+                missed = self.replay_since(last_event_id)
+                if missed is None:
+                    yield {"id": last_event_id, "type": RESYNC, "data": {}}
+                else:
+                    for item in missed:
+                        yield item
+                    if missed:
+                        last_event_id = missed[-1]["id"]
+            while True:
+                item = await queue.get()
+                if last_event_id is not None and item["id"] <= last_event_id and item["type"] != RESYNC:
+                    continue  # Already sent from the replay buffer
+                yield item
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "retained": len(self._recent),
+                "last_event_id": self._recent[-1]["id"] if self._recent else 0,
+                "resyncs": self.dropped_subscribers,
+            }
+
+
+event_bus = EventBus(config.EVENT_BUS_REPLAY_SIZE, config.EVENT_BUS_SUBSCRIBER_QUEUE)
+
+
+# Commit-time publication of created rows
+
+_CREATED_KEY = "event_bus_created"
+
+
+# Read only what is already loaded: after_flush must not trigger a refresh
+# of server-side defaults
+_CREATED_FIELDS = (
+    (CustomerChangeRequest, "change_request.created",
+     ("id", "job_id", "customer_id", "title", "status", "priority", "requested_via")),
+    (Appointment, "appointment.created",
+     ("id", "customer_id", "scheduled_date", "duration_minutes", "appointment_type", "status")),
+    (ChatSession, "chat.session.created",
+     ("id", "session_id", "customer_id", "status")),
+)
+
+
+def _created_event(instance) -> Optional[Tuple[str, Dict[str, Any]]]:
+    for model, event_type, fields in _CREATED_FIELDS:
+        if isinstance(instance, model):
+            loaded = instance.__dict__
+            return event_type, {name: loaded.get(name) for name in fields}
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_created(session, flush_context):
+    for instance in session.new:
+        created = _created_event(instance)
+        if created is not None:
+            session.info.setdefault(_CREATED_KEY, []).append(created)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for event_type, data in session.info.pop(_CREATED_KEY, ()):
+        event_bus.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop(_CREATED_KEY, None)
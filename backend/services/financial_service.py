@@ -4,14 +4,16 @@ Financial service for managing invoices, payments, and financial operations
 import logging
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, func, desc
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
 
-from models import User, CreditTransaction
+from models import User, CreditTransaction, StripeSubscription
 from models.credit_models import CreditDispute
 from services.base_service import BaseService
 from services.stripe_service import StripeService
 from services.email_service import EmailService
+from services.credit_summary_service import CreditSummaryService
 
 logger = logging.getLogger(__name__)
 
@@ -549,69 +551,62 @@ class FinancialService:
             # Convert period to days
             period_days = int(period) if period.isdigit() else 30
             
-            # Get total users and credits
-            total_users = self.db.query(User).count()
-            total_credits = self.db.query(func.sum(User.credits)).scalar() or 0
-            
-            # Get recent credit transactions
-            recent_transactions = self.db.query(CreditTransaction).order_by(
-                desc(CreditTransaction.created_at)
-            ).limit(20).all()
-            
-            # Get subscription statistics
+            # Overview counters in a single round trip
             active_subscriptions = self.db.query(StripeSubscription).filter(
                 StripeSubscription.status == "active"
-            ).count()
-            
-            total_subscription_revenue = self.db.query(
-                func.sum(StripeSubscription.amount)
-            ).filter(
-                StripeSubscription.status == "active"
-            ).scalar() or 0
-            
-            # Get period-based credit usage
+            )
+            overview = self.db.query(
+                self.db.query(func.count(User.id)).scalar_subquery(),
+                self.db.query(func.coalesce(func.sum(User.credits), 0)).scalar_subquery(),
+                active_subscriptions.with_entities(func.count(StripeSubscription.id)).scalar_subquery(),
+                active_subscriptions.with_entities(
+                    func.coalesce(func.sum(StripeSubscription.amount), 0)
+                ).scalar_subquery()
+            ).one()
+            total_users, total_credits, active_subscription_count, total_subscription_revenue = overview
+            
+            # Period credit usage from the daily summary
             period_days_ago = datetime.now(timezone.utc) - timedelta(days=period_days)
-            period_credits_spent = self.db.query(
-                func.sum(func.abs(CreditTransaction.amount))
-            ).filter(
-                and_(
-                    CreditTransaction.amount < 0,
-                    CreditTransaction.created_at >= period_days_ago
-                )
-            ).scalar() or 0
-            
-            period_credits_added = self.db.query(
-                func.sum(CreditTransaction.amount)
-            ).filter(
-                and_(
-                    CreditTransaction.amount > 0,
-                    CreditTransaction.created_at >= period_days_ago
-                )
-            ).scalar() or 0
+            period_totals = CreditSummaryService(self.db).get_period_totals(period_days_ago)
+            
+            # Recent transactions with the user's email in one joined query
+            recent_transactions = self.db.query(
+                CreditTransaction.id,
+                CreditTransaction.amount,
+                CreditTransaction.description,
+                CreditTransaction.created_at,
+                User.email
+            ).outerjoin(
+                User, User.id == CreditTransaction.user_id
+            ).order_by(
+                desc(CreditTransaction.created_at)
+            ).limit(20).all()
             
-            transaction_data = []
-            for tx in recent_transactions:
-                user = self.db.query(User).filter(User.id == tx.user_id).first()
-                transaction_data.append({
+            transaction_data = [
+                {
                     "id": tx.id,
-                    "user_email": user.email if user else "Unknown",
+                    "user_email": tx.email or "Unknown",
                     "amount": tx.amount,
                     "description": tx.description,
                     "created_at": tx.created_at,
                     "type": "credit" if tx.amount > 0 else "debit"
-                })
+                }
+                for tx in recent_transactions
+            ]
             
             return {
                 "overview": {
                     "total_users": total_users,
                     "total_credits": total_credits,
-                    "active_subscriptions": active_subscriptions,
-                    "total_subscription_revenue": round(total_subscription_revenue, 2)
+                    "active_subscriptions": active_subscription_count,
+                    "total_subscription_revenue": round(float(total_subscription_revenue), 2)
                 },
                 "monthly_stats": {
-                    "credits_spent": period_credits_spent,
-                    "credits_added": period_credits_added,
-                    "net_change": period_credits_added - period_credits_spent
+                    "credits_spent": period_totals["credits_spent"],
+                    "credits_added": period_totals["credits_added"],
+                    "net_change": period_totals["credits_added"] - period_totals["credits_spent"],
+                    "revenue": round(period_totals["revenue"], 2),
+                    "transaction_count": period_totals["transaction_count"]
                 },
                 "recent_transactions": transaction_data
             }
@@ -1,17 +1,13 @@
 """
 Google Calendar integration service for StreamlineAI
 This service handles automatic syncing of appointments to Google Calendar
+The Google client libraries are imported inside the methods that use them, keeping them out of startup
 """
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import os
 import json
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +27,8 @@ class GoogleCalendarService:
         Get the authorization URL for Google OAuth
         """
         try:
+            from google_auth_oauthlib.flow import Flow
+
             flow = Flow.from_client_secrets_file(
                 self.credentials_file,
                 scopes=self.scopes,
@@ -53,6 +51,8 @@ class GoogleCalendarService:
         Exchange authorization code for access and refresh tokens
         """
         try:
+            from google_auth_oauthlib.flow import Flow
+
             flow = Flow.from_client_secrets_file(
                 self.credentials_file,
                 scopes=self.scopes,
@@ -78,6 +78,10 @@ class GoogleCalendarService:
         Get authenticated Google Calendar service
         """
         try:
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
             # Load client secrets
             with open(self.credentials_file, 'r') as f:
                 client_config = json.load(f)
@@ -198,6 +202,8 @@ class GoogleCalendarService:
         Create a real calendar event using stored OAuth tokens
         This method would be used when you have user's OAuth tokens
         """
+        from googleapiclient.errors import HttpError
+
         try:
             service, credentials = self.get_calendar_service(access_token, refresh_token)
             if not service:
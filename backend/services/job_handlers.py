@@ -0,0 +1,126 @@
+"""
+Background job types (services.background_jobs).
+
+Payloads hold plain JSON values: ids to reload rows by, ISO strings for
+dates. A handler raises to have its job retried; the email helpers return
+False on failure, so their results are checked.
+"""
+from datetime import date, time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models import CustomerChangeRequest, Job, User
+from services.appointment_emails import send_appointment_confirmation_email, send_appointment_update_email
+from services.background_jobs import job_handler
+from services.change_request_notifications import send_change_request_notification
+from services.conversation_summary import refresh_conversation_summary
+from services.email_service import EmailService
+
+SEND_VERIFICATION_EMAIL = "email.verification"
+SEND_CHANGE_REQUEST_NOTIFICATION = "change_request.notification"
+SEND_APPOINTMENT_CONFIRMATION = "appointment.confirmation_email"
+SEND_APPOINTMENT_UPDATE = "appointment.update_email"
+REFRESH_CHAT_SUMMARY = "chat.summary_refresh"
+
+
+class JobFailed(Exception):
+    """The side effect did not happen; the job should be retried"""
+
+
+@job_handler(SEND_VERIFICATION_EMAIL, concurrency=4)
+async def send_verification_email(
+    db: Session,
+    to_email: str,
+    customer_name: str,
+    verification_code: str,
+    app_name: Optional[str] = None,
+    verification_url: Optional[str] = None
+):
+    sent = await EmailService(db_session=db).send_verification_email(
+        to_email=to_email,
+        customer_name=customer_name,
+        verification_code=verification_code,
+        app_name=app_name,
+        verification_url=verification_url
+    )
+    if not sent:
+        raise JobFailed(f"Verification email to {to_email} was not sent")
+
+
+@job_handler(SEND_CHANGE_REQUEST_NOTIFICATION, concurrency=2)
+async def notify_change_request(db: Session, change_request_id: int):
+    change_request = db.query(CustomerChangeRequest).filter(CustomerChangeRequest.id == change_request_id).first()
+    if not change_request:
+        return  # Deleted before the notification went out
+    job = db.query(Job).filter(Job.id == change_request.job_id).first()
+    customer = db.query(User).filter(User.id == change_request.customer_id).first()
+    if not job or not customer:
+        return
+
+    if not await send_change_request_notification(change_request, job, customer):
+        raise JobFailed(f"Notification for change request {change_request_id} was not sent")
+
+
+async def _send_appointment_email(send, **details):
+    details["appointment_date"] = date.fromisoformat(details["appointment_date"])
+    details["appointment_time"] = time.fromisoformat(details["appointment_time"])
+    if not await send(**details):
+        raise JobFailed(f"Appointment email to {details['customer_email']} was not sent")
+
+
+@job_handler(SEND_APPOINTMENT_CONFIRMATION, concurrency=2)
+async def send_appointment_confirmation(
+    db: Session,
+    customer_name: str,
+    customer_email: str,
+    appointment_date: str,
+    appointment_time: str,
+    duration_minutes: int,
+    meeting_type: str,
+    notes: Optional[str] = None,
+    calendar_link: Optional[str] = None
+):
+    await _send_appointment_email(
+        send_appointment_confirmation_email,
+        customer_name=customer_name,
+        customer_email=customer_email,
+        appointment_date=appointment_date,
+        appointment_time=appointment_time,
+        duration_minutes=duration_minutes,
+        meeting_type=meeting_type,
+        notes=notes,
+        calendar_link=calendar_link
+    )
+
+
+@job_handler(SEND_APPOINTMENT_UPDATE, concurrency=2)
+async def send_appointment_update(
+    db: Session,
+    customer_name: str,
+    customer_email: str,
+    appointment_date: str,
+    appointment_time: str,
+    duration_minutes: int,
+    meeting_type: str,
+    notes: Optional[str] = None,
+    calendar_link: Optional[str] = None
+):
+    await _send_appointment_email(
+        send_appointment_update_email,
+        customer_name=customer_name,
+        customer_email=customer_email,
+        appointment_date=appointment_date,
+        appointment_time=appointment_time,
+        duration_minutes=duration_minutes,
+        meeting_type=meeting_type,
+        notes=notes,
+        calendar_link=calendar_link
+    )
+
+
+@job_handler(REFRESH_CHAT_SUMMARY, concurrency=2)
+async def refresh_chat_summary(db: Session, session_id: str):
+    # Not retried: a failed or skipped refresh is picked up by the next chat
+    # turn that finds the summary due
+    await refresh_conversation_summary(session_id)
@@ -1,6 +1,7 @@
 from models import Job, CustomerChangeRequest, User
 from services.base_service import BaseService
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from models.load_profiles import job_list_profile, change_request_list_profile
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -24,8 +25,11 @@ class JobService:
         return self.db.query(Job).filter(Job.id == job_id).first()
     
     def get_all_active_jobs(self) -> List[Job]:
-        """Get all active jobs across all customers"""
-        return self.db.query(Job).filter(
+        """Get all active jobs across all customers (list profile, customer name joined in)"""
+        return self.db.query(Job).options(
+            job_list_profile(),
+            joinedload(Job.customer).load_only(User.id, User.name)
+        ).filter(
             Job.status.in_(["planning", "in_progress"])
         ).all()
 
@@ -80,8 +84,12 @@ class ChangeRequestService:
         ).order_by(CustomerChangeRequest.created_at.desc()).all()
     
     def get_active_change_requests(self) -> List[CustomerChangeRequest]:
-        """Get all active change requests (pending + reviewing)"""
-        return self.db.query(CustomerChangeRequest).filter(
+        """Get all active change requests (pending + reviewing) with customer and job titles joined in"""
+        return self.db.query(CustomerChangeRequest).options(
+            change_request_list_profile(),
+            joinedload(CustomerChangeRequest.customer).load_only(User.id, User.name, User.email),
+            joinedload(CustomerChangeRequest.job).load_only(Job.id, Job.title)
+        ).filter(
             CustomerChangeRequest.status.in_(["pending", "reviewing"])
         ).order_by(CustomerChangeRequest.created_at.desc()).all()
     
@@ -0,0 +1,234 @@
+"""
+Job statistics computed with SQL aggregates and the job_daily_stats rollup.
+
+The rollup holds one row per (UTC creation day, customer, status, priority,
+industry) with the job count and hour/price totals. It is kept current on
+write: a session flush that inserts, updates or deletes a Job recomputes the
+affected days inside the same transaction, so reading a 365-day period costs
+at most 365 * groups rows regardless of how many jobs exist.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session
+
+from models import Job, JobDailyStats
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock namespace so concurrent writers recompute a given day one at a time
+ROLLUP_LOCK_NAMESPACE = 27001
+
+_DIRTY_DAYS_KEY = "job_stats_dirty_days"
+
+# Grouping expressions shared by the live aggregate and the rollup
+JOB_DAY = func.date(func.timezone("UTC", Job.created_at))
+JOB_STATUS = func.coalesce(Job.status, "")
+JOB_PRIORITY = func.coalesce(func.nullif(Job.priority, ""), "medium")
+JOB_INDUSTRY = func.coalesce(func.nullif(Job.industry, ""), "Unknown")
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _rollup_select(start: datetime, end: datetime):
+    """Aggregate jobs created in [start, end) into rollup rows"""
+    day = JOB_DAY.label("day")
+    return select(
+        day,
+        Job.customer_id,
+        JOB_STATUS.label("status"),
+        JOB_PRIORITY.label("priority"),
+        JOB_INDUSTRY.label("industry"),
+        func.count(Job.id).label("job_count"),
+        func.coalesce(func.sum(Job.estimated_hours), 0).label("estimated_hours"),
+        func.coalesce(func.sum(Job.actual_hours), 0).label("actual_hours"),
+        func.coalesce(func.sum(Job.fixed_price), 0).label("fixed_price"),
+    ).where(
+        Job.created_at >= start,
+        Job.created_at < end,
+    ).group_by(
+        day, Job.customer_id, JOB_STATUS, JOB_PRIORITY, JOB_INDUSTRY
+    )
+
+
+ROLLUP_COLUMNS = [
+    "day", "customer_id", "status", "priority", "industry",
+    "job_count", "estimated_hours", "actual_hours", "fixed_price",
+]
+
+
+def refresh_job_daily_stats(connection, days: Iterable[date]) -> None:
+    """Recompute the rollup rows for the given days on an open connection/transaction"""
+    for day in sorted(set(days)):
+        connection.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_NAMESPACE, day.toordinal())))
+        connection.execute(delete(JobDailyStats).where(JobDailyStats.day == day))
+        connection.execute(
+            JobDailyStats.__table__.insert().from_select(
+                ROLLUP_COLUMNS,
+                _rollup_select(_day_start(day), _day_start(day + timedelta(days=1)))
+            )
+        )
+
+
+def rebuild_job_daily_stats(db: Session, since: Optional[date] = None) -> None:
+    """Rebuild the rollup from scratch (or from ``since``); for backfills and repairs"""
+    start = _day_start(since) if since else datetime(1970, 1, 1, tzinfo=timezone.utc)
+    end = datetime(9999, 1, 1, tzinfo=timezone.utc)
+
+    stmt = delete(JobDailyStats)
+    if since:
+        stmt = stmt.where(JobDailyStats.day >= since)
+    db.execute(stmt)
+    db.execute(JobDailyStats.__table__.insert().from_select(ROLLUP_COLUMNS, _rollup_select(start, end)))
+    db.commit()
+
+
+def _job_days(connection, job_ids: List[int]) -> Set[date]:
+    if not job_ids:
+        return set()
+    rows = connection.execute(select(JOB_DAY).where(Job.id.in_(job_ids)).distinct())
+    return {row[0] for row in rows if row[0] is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_job_days_before_flush(session, flush_context, instances):
+    """Remember the current day of jobs about to be updated or deleted"""
+    job_ids = [
+        obj.id for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, Job) and obj.id is not None
+    ]
+    if job_ids:
+        session.info.setdefault(_DIRTY_DAYS_KEY, set()).update(_job_days(session.connection(), job_ids))
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_job_days_after_flush(session, flush_context):
+    """Recompute rollup days touched by this flush, in the same transaction"""
+    job_ids = [
+        obj.id for obj in chain(session.new, session.dirty)
+        if isinstance(obj, Job) and obj.id is not None
+    ]
+    days = session.info.pop(_DIRTY_DAYS_KEY, set())
+    if not job_ids and not days:
+        return
+
+    connection = session.connection()
+    days.update(_job_days(connection, job_ids))
+    refresh_job_daily_stats(connection, days)
+
+
+class JobStatisticsService:
+    """Job statistics over a trailing period"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_statistics(
+        self,
+        days: int,
+        customer_id: Optional[int] = None,
+        use_rollup: bool = True,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Counts, totals and distributions for jobs created in the last ``days`` days"""
+        end_date = now or datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days)
+
+        if use_rollup:
+            rows = self._rollup_rows(start_date, customer_id)
+        else:
+            rows = self._live_rows(start_date, None, customer_id)
+
+        return self._build_statistics(rows, days, start_date, end_date)
+
+    def _live_rows(self, start: datetime, end: Optional[datetime], customer_id: Optional[int]) -> List[Any]:
+        """GROUP BY aggregate straight from the jobs table"""
+        query = self.db.query(
+            JOB_STATUS.label("status"),
+            JOB_PRIORITY.label("priority"),
+            JOB_INDUSTRY.label("industry"),
+            func.count(Job.id).label("job_count"),
+            func.coalesce(func.sum(Job.estimated_hours), 0).label("estimated_hours"),
+            func.coalesce(func.sum(Job.actual_hours), 0).label("actual_hours"),
+            func.coalesce(func.sum(Job.fixed_price), 0).label("fixed_price"),
+        ).filter(Job.created_at >= start)
+
+        if end is not None:
+            query = query.filter(Job.created_at < end)
+        if customer_id:
+            query = query.filter(Job.customer_id == customer_id)
+
+        return query.group_by(JOB_STATUS, JOB_PRIORITY, JOB_INDUSTRY).all()
+
+    def _rollup_rows(self, start: datetime, customer_id: Optional[int]) -> List[Any]:
+        """Whole days from the rollup plus the partial first day from the jobs table"""
+        first_day = start.astimezone(timezone.utc).date()
+
+        query = self.db.query(
+            JobDailyStats.status,
+            JobDailyStats.priority,
+            JobDailyStats.industry,
+            func.sum(JobDailyStats.job_count).label("job_count"),
+            func.sum(JobDailyStats.estimated_hours).label("estimated_hours"),
+            func.sum(JobDailyStats.actual_hours).label("actual_hours"),
+            func.sum(JobDailyStats.fixed_price).label("fixed_price"),
+        ).filter(JobDailyStats.day > first_day)
+
+        if customer_id:
+            query = query.filter(JobDailyStats.customer_id == customer_id)
+
+        rows = query.group_by(JobDailyStats.status, JobDailyStats.priority, JobDailyStats.industry).all()
+        rows.extend(self._live_rows(start, _day_start(first_day + timedelta(days=1)), customer_id))
+        return rows
+
+    def _build_statistics(self, rows: List[Any], days: int, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Fold grouped rows into the /jobs/statistics response shape"""
+        status_counts: Dict[str, int] = {}
+        priority_stats: Dict[str, int] = {}
+        industry_stats: Dict[str, int] = {}
+        total_jobs = 0
+        total_estimated_hours = 0.0
+        total_actual_hours = 0.0
+        total_fixed_price = 0.0
+
+        for row in rows:
+            count = int(row.job_count or 0)
+            if not count:
+                continue
+            total_jobs += count
+            total_estimated_hours += float(row.estimated_hours or 0)
+            total_actual_hours += float(row.actual_hours or 0)
+            total_fixed_price += float(row.fixed_price or 0)
+            status_counts[row.status] = status_counts.get(row.status, 0) + count
+            priority_stats[row.priority] = priority_stats.get(row.priority, 0) + count
+            industry_stats[row.industry] = industry_stats.get(row.industry, 0) + count
+
+        completed_jobs = status_counts.get("completed", 0)
+
+        return {
+            "period_days": days,
+            "date_range": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "job_counts": {
+                "total": total_jobs,
+                "completed": completed_jobs,
+                "in_progress": status_counts.get("in_progress", 0),
+                "pending": status_counts.get("pending", 0)
+            },
+            "completion_rate": (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
+            "financial": {
+                "total_estimated_hours": total_estimated_hours,
+                "total_actual_hours": total_actual_hours,
+                "total_fixed_price": total_fixed_price,
+                "hours_variance": total_actual_hours - total_estimated_hours
+            },
+            "priority_distribution": priority_stats,
+            "industry_distribution": industry_stats
+        }
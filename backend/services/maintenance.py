@@ -0,0 +1,364 @@
+"""
+Scheduled maintenance: expiry and retention cleanups.
+
+Every API process runs a MaintenanceScheduler thread, but only the process
+holding the Postgres advisory lock MAINTENANCE_LOCK_ID runs tasks. The lock
+is session-level and held on a dedicated connection, so if the leader dies
+the lock goes with its connection and another process takes over within
+LEADER_RETRY_INTERVAL.
+
+Schedules are cron-like and wall-clock aligned (every N minutes, or daily at
+HH:MM UTC), so a new leader keeps the same times. Each task run works in
+committed batches of MAINTENANCE_BATCH_SIZE rows and stops after
+MAINTENANCE_MAX_BATCHES. Whatever is left waits for the next run, so a large
+backlog never means one long transaction or a long lock. Duration and rows
+affected are recorded per task.
+
+Tasks marked per_worker skip the election and run in every process, on a
+thread of their own so a slow one (IMAP) never delays the leader's cleanups.
+They feed per-process state: the mailbox sync announces new mail on each
+worker's in-process event bus, so admins get it whichever worker their stream
+is on.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config import config
+from database import SessionLocal, engine
+from models import User
+from models.background_job_models import BackgroundJob
+from models.stripe_models import StripeWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LOCK_ID = 728_405_113  # pg advisory lock key shared by all processes
+LEADER_RETRY_INTERVAL = 60.0  # seconds between lock attempts by followers
+TICK_INTERVAL = 30.0  # seconds; the resolution of the schedules
+
+
+class Every:
+    """Every N minutes, aligned to the top of the hour/day"""
+
+    def __init__(self, minutes: int):
+        self.period = timedelta(minutes=minutes)
+
+    def next_after(self, moment: datetime) -> datetime:
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        periods = (moment - day) // self.period + 1
+        return day + periods * self.period
+
+    def __str__(self) -> str:
+        return f"every {int(self.period.total_seconds() // 60)}m"
+
+
+class DailyAt:
+    """Once a day at hour:minute UTC"""
+
+    def __init__(self, hour: int, minute: int = 0):
+        self.hour = hour
+        self.minute = minute
+
+    def next_after(self, moment: datetime) -> datetime:
+        run = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return run if run > moment else run + timedelta(days=1)
+
+    def __str__(self) -> str:
+        return f"daily {self.hour:02d}:{self.minute:02d} UTC"
+
+
+# Batch functions: (db, batch_size) -> rows affected, committed
+
+def expire_cross_app_sessions(db: Session, batch_size: int) -> int:
+    from services.cross_app_auth_service import CrossAppAuthService
+    return CrossAppAuthService(db).cleanup_expired_sessions(batch_size)
+
+
+def expire_portal_invites(db: Session, batch_size: int) -> int:
+    from services.portal_invite_service import PortalInviteService
+    return PortalInviteService(db).expire_old_invites(batch_size)
+
+
+def clear_expired_verification_codes(db: Session, batch_size: int) -> int:
+    """Drop verification codes past verification_expires; a new one can be requested"""
+    expired = select(User.id).where(
+        User.verification_code.is_not(None),
+        User.verification_expires < datetime.now(timezone.utc)
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    result = db.execute(
+        update(User)
+        .where(User.id.in_(expired))
+        .values(verification_code=None, verification_expires=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def purge_idempotency_keys(db: Session, batch_size: int) -> int:
+    from utils.idempotency import purge_expired_keys
+    return purge_expired_keys(db, batch_size, max_batches=1)
+
+
+def purge_stripe_webhook_events(db: Session, batch_size: int) -> int:
+    """Delete processed webhook events past STRIPE_WEBHOOK_RETENTION_DAYS; failed ones stay for review"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=config.STRIPE_WEBHOOK_RETENTION_DAYS)
+    # Old events have the lowest ids, so walking the primary key finds them first
+    old = select(StripeWebhookEvent.id).where(
+        StripeWebhookEvent.status == "processed",
+        StripeWebhookEvent.created_at < cutoff
+    ).order_by(StripeWebhookEvent.id).limit(batch_size).with_for_update(skip_locked=True)
+    result = db.execute(
+        delete(StripeWebhookEvent)
+        .where(StripeWebhookEvent.id.in_(old))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def purge_background_jobs(db: Session, batch_size: int) -> int:
+    """Delete succeeded background jobs past JOB_RETENTION_DAYS"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=config.JOB_RETENTION_DAYS)
+    old = select(BackgroundJob.id).where(
+        BackgroundJob.status == "succeeded",
+        BackgroundJob.finished_at < cutoff
+    ).order_by(BackgroundJob.id).limit(batch_size).with_for_update(skip_locked=True)
+    result = db.execute(
+        delete(BackgroundJob)
+        .where(BackgroundJob.id.in_(old))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def sync_mailboxes(db: Session, batch_size: int) -> int:
+    """Announce new mail as email.new, while this worker has dashboards listening"""
+    from services.email_reader_service import EmailReaderService
+    from services.event_bus import event_bus
+    if not event_bus.subscriber_count:
+        return 0
+    return EmailReaderService(db_session=db).sync_new_emails(timeout=config.EMAIL_SYNC_TIMEOUT_SECONDS)
+
+
+def rebuild_credit_daily_summary(db: Session, batch_size: int) -> int:
+    """Recompute recent credit_daily_summary days, which raw SQL credit writers never update"""
+    from services.credit_summary_service import refresh_recent_days
+    return refresh_recent_days(db, config.CREDIT_SUMMARY_REBUILD_DAYS)
+
+
+@dataclass
+class MaintenanceTask:
+    name: str
+    schedule: Any  # Every or DailyAt
+    run_batch: Callable[[Session, int], int]
+    next_run_at: Optional[datetime] = None
+    runs: int = 0
+    errors: int = 0
+    rows_total: int = 0
+    last_run_at: Optional[datetime] = None
+    last_duration_ms: float = 0.0
+    last_rows: int = 0
+    last_error: Optional[str] = None
+    backlog: bool = False  # Last run stopped with rows left (batch limit or shutdown)
+    per_worker: bool = False  # Run in every process, not only the leader
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "schedule": str(self.schedule),
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "runs": self.runs,
+            "errors": self.errors,
+            "rows_total": self.rows_total,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_rows": self.last_rows,
+            "last_error": self.last_error,
+            "backlog": self.backlog,
+            "per_worker": self.per_worker,
+        }
+
+
+def default_tasks() -> List[MaintenanceTask]:
+    return [
+        MaintenanceTask("cross_app_sessions.expire", Every(minutes=5), expire_cross_app_sessions),
+        MaintenanceTask("portal_invites.expire", Every(minutes=60), expire_portal_invites),
+        MaintenanceTask("verification_codes.expire", Every(minutes=15), clear_expired_verification_codes),
+        MaintenanceTask("idempotency_keys.purge", Every(minutes=15), purge_idempotency_keys),
+        MaintenanceTask("stripe_webhook_events.purge", DailyAt(3, 30), purge_stripe_webhook_events),
+        MaintenanceTask("background_jobs.purge", DailyAt(3, 45), purge_background_jobs),
+        MaintenanceTask("credit_daily_summary.rebuild", Every(minutes=15), rebuild_credit_daily_summary),
+        MaintenanceTask("mailboxes.sync", Every(minutes=config.EMAIL_SYNC_INTERVAL_MINUTES), sync_mailboxes, per_worker=True),
+    ]
+
+
+class MaintenanceScheduler:
+    """Runs the maintenance tasks on schedule while this process holds the leader lock (per_worker tasks always)"""
+
+    def __init__(self, tasks: List[MaintenanceTask]):
+        self.tasks = tasks
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._worker_thread: Optional[threading.Thread] = None  # per_worker tasks
+        self._stop = threading.Event()
+        self._leader_connection: Optional[Connection] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_connection is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maintenance-scheduler", daemon=True)
+        self._thread.start()
+        if any(task.per_worker for task in self.tasks):
+            self._worker_thread = threading.Thread(target=self._run_worker_tasks, name="maintenance-worker-tasks", daemon=True)
+            self._worker_thread.start()
+        logger.info(f"Started maintenance scheduler ({len(self.tasks)} tasks)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        for thread in (self._thread, self._worker_thread):
+            if thread is not None:
+                thread.join(timeout)
+        self._thread = self._worker_thread = None
+
+    def run_now(self, name: str) -> Optional[Dict[str, Any]]:
+        """Run one task immediately in the calling thread, leader or not; returns its stats"""
+        for task in self.tasks:
+            if task.name == name:
+                self._run_task(task)
+                return task.snapshot()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "leader": self.is_leader,
+                "tasks": {task.name: task.snapshot() for task in self.tasks},
+            }
+
+    def _run(self) -> None:
+        next_leader_attempt = 0.0
+        try:
+            while not self._stop.is_set():
+                if not self._still_leader() and time.monotonic() >= next_leader_attempt:
+                    next_leader_attempt = time.monotonic() + LEADER_RETRY_INTERVAL
+                    self._try_become_leader()
+
+                if self.is_leader:
+                    self._run_due([task for task in self.tasks if not task.per_worker])
+
+                self._stop.wait(TICK_INTERVAL)
+        finally:
+            self._release_leadership()
+
+    def _run_worker_tasks(self) -> None:
+        tasks = [task for task in self.tasks if task.per_worker]
+        while not self._stop.is_set():
+            self._run_due(tasks)
+            self._stop.wait(TICK_INTERVAL)
+
+    def _run_due(self, tasks: List[MaintenanceTask]) -> None:
+        now = datetime.now(timezone.utc)
+        for task in tasks:
+            if self._stop.is_set():
+                break
+            if task.next_run_at is None:
+                task.next_run_at = task.schedule.next_after(now)
+            elif task.next_run_at <= now:
+                self._run_task(task)
+                task.next_run_at = task.schedule.next_after(datetime.now(timezone.utc))
+
+    def _try_become_leader(self) -> None:
+        connection = None
+        try:
+            connection = engine.connect()
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_ID}
+            ).scalar()
+            connection.commit()  # The lock is session-level; don't sit idle in a transaction
+        except Exception as e:
+            logger.error(f"Maintenance leader election failed: {str(e)}")
+            acquired = False
+        if acquired:
+            self._leader_connection = connection
+            logger.info("This process is now the maintenance leader")
+        elif connection is not None:
+            connection.close()
+
+    def _still_leader(self) -> bool:
+        if self._leader_connection is None:
+            return False
+        try:
+            self._leader_connection.execute(text("SELECT 1"))
+            self._leader_connection.commit()
+            return True
+        except Exception as e:
+            # Connection lost, and the lock with it
+            logger.warning(f"Lost maintenance leadership: {str(e)}")
+            self._release_leadership()
+            return False
+
+    def _release_leadership(self) -> None:
+        connection, self._leader_connection = self._leader_connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_ID})
+            connection.commit()
+        except Exception:
+            pass  # Closing the connection releases it anyway
+        finally:
+            connection.invalidate()  # Never hand a connection that held the lock back to the pool
+            connection.close()
+
+    def _run_task(self, task: MaintenanceTask) -> None:
+        started = time.perf_counter()
+        rows, batches, more, error = 0, 0, False, None
+        db = SessionLocal()
+        try:
+            while batches < config.MAINTENANCE_MAX_BATCHES and not self._stop.is_set():
+                affected = task.run_batch(db, config.MAINTENANCE_BATCH_SIZE)
+                rows += affected
+                batches += 1
+                more = affected >= config.MAINTENANCE_BATCH_SIZE
+                if not more:
+                    break
+        except Exception as e:
+            db.rollback()
+            error = str(e)
+            logger.error(f"Maintenance task {task.name} failed: {error}")
+        finally:
+            db.close()
+
+        with self._lock:
+            task.runs += 1
+            task.rows_total += rows
+            task.last_run_at = datetime.now(timezone.utc)
+            task.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            task.last_rows = rows
+            task.last_error = error
+            task.backlog = error is None and more
+            if error:
+                task.errors += 1
+        if rows:
+            logger.info(f"Maintenance task {task.name}: {rows} rows in {task.last_duration_ms} ms")
+
+
+maintenance_scheduler = MaintenanceScheduler(default_tasks())
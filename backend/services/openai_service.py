@@ -1,9 +1,59 @@
-from openai import OpenAI
+import asyncio
+import logging
 import os
+import threading
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
 
+from config import config
+from utils.tokens import estimate_prompt_tokens
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class PromptUsage:
+    """Prompt/completion token counters per operation, from the API's usage field.
+    
+    prompt_tokens_last and prompt_tokens_max show whether prompt size has
+    plateaued for long sessions; estimated_prompt_tokens_last is the local
+    estimate for the same call, to check the budgeting heuristic.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, operation: str, messages: List[Dict[str, str]], response) -> None:
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        estimated = estimate_prompt_tokens(messages)
+        with self._lock:
+            stats = self._operations.setdefault(operation, {
+                "calls": 0, "prompt_tokens_total": 0, "prompt_tokens_max": 0, "prompt_tokens_last": 0,
+                "completion_tokens_total": 0, "estimated_prompt_tokens_last": 0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens_total"] += prompt_tokens
+            stats["prompt_tokens_max"] = max(stats["prompt_tokens_max"], prompt_tokens)
+            stats["prompt_tokens_last"] = prompt_tokens
+            stats["completion_tokens_total"] += completion_tokens
+            stats["estimated_prompt_tokens_last"] = estimated
+        logger.info(f"OpenAI {operation}: {prompt_tokens} prompt tokens (estimated {estimated}), {completion_tokens} completion tokens")
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                operation: {**stats, "prompt_tokens_mean": round(stats["prompt_tokens_total"] / stats["calls"], 1)}
+                for operation, stats in self._operations.items()
+            }
+
+
+prompt_usage = PromptUsage()
+
 class OpenAIService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -12,22 +62,29 @@ class OpenAIService:
             print("Please set your OpenAI API key in the .env file")
             self.client = None
         else:
+            from openai import OpenAI  # Imported on first use; the SDK is slow to load
             self.client = OpenAI(api_key=self.api_key)
     
     def is_available(self) -> bool:
         return self.client is not None
     
     async def generate_chat_response(self, messages: list, system_prompt: str) -> str:
+        """Reply to a conversation. Pass SessionService.build_chat_prompt(...).messages
+        rather than the full transcript so prompt size stays bounded."""
         if not self.client:
             return "I'm sorry, but the AI service is currently unavailable. Please contact us directly at sales@stream-lineai.com for assistance with your automation needs."
         
         try:
-            response = self.client.chat.completions.create(
+            prompt = [{"role": "system", "content": system_prompt}] + messages
+            # The SDK call blocks; keep it off the event loop
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model="gpt-4",
-                messages=[{"role": "system", "content": system_prompt}] + messages,
+                messages=prompt,
                 temperature=0.7,
                 max_tokens=500
             )
+            prompt_usage.record("chat", prompt, response)
             return response.choices[0].message.content
         except Exception as e:
             print(f"Error generating chat response: {e}")
@@ -74,15 +131,17 @@ class OpenAIService:
         """
         
         try:
+            prompt = [
+                {"role": "system", "content": "You are a senior automation consultant creating detailed proposals."},
+                {"role": "user", "content": proposal_prompt}
+            ]
             response = self.client.chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a senior automation consultant creating detailed proposals."},
-                    {"role": "user", "content": proposal_prompt}
-                ],
+                messages=prompt,
                 temperature=0.3,
                 max_tokens=1000
             )
+            prompt_usage.record("proposal", prompt, response)
             return response.choices[0].message.content
         except Exception as e:
             print(f"Error generating proposal: {e}")
@@ -93,19 +152,21 @@ class OpenAIService:
             return {}
         
         try:
+            prompt = [
+                {
+                    "role": "system",
+                    "content": """Extract customer information from this conversation. 
+                    Return a JSON object with: email, name, business_type, pain_points, current_tools, budget.
+                    Only include fields that were clearly mentioned. Use null for missing information."""
+                },
+                {"role": "user", "content": conversation}
+            ]
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Extract customer information from this conversation. 
-                        Return a JSON object with: email, name, business_type, pain_points, current_tools, budget.
-                        Only include fields that were clearly mentioned. Use null for missing information."""
-                    },
-                    {"role": "user", "content": conversation}
-                ],
+                messages=prompt,
                 temperature=0
             )
+            prompt_usage.record("extract_customer_info", prompt, response)
             
             import json
             extracted_data = json.loads(response.choices[0].message.content)
@@ -113,6 +174,41 @@ class OpenAIService:
         except Exception as e:
             print(f"Error extracting customer info: {e}")
             return {}
+    
+    async def summarize_conversation(self, previous_summary: Optional[str], messages: List[Dict[str, str]]) -> Optional[str]:
+        """Fold new messages into a running conversation summary; None if unavailable"""
+        if not self.client:
+            return None
+        
+        transcript = "\n".join(
+            f"{'Bot' if message['role'] == 'assistant' else 'User'}: {message['content']}" for message in messages
+        )
+        try:
+            prompt = [
+                {
+                    "role": "system",
+                    "content": """You maintain a running summary of a sales chat between StreamlineAI and a prospect.
+                    Merge the new messages into the existing summary. Keep names, contact details, business type,
+                    pain points, current tools, budget, commitments and open questions. Drop small talk.
+                    Return only the updated summary."""
+                },
+                {
+                    "role": "user",
+                    "content": f"Existing summary:\n{previous_summary or '(none yet)'}\n\nNew messages:\n{transcript}"
+                }
+            ]
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
+                model="gpt-3.5-turbo",
+                messages=prompt,
+                temperature=0,
+                max_tokens=config.CHAT_SUMMARY_MAX_TOKENS
+            )
+            prompt_usage.record("summary", prompt, response)
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return None
 
 # System prompt for the chatbot
 SYSTEM_PROMPT = """
@@ -0,0 +1,170 @@
+"""
+bcrypt hashing off the event loop.
+
+A bcrypt hash or verify costs roughly 100-300 ms of CPU. Async handlers
+(login, register, cross-app auth, password resets) await hash_password_async /
+verify_password_async instead. These run the work on a small dedicated thread
+pool; bcrypt releases the GIL while hashing, so threads give real parallelism
+without process start-up or pickling. The pool size (PASSWORD_HASH_WORKERS)
+bounds CPU spent on hashing. At most PASSWORD_HASH_MAX_PENDING operations may
+wait for it; beyond that callers get a 503 instead of queueing without limit.
+
+The cost factor is BCRYPT_ROUNDS. verify_password_async returns a replacement
+hash when the stored one was made with a different cost, so logins migrate
+hashes transparently.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+# min/max rounds equal to the default make needs_update() flag any hash made
+# with another cost factor, in either direction
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=config.BCRYPT_ROUNDS,
+)
+
+_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+class HasherStats:
+    """Queue wait / hash time counters for the bcrypt pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.hash_total_ms = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def try_enqueue(self) -> Optional[list]:
+        """A ticket for one queued operation, or None when the queue is full"""
+        with self._lock:
+            if self.pending >= config.PASSWORD_HASH_MAX_PENDING:
+                self.rejected += 1
+                return None
+            self.pending += 1
+            return [False]  # [dequeued]
+
+    def _dequeue(self, ticket: list) -> None:
+        if not ticket[0]:
+            ticket[0] = True
+            self.pending -= 1
+
+    def started(self, ticket: list, wait_ms: float) -> None:
+        with self._lock:
+            self._dequeue(ticket)
+            self.in_flight += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            for index, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+
+    def finished(self, hash_ms: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.hash_total_ms += hash_ms
+
+    def cancelled(self, ticket: list) -> None:
+        """The caller gave up; a job that never started leaves the queue"""
+        with self._lock:
+            self._dequeue(ticket)
+
+    def record_rehash(self) -> None:
+        with self._lock:
+            self.rehashed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": config.PASSWORD_HASH_WORKERS,
+                "max_pending": config.PASSWORD_HASH_MAX_PENDING,
+                "bcrypt_rounds": config.BCRYPT_ROUNDS,
+                "pending": self.pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "queue_wait_avg_ms": round(self.wait_total_ms / self.completed, 2) if self.completed else 0.0,
+                "queue_wait_max_ms": round(self.wait_max_ms, 2),
+                "hash_avg_ms": round(self.hash_total_ms / self.completed, 2) if self.completed else 0.0,
+                "queue_wait_buckets": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+                },
+            }
+
+
+stats = HasherStats()
+
+
+async def _run(fn: Callable[..., Any], *args) -> Any:
+    ticket = stats.try_enqueue()
+    if ticket is None:
+        logger.warning(f"Password hashing queue full ({config.PASSWORD_HASH_MAX_PENDING} pending), rejecting")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        stats.started(ticket, (started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            stats.finished((time.perf_counter() - started) * 1000)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    except asyncio.CancelledError:
+        stats.cancelled(ticket)
+        raise
+
+
+async def hash_password_async(password: str) -> str:
+    """bcrypt-hash a password on the hashing pool"""
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """Check a password on the hashing pool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash should be
+    replaced (different cost factor or deprecated scheme).
+    """
+    valid, new_hash = await _run(pwd_context.verify_and_update, password, password_hash)
+    if valid and new_hash:
+        stats.record_rehash()
+    return valid, new_hash
+
+
+def get_hasher_stats() -> Dict[str, Any]:
+    return stats.snapshot()
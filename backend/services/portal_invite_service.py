@@ -1,11 +1,21 @@
 from models import PortalInvite, User
 from services.base_service import BaseService
 from sqlalchemy.orm import Session
+from sqlalchemy import column, select, table, update
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import secrets
 import string
 
+# The table as migrated (005); the PortalInvite model has drifted from it and
+# has no status column
+portal_invites_table = table(
+    "portal_invites",
+    column("id"),
+    column("status"),
+    column("expires_at"),
+)
+
 class PortalInviteService(BaseService):
     def __init__(self, db: Session):
         super().__init__(db)
@@ -80,15 +90,19 @@ class PortalInviteService(BaseService):
         return (invite.status == "pending" and 
                 invite.expires_at > datetime.utcnow())
     
-    def expire_old_invites(self) -> int:
-        """Mark expired invites as expired and return count"""
-        expired_invites = self.db.query(PortalInvite).filter(
-            PortalInvite.status == "pending",
-            PortalInvite.expires_at < datetime.utcnow()
-        ).all()
-        
-        for invite in expired_invites:
-            invite.status = "expired"
+    def expire_old_invites(self, batch_size: Optional[int] = None) -> int:
+        """Mark expired invites as expired, at most batch_size of them, and return count"""
+        expired = select(portal_invites_table.c.id).where(
+            portal_invites_table.c.status == "pending",
+            portal_invites_table.c.expires_at < datetime.now(timezone.utc)
+        ).order_by(portal_invites_table.c.id)
+        if batch_size:
+            expired = expired.limit(batch_size)
         
+        result = self.db.execute(
+            update(portal_invites_table)
+            .where(portal_invites_table.c.id.in_(expired.with_for_update(skip_locked=True)))
+            .values(status="expired")
+        )
         self.db.commit()
-        return len(expired_invites)
+        return result.rowcount
@@ -0,0 +1,228 @@
+"""
+Full-text search across jobs, customers, chat messages and change requests.
+
+Every searchable table carries a ``search_vector`` tsvector column that
+PostgreSQL maintains as a STORED generated column and indexes with GIN, so
+all lookups here are index scans instead of ``ILIKE '%term%'`` table scans.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import ChatMessage, ChatSession, CustomerChangeRequest, Job, User
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used to build queries for each model; must match
+# the configuration of the model's generated search document
+SEARCH_CONFIGS = {
+    Job: "english",
+    User: "simple",
+    ChatMessage: "english",
+    CustomerChangeRequest: "english",
+}
+
+SEARCH_TYPES = ["jobs", "customers", "messages", "change_requests"]
+
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, "
+    "ShortWord=3, MaxFragments=2, FragmentDelimiter=\" ... \""
+)
+
+# Characters that may appear inside a search term; everything else is a separator.
+# Keeping tsquery operators (& | ! ( ) : * < >) out makes user input safe for to_tsquery.
+_TERM_RE = re.compile(r"[\w@.+-]+", re.UNICODE)
+
+
+def build_prefix_query(text: Optional[str], operator: str = "&") -> Optional[str]:
+    """Turn free text into a prefix-matching tsquery string ("acme:* & web:*")"""
+    if not text:
+        return None
+
+    terms = []
+    for raw in _TERM_RE.findall(text.lower()):
+        term = raw.strip(".+-")
+        if term and term not in terms:
+            terms.append(term)
+
+    if not terms:
+        return None
+
+    return f" {operator} ".join(f"{term}:*" for term in terms)
+
+
+def match_clause(model, text: Optional[str], operator: str = "&"):
+    """Build a ``search_vector @@ tsquery`` filter for a model, or None for empty input"""
+    query_string = build_prefix_query(text, operator)
+    if not query_string:
+        return None
+
+    ts_query = func.to_tsquery(SEARCH_CONFIGS[model], query_string)
+    return model.search_vector.op("@@")(ts_query)
+
+
+def rank_clause(model, text: Optional[str], operator: str = "&"):
+    """Build a ``ts_rank_cd`` expression for ordering matches best-first"""
+    ts_query = func.to_tsquery(SEARCH_CONFIGS[model], build_prefix_query(text, operator) or "")
+    return func.ts_rank_cd(model.search_vector, ts_query, 32)
+
+
+class SearchService:
+    """Ranked full-text search with highlight snippets"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, text: str, types: Optional[List[str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Search all requested entity types and return results merged by rank"""
+        query_string = build_prefix_query(text)
+        if not query_string:
+            return []
+
+        types = types or SEARCH_TYPES
+        searchers = {
+            "jobs": self._search_jobs,
+            "customers": self._search_customers,
+            "messages": self._search_messages,
+            "change_requests": self._search_change_requests,
+        }
+
+        results: List[Dict[str, Any]] = []
+        for search_type in types:
+            results.extend(searchers[search_type](query_string, limit))
+
+        results.sort(key=lambda result: result["rank"], reverse=True)
+        return results[:limit]
+
+    def _ts_query(self, model, query_string: str):
+        return func.to_tsquery(SEARCH_CONFIGS[model], query_string)
+
+    def _rank(self, model, ts_query):
+        # Normalization 32 scales rank into 0..1 so results from different tables are comparable
+        return func.ts_rank_cd(model.search_vector, ts_query, 32)
+
+    def _headline(self, model, document, ts_query):
+        return func.ts_headline(SEARCH_CONFIGS[model], document, ts_query, HEADLINE_OPTIONS)
+
+    def _search_jobs(self, query_string: str, limit: int) -> List[Dict[str, Any]]:
+        ts_query = self._ts_query(Job, query_string)
+        rank = self._rank(Job, ts_query).label("rank")
+
+        rows = self.db.query(
+            Job.id,
+            Job.title,
+            Job.status,
+            Job.customer_id,
+            rank,
+            self._headline(Job, func.coalesce(Job.description, Job.title), ts_query).label("snippet"),
+        ).filter(
+            Job.search_vector.op("@@")(ts_query)
+        ).order_by(rank.desc()).limit(limit).all()
+
+        return [
+            {
+                "type": "job",
+                "id": row.id,
+                "title": row.title,
+                "snippet": row.snippet,
+                "rank": float(row.rank),
+                "status": row.status,
+                "customer_id": row.customer_id,
+            }
+            for row in rows
+        ]
+
+    def _search_customers(self, query_string: str, limit: int) -> List[Dict[str, Any]]:
+        ts_query = self._ts_query(User, query_string)
+        rank = self._rank(User, ts_query).label("rank")
+        document = func.concat_ws(" - ", User.name, User.email, User.business_name, User.business_type)
+
+        rows = self.db.query(
+            User.id,
+            User.name,
+            User.email,
+            User.business_name,
+            rank,
+            self._headline(User, document, ts_query).label("snippet"),
+        ).filter(
+            User.user_type == "customer",
+            User.search_vector.op("@@")(ts_query)
+        ).order_by(rank.desc()).limit(limit).all()
+
+        return [
+            {
+                "type": "customer",
+                "id": row.id,
+                "title": row.name or row.email,
+                "snippet": row.snippet,
+                "rank": float(row.rank),
+                "email": row.email,
+                "business_name": row.business_name,
+            }
+            for row in rows
+        ]
+
+    def _search_messages(self, query_string: str, limit: int) -> List[Dict[str, Any]]:
+        ts_query = self._ts_query(ChatMessage, query_string)
+        rank = self._rank(ChatMessage, ts_query).label("rank")
+
+        rows = self.db.query(
+            ChatMessage.id,
+            ChatMessage.is_bot,
+            ChatMessage.timestamp,
+            ChatSession.session_id,
+            ChatSession.customer_id,
+            rank,
+            self._headline(ChatMessage, ChatMessage.text, ts_query).label("snippet"),
+        ).join(
+            ChatSession, ChatMessage.session_id == ChatSession.id
+        ).filter(
+            ChatMessage.search_vector.op("@@")(ts_query)
+        ).order_by(rank.desc()).limit(limit).all()
+
+        return [
+            {
+                "type": "message",
+                "id": row.id,
+                "title": "Bot message" if row.is_bot else "Customer message",
+                "snippet": row.snippet,
+                "rank": float(row.rank),
+                "session_id": row.session_id,
+                "customer_id": row.customer_id,
+                "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+            }
+            for row in rows
+        ]
+
+    def _search_change_requests(self, query_string: str, limit: int) -> List[Dict[str, Any]]:
+        ts_query = self._ts_query(CustomerChangeRequest, query_string)
+        rank = self._rank(CustomerChangeRequest, ts_query).label("rank")
+
+        rows = self.db.query(
+            CustomerChangeRequest.id,
+            CustomerChangeRequest.title,
+            CustomerChangeRequest.status,
+            CustomerChangeRequest.job_id,
+            CustomerChangeRequest.customer_id,
+            rank,
+            self._headline(CustomerChangeRequest, CustomerChangeRequest.description, ts_query).label("snippet"),
+        ).filter(
+            CustomerChangeRequest.search_vector.op("@@")(ts_query)
+        ).order_by(rank.desc()).limit(limit).all()
+
+        return [
+            {
+                "type": "change_request",
+                "id": row.id,
+                "title": row.title,
+                "snippet": row.snippet,
+                "rank": float(row.rank),
+                "status": row.status,
+                "job_id": row.job_id,
+                "customer_id": row.customer_id,
+            }
+            for row in rows
+        ]
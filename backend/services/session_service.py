@@ -4,13 +4,36 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from schemas.chat import ChatSessionCreate, ChatMessageCreate
 from typing import Optional, List, Tuple
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
 import uuid
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from config import config
+from services.chat_message_buffer import ChatMessageBuffer, chat_message_buffer
+from services.event_bus import event_bus
+from utils.tokens import estimate_message_tokens, estimate_prompt_tokens
+from utils.ttl_cache import TTLCache
+
+HISTORY_PAGE_SIZE = 20  # Messages fetched per step while filling a token budget
+
+# chat_sessions.id by public session_id for sessions this worker wrote to, so
+# add_message skips the lookup. Rows are never re-keyed; delete_session evicts.
+session_pks = TTLCache(max_size=4096, ttl_seconds=3600)
+
+
+@dataclass
+class ChatPrompt:
+    """What a chat completion needs from the session: rolling summary plus recent messages"""
+    summary: Optional[str] = None
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    estimated_tokens: int = 0
+    summary_due: bool = False  # Enough unsummarized messages to fold into the summary
+
 
 class SessionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, message_buffer: Optional[ChatMessageBuffer] = None):
         self.db = db
+        self.message_buffer = message_buffer or chat_message_buffer
     
     def create_session(self, session_id: str, customer_id: Optional[int] = None) -> ChatSession:
         """Create a new chat session"""
@@ -32,18 +55,59 @@ class SessionService:
             session = self.create_session(session_id)
         return session
     
+    def _session_pk_for_write(self, session_id: str) -> int:
+        session_pk = session_pks.get(session_id)
+        if session_pk is None:
+            session_pk = self.get_or_create_session(session_id).id
+            session_pks.put(session_id, session_pk)
+        return session_pk
+    
+    def flush_pending_messages(self, session_id: Optional[str] = None) -> None:
+        """Write buffered messages before a read (all sessions when session_id is None)"""
+        if session_id is None:
+            if len(self.message_buffer):
+                self.message_buffer.flush()
+            return
+        session_pk = session_pks.get(session_id)
+        if session_pk is not None and self.message_buffer.has_pending(session_pk):
+            self.message_buffer.flush()
+    
     def add_message(self, session_id: str, text: str, is_bot: bool = False) -> ChatMessage:
-        session = self.get_or_create_session(session_id)
+        """Record a chat message.
+        
+        With the write-behind buffer enabled the returned message is not
+        persisted yet (its id is None); reads through this service flush it
+        first. See services/chat_message_buffer.py.
+        """
+        session_pk = self._session_pk_for_write(session_id)
         
         message = ChatMessage(
             message_id=str(uuid.uuid4()),
-            session_id=session.id,
+            session_id=session_pk,
             text=text,
-            is_bot=is_bot
+            is_bot=is_bot,
+            timestamp=datetime.now(timezone.utc)
         )
-        self.db.add(message)
-        self.db.commit()
-        self.db.refresh(message)
+        if not self.message_buffer.enabled:
+            self.db.add(message)
+            self.db.commit()
+            self.db.refresh(message)
+        else:
+            self.message_buffer.add({
+                "message_id": message.message_id,
+                "session_id": session_pk,
+                "text": text,
+                "is_bot": is_bot,
+                "timestamp": message.timestamp
+            }, session_key=session_id)
+        
+        event_bus.publish("chat.message", {
+            "session_id": session_id,
+            "message_id": message.message_id,
+            "text": text,
+            "is_bot": is_bot,
+            "timestamp": message.timestamp
+        })
         return message
     
     def get_session_messages(self, session_id: str, limit: int = 50) -> List[ChatMessage]:
@@ -51,12 +115,123 @@ class SessionService:
         if not session:
             return []
         
+        self.flush_pending_messages(session_id)
         return self.db.query(ChatMessage)\
             .filter(ChatMessage.session_id == session.id)\
             .order_by(ChatMessage.timestamp)\
             .limit(limit)\
             .all()
     
+    def _session_pk(self, session_id: str):
+        """Scalar subquery for a session's primary key, so message reads need no separate lookup"""
+        return select(ChatSession.id)\
+            .where(ChatSession.session_id == session_id)\
+            .limit(1)\
+            .scalar_subquery()
+    
+    def _newest_messages(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+        after_message_id: Optional[int] = None
+    ) -> List[ChatMessage]:
+        """Up to `limit` messages older than the (timestamp, id) cursor, newest first.
+        
+        Walks ix_chat_messages_session_timestamp backwards and stops after
+        `limit` rows, however long the conversation is. Messages up to
+        after_message_id (already folded into the summary) are skipped.
+        """
+        self.flush_pending_messages(session_id)
+        query = self.db.query(ChatMessage)\
+            .filter(ChatMessage.session_id == self._session_pk(session_id))
+        if after_message_id is not None:
+            query = query.filter(ChatMessage.id > after_message_id)
+        if before is not None:
+            query = query.filter(tuple_(ChatMessage.timestamp, ChatMessage.id) < tuple_(*before))
+        return query\
+            .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())\
+            .limit(limit)\
+            .all()
+    
+    def get_recent_messages(self, session_id: str, limit: int = 20) -> List[ChatMessage]:
+        """The last `limit` messages of a session, oldest first"""
+        return list(reversed(self._newest_messages(session_id, limit)))
+    
+    def build_chat_history(
+        self,
+        session_id: str,
+        token_budget: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        after_message_id: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """Most recent messages that fit the token budget, as OpenAI chat messages (oldest first).
+        
+        Pages backwards through the conversation and stops as soon as the next
+        message would overflow the budget, so long transcripts are never
+        loaded in full. The newest message is always included.
+        """
+        token_budget = config.CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+        max_messages = config.CHAT_HISTORY_MAX_MESSAGES if max_messages is None else max_messages
+        
+        history: List[Dict[str, str]] = []
+        tokens_used = 0
+        cursor = None
+        while len(history) < max_messages:
+            page = self._newest_messages(
+                session_id, min(HISTORY_PAGE_SIZE, max_messages - len(history)), cursor, after_message_id
+            )
+            for msg in page:
+                entry = {"role": "assistant" if msg.is_bot else "user", "content": msg.text}
+                cost = estimate_message_tokens(entry)
+                if history and tokens_used + cost > token_budget:
+                    return history[::-1]
+                history.append(entry)
+                tokens_used += cost
+            if len(page) < HISTORY_PAGE_SIZE:
+                break
+            cursor = (page[-1].timestamp, page[-1].id)
+        return history[::-1]
+    
+    def count_unsummarized_messages(self, session: ChatSession, cap: int) -> int:
+        """Messages newer than the session's summary, counting at most `cap`"""
+        self.flush_pending_messages(session.session_id)
+        query = select(ChatMessage.id).where(ChatMessage.session_id == session.id)
+        if session.summary_through_message_id is not None:
+            query = query.where(ChatMessage.id > session.summary_through_message_id)
+        return self.db.execute(
+            select(func.count()).select_from(query.limit(cap).subquery())
+        ).scalar_one()
+    
+    def build_chat_prompt(self, session_id: str, token_budget: Optional[int] = None) -> ChatPrompt:
+        """Rolling summary plus the recent messages it does not cover, within the token budget.
+        
+        Once a session has a summary, the prompt stops growing with the
+        conversation: the summary is rewritten in the background every
+        CHAT_SUMMARY_EVERY_MESSAGES messages (see services.conversation_summary).
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return ChatPrompt()
+        
+        token_budget = config.CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+        summary_message = (
+            [{"role": "system", "content": f"Summary of the earlier conversation: {session.summary}"}]
+            if session.summary else []
+        )
+        messages = self.build_chat_history(
+            session_id,
+            token_budget=token_budget - estimate_prompt_tokens(summary_message),
+            after_message_id=session.summary_through_message_id
+        )
+        due_at = config.CHAT_SUMMARY_KEEP_RECENT + config.CHAT_SUMMARY_EVERY_MESSAGES
+        return ChatPrompt(
+            summary=session.summary,
+            messages=summary_message + messages,
+            estimated_tokens=estimate_prompt_tokens(summary_message + messages),
+            summary_due=self.count_unsummarized_messages(session, due_at) >= due_at
+        )
+    
     def link_session_to_customer(self, session_id: str, customer_id: int) -> Optional[ChatSession]:
         """Link an existing session to a customer"""
         session = self.get_session(session_id)
@@ -75,6 +250,7 @@ class SessionService:
     
     def get_customer_sessions_with_message_counts(self, customer_id: int) -> List[dict]:
         """Get customer sessions with message counts using efficient SQL"""
+        self.flush_pending_messages()
         result = self.db.query(
             ChatSession,
             func.count(ChatMessage.id).label('message_count')
@@ -111,15 +287,20 @@ class SessionService:
         return session
     
     def get_conversation_history(self, session_id: str, last_n: int = 20) -> str:
-        """Get conversation history as formatted string for AI processing"""
-        messages = self.get_session_messages(session_id)
-        if not messages:
+        """Get conversation history as formatted string for AI processing.
+        
+        Starts with the rolling summary when the session has one; the messages
+        that follow are the ones it does not cover yet.
+        """
+        session = self.get_session(session_id)
+        if not session:
             return ""
         
-        # Get last N messages
-        recent_messages = messages[-last_n:] if len(messages) > last_n else messages
+        recent_messages = list(reversed(
+            self._newest_messages(session_id, last_n, after_message_id=session.summary_through_message_id)
+        ))
         
-        conversation = []
+        conversation = [f"Summary of earlier conversation: {session.summary}"] if session.summary else []
         for msg in recent_messages:
             role = "Bot" if msg.is_bot else "User"
             conversation.append(f"{role}: {msg.text}")
@@ -157,6 +338,7 @@ class SessionService:
 
     def get_all_sessions(self) -> List[ChatSession]:
         """Get all chat sessions ordered by creation date"""
+        self.flush_pending_messages()
         return self.db.query(ChatSession)\
             .options(
                 # joinedload(ChatSession.messages), # This line was removed as per the new_code
@@ -167,6 +349,7 @@ class SessionService:
 
     def get_all_sessions_with_customers(self) -> List[Tuple[ChatSession, Optional[User], int]]:
         """Get all sessions with customer info and message count for admin dashboard"""
+        self.flush_pending_messages()
         # Query sessions with left join to customers and count of messages
         result = self.db.query(
             ChatSession,
@@ -188,6 +371,8 @@ class SessionService:
         """Delete a chat session and all its messages"""
         session = self.get_session(session_id)
         if session:
+            self.flush_pending_messages(session_id)
+            session_pks.discard(session_id)
             # Delete all messages first
             self.db.query(ChatMessage).filter(ChatMessage.session_id == session.id).delete()
             # Then delete the session
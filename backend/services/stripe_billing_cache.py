@@ -0,0 +1,209 @@
+"""
+Read-through cache of Stripe invoices and payment methods.
+
+The billing page is served from stripe_invoices / stripe_payment_methods.
+Webhooks (invoice.*, payment_method.*) keep the mirror current; a customer
+whose last full sync is older than BILLING_CACHE_TTL is re-listed from Stripe
+on the next read. If Stripe is unreachable the cached rows are served and
+marked stale.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.stripe_models import StripeCustomer, StripeInvoice, StripePaymentMethod
+from services.stripe_client import stripe, stripe_call
+
+logger = logging.getLogger(__name__)
+
+BILLING_CACHE_TTL = timedelta(minutes=15)
+INVOICE_LIST_LIMIT = 100
+
+
+def _timestamp(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value else None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class StripeBillingCache:
+    """Keeps the local invoice/payment method mirror in sync with Stripe"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Webhook and sync writers
+
+    def upsert_invoice(self, customer: StripeCustomer, invoice: Dict[str, Any]) -> None:
+        values = {
+            "stripe_invoice_id": invoice["id"],
+            "customer_id": customer.id,
+            "stripe_subscription_id": invoice.get("subscription"),
+            "number": invoice.get("number"),
+            "status": invoice.get("status"),
+            "amount_due": invoice.get("amount_due") or 0,
+            "amount_paid": invoice.get("amount_paid") or 0,
+            "currency": invoice.get("currency"),
+            "description": invoice.get("description"),
+            "due_date": _timestamp(invoice.get("due_date")),
+            "stripe_created_at": _timestamp(invoice.get("created")),
+            "hosted_invoice_url": invoice.get("hosted_invoice_url"),
+            "invoice_pdf": invoice.get("invoice_pdf"),
+        }
+        stmt = pg_insert(StripeInvoice).values(**values)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["stripe_invoice_id"],
+            set_={**{key: stmt.excluded[key] for key in values if key != "stripe_invoice_id"}, "updated_at": datetime.now(timezone.utc)}
+        ))
+
+    def upsert_payment_method(self, customer: StripeCustomer, method: Dict[str, Any]) -> None:
+        card = method.get("card") or {}
+        values = {
+            "stripe_payment_method_id": method["id"],
+            "customer_id": customer.id,
+            "type": method.get("type") or "card",
+            "card_brand": card.get("brand"),
+            "card_last4": card.get("last4"),
+            "card_exp_month": card.get("exp_month"),
+            "card_exp_year": card.get("exp_year"),
+        }
+        stmt = pg_insert(StripePaymentMethod).values(**values)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["stripe_payment_method_id"],
+            set_={**{key: stmt.excluded[key] for key in values if key != "stripe_payment_method_id"}, "updated_at": datetime.now(timezone.utc)}
+        ))
+
+    def remove_payment_method(self, payment_method_id: str) -> None:
+        self.db.query(StripePaymentMethod).filter(
+            StripePaymentMethod.stripe_payment_method_id == payment_method_id
+        ).delete(synchronize_session=False)
+
+    def customer_for(self, stripe_customer_id: Optional[str]) -> Optional[StripeCustomer]:
+        if not stripe_customer_id:
+            return None
+        return self.db.query(StripeCustomer).filter(
+            StripeCustomer.stripe_customer_id == stripe_customer_id
+        ).first()
+
+    def apply_invoice_event(self, invoice: Dict[str, Any]) -> None:
+        """Mirror an invoice.* webhook object"""
+        customer = self.customer_for(invoice.get("customer"))
+        if customer:
+            self.upsert_invoice(customer, invoice)
+            self.db.commit()
+
+    def apply_payment_method_event(self, event_type: str, method: Dict[str, Any]) -> None:
+        """Mirror a payment_method.* webhook object"""
+        if event_type == "payment_method.detached":
+            self.remove_payment_method(method["id"])
+        else:
+            customer = self.customer_for(method.get("customer"))
+            if not customer:
+                return
+            self.upsert_payment_method(customer, method)
+        self.db.commit()
+
+    async def refresh(self, customer: StripeCustomer) -> None:
+        """Re-list invoices and card payment methods from Stripe and replace the mirror"""
+        invoices, methods = await asyncio.gather(
+            stripe_call(
+                "Invoice.list", stripe.Invoice.list, customer=customer.stripe_customer_id, limit=INVOICE_LIST_LIMIT
+            ),
+            stripe_call(
+                "PaymentMethod.list", stripe.PaymentMethod.list, customer=customer.stripe_customer_id, type="card"
+            ),
+        )
+
+        for invoice in invoices.data:
+            self.upsert_invoice(customer, invoice)
+
+        method_ids = [method["id"] for method in methods.data]
+        for method in methods.data:
+            self.upsert_payment_method(customer, method)
+        stale_methods = self.db.query(StripePaymentMethod).filter(
+            StripePaymentMethod.customer_id == customer.id
+        )
+        if method_ids:
+            stale_methods = stale_methods.filter(StripePaymentMethod.stripe_payment_method_id.notin_(method_ids))
+        stale_methods.delete(synchronize_session=False)
+
+        customer.billing_synced_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+    # Reader
+
+    async def get_billing(self, customer: StripeCustomer, force_refresh: bool = False) -> Dict[str, Any]:
+        """Invoices and payment methods from the mirror, refreshing first when stale"""
+        synced_at = customer.billing_synced_at
+        expired = synced_at is None or datetime.now(timezone.utc) - synced_at > BILLING_CACHE_TTL
+        refreshed = False
+        refresh_error = None
+
+        if force_refresh or expired:
+            try:
+                await self.refresh(customer)
+                refreshed = True
+            except Exception as e:
+                self.db.rollback()
+                refresh_error = str(e)
+                logger.warning(f"Stripe billing refresh failed for customer {customer.stripe_customer_id}, serving cache: {str(e)}")
+
+        synced_at = customer.billing_synced_at
+        return {
+            "invoices": self._invoice_rows(customer.id),
+            "payment_methods": self._payment_method_rows(customer.id),
+            "cache": {
+                "source": "stripe" if refreshed else "cache",
+                "synced_at": _isoformat(synced_at),
+                "age_seconds": round((datetime.now(timezone.utc) - synced_at).total_seconds()) if synced_at else None,
+                "ttl_seconds": int(BILLING_CACHE_TTL.total_seconds()),
+                "stale": refresh_error is not None,
+                "error": refresh_error
+            }
+        }
+
+    def _invoice_rows(self, customer_id: int) -> List[Dict[str, Any]]:
+        invoices = self.db.query(StripeInvoice).filter(
+            StripeInvoice.customer_id == customer_id
+        ).order_by(StripeInvoice.stripe_created_at.desc()).limit(INVOICE_LIST_LIMIT).all()
+
+        return [
+            {
+                "id": invoice.stripe_invoice_id,
+                "number": invoice.number,
+                "amount": invoice.amount_due,
+                "amount_paid": invoice.amount_paid,
+                "currency": invoice.currency,
+                "status": invoice.status,
+                "due_date": _isoformat(invoice.due_date),
+                "created_at": _isoformat(invoice.stripe_created_at),
+                "description": invoice.description or "Invoice",
+                "hosted_invoice_url": invoice.hosted_invoice_url,
+                "invoice_pdf": invoice.invoice_pdf,
+                "stripe_invoice_id": invoice.stripe_invoice_id
+            }
+            for invoice in invoices
+        ]
+
+    def _payment_method_rows(self, customer_id: int) -> List[Dict[str, Any]]:
+        methods = self.db.query(StripePaymentMethod).filter(
+            StripePaymentMethod.customer_id == customer_id
+        ).order_by(StripePaymentMethod.created_at.desc()).all()
+
+        return [
+            {
+                "id": method.stripe_payment_method_id,
+                "type": method.type,
+                "last4": method.card_last4,
+                "brand": method.card_brand,
+                "exp_month": method.card_exp_month,
+                "exp_year": method.card_exp_year
+            }
+            for method in methods
+        ]
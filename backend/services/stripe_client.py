@@ -0,0 +1,258 @@
+"""
+Non-blocking access to the Stripe SDK.
+
+The stripe package is synchronous. ``stripe_call`` runs an SDK call on a
+bounded thread pool so the event loop keeps serving other requests, applies a
+per-call timeout and a circuit breaker, and records latency per operation.
+
+A timed-out call keeps running in its pool thread, so a retry can reach
+Stripe while the first request is still in flight. Every write therefore
+carries an idempotency key (``write_key``) built from its inputs: a retry
+sends the same key, and Stripe replays the first result instead of charging,
+refunding or creating twice. ``stripe_call`` refuses writes without one.
+
+Each pool thread reuses its own HTTP session (stripe.RequestsClient keeps one
+per thread), so connections to api.stripe.com stay warm.
+
+The SDK itself is imported on first use: ``stripe`` here is a lazy module
+that is configured (API key, version, HTTP client) when it loads. Services
+import it from this module instead of importing the stripe package.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional
+
+from config import config
+from utils.lazy_import import lazy_module
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+def _configure_stripe(module) -> None:
+    module.api_key = os.getenv("STRIPE_SECRET_KEY")
+    module.api_version = os.getenv("STRIPE_API_VERSION")
+    module.default_http_client = module.RequestsClient(timeout=config.STRIPE_TIMEOUT_SECONDS)
+
+
+stripe = lazy_module("stripe", on_load=_configure_stripe)
+
+_executor = ThreadPoolExecutor(max_workers=config.STRIPE_MAX_CONCURRENCY, thread_name_prefix="stripe")
+
+
+@lru_cache(maxsize=None)
+def _transient_errors() -> tuple:
+    """Errors that say Stripe (or the path to it) is unhealthy; card declines and
+    invalid requests are the caller's problem and do not trip the breaker"""
+    return (
+        stripe.error.APIConnectionError,
+        stripe.error.APIError,
+        stripe.error.RateLimitError,
+        asyncio.TimeoutError,
+    )
+
+
+@lru_cache(maxsize=None)
+def _unavailable_error() -> type:
+    class StripeUnavailableError(stripe.error.StripeError):
+        """Raised without calling Stripe while the circuit breaker is open"""
+
+    StripeUnavailableError.__module__ = __name__
+    return StripeUnavailableError
+
+
+def __getattr__(name: str):
+    # StripeUnavailableError subclasses stripe.error.StripeError, so it is
+    # built when first requested rather than at import
+    if name == "StripeUnavailableError":
+        return _unavailable_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures and lets a
+    single trial call through once ``reset_timeout`` has passed"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise _unavailable_error()("Stripe is temporarily unavailable, please try again shortly")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                logger.warning(f"Stripe circuit breaker open after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_other(self) -> None:
+        """A non-transient error still proves Stripe answered"""
+        self.record_success()
+
+    def record_cancelled(self) -> None:
+        """The caller went away; let the next call be the trial"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LatencyHistogram:
+    """Per-operation latency histogram with call/error counts"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, operation: str, duration_ms: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            stats = self._operations.setdefault(operation, {
+                "count": 0,
+                "errors": 0,
+                "sum_ms": 0.0,
+                "buckets": [0] * len(self.buckets)
+            })
+            stats["count"] += 1
+            stats["sum_ms"] += duration_ms
+            if error:
+                stats["errors"] += 1
+            for index, bound in enumerate(self.buckets):
+                if duration_ms <= bound:
+                    stats["buckets"][index] += 1
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                operation: {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["sum_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(self.buckets, stats["buckets"])
+                    }
+                }
+                for operation, stats in self._operations.items()
+            }
+
+
+circuit_breaker = CircuitBreaker()
+latency = LatencyHistogram()
+
+# SDK methods that change state on Stripe's side
+WRITE_METHODS = frozenset({"create", "modify", "update", "detach", "cancel", "delete", "confirm", "capture", "pay"})
+
+
+def write_key(operation: str, *parts: Any, window_seconds: Optional[float] = None) -> str:
+    """Idempotency key for one logical Stripe write: the same inputs give the same key.
+
+    Without a window the key never changes, for writes keyed on something
+    that is always a duplicate when repeated (a caller's refund request id,
+    detaching one payment method). ``window_seconds`` adds a time bucket for
+    writes that may be repeated on purpose later; a retry within the bucket
+    still replays.
+    """
+    material = json.dumps(parts, sort_keys=True, default=str)
+    if window_seconds:
+        material += f"|{int(time.time() // window_seconds)}"
+    return f"{operation}:{hashlib.sha256(material.encode()).hexdigest()[:40]}"
+
+
+async def stripe_call(
+    operation: str,
+    fn: Callable[..., Any],
+    *args,
+    timeout: Optional[float] = None,
+    idempotency_key: Optional[str] = None,
+    **kwargs
+) -> Any:
+    """Run a blocking Stripe SDK call off the event loop.
+
+    ``operation`` names the call in metrics, e.g. "Subscription.modify".
+    Writes (see WRITE_METHODS) must pass ``idempotency_key``.
+    Raises StripeUnavailableError while the breaker is open and
+    asyncio.TimeoutError when the call exceeds ``timeout``.
+    """
+    if operation.rsplit(".", 1)[-1] in WRITE_METHODS:
+        if not idempotency_key:
+            raise ValueError(f"Stripe write {operation} needs an idempotency_key")
+        kwargs["idempotency_key"] = idempotency_key
+    circuit_breaker.before_call()
+
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry contextvars over; copy them so the call
+    # is attributed to the current request's metrics
+    context = contextvars.copy_context()
+    started = time.perf_counter()
+    error = None
+    try:
+        result = await asyncio.wait_for(
+            loop.run_in_executor(_executor, partial(context.run, fn, *args, **kwargs)),
+            timeout or config.STRIPE_TIMEOUT_SECONDS
+        )
+    except asyncio.CancelledError:
+        error = "CancelledError"
+        circuit_breaker.record_cancelled()
+        raise
+    except _transient_errors() as e:
+        error = type(e).__name__
+        circuit_breaker.record_failure()
+        raise
+    except Exception as e:
+        error = type(e).__name__
+        circuit_breaker.record_other()
+        raise
+    else:
+        circuit_breaker.record_success()
+        return result
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        latency.observe(operation, duration_ms, error)
+        if duration_ms > 2000:
+            logger.warning(f"Slow Stripe call {operation}: {duration_ms:.0f}ms")
+
+
+def get_stripe_metrics() -> Dict[str, Any]:
+    return {
+        "circuit_breaker": circuit_breaker.state,
+        "max_concurrency": config.STRIPE_MAX_CONCURRENCY,
+        "timeout_seconds": config.STRIPE_TIMEOUT_SECONDS,
+        "operations": latency.snapshot()
+    }
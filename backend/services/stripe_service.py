@@ -5,19 +5,19 @@ import logging
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
-from datetime import datetime, timedelta
-import stripe
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+import json
 import os
 from fastapi import HTTPException, status
+from config import config
 
 from models import User, CreditTransaction
 from models.stripe_models import StripeCustomer, StripeSubscription, StripePaymentIntent, StripePaymentMethod, StripeWebhookEvent, StripeProduct
 from services.base_service import BaseService
 from services.email_service import EmailService
-
-# Configure Stripe
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-stripe.api_version = os.getenv("STRIPE_API_VERSION")
+from services.stripe_billing_cache import StripeBillingCache
+from services.stripe_client import stripe, stripe_call, write_key
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +53,14 @@ class StripeService:
             if name:
                 stripe_customer_data["name"] = name
             
-            stripe_customer = stripe.Customer.create(**stripe_customer_data)
+            stripe_customer = await stripe_call(
+                "Customer.create", stripe.Customer.create,
+                idempotency_key=write_key(
+                    "Customer.create", user.id,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
+                **stripe_customer_data
+            )
             
             # Store in database
             db_customer = StripeCustomer(
@@ -129,7 +136,11 @@ class StripeService:
                     }
                 }
             
-            checkout_session = stripe.checkout.Session.create(**session_data)
+            checkout_session = await stripe_call(
+                "checkout.Session.create", stripe.checkout.Session.create,
+                idempotency_key=write_key("checkout.Session.create", session_data, window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS),
+                **session_data
+            )
             
             logger.info(f"Created checkout session {checkout_session.id} for user {user_id}")
             return {
@@ -170,8 +181,8 @@ class StripeService:
             customer = await self.create_customer(user, user.email, user.name)
             
             # Get price details
-            price = stripe.Price.retrieve(price_id)
-            product = stripe.Product.retrieve(price.product)
+            price = await stripe_call("Price.retrieve", stripe.Price.retrieve, price_id)
+            product = await stripe_call("Product.retrieve", stripe.Product.retrieve, price.product)
             
             # Create subscription
             subscription_data = {
@@ -188,7 +199,11 @@ class StripeService:
             if trial_period_days:
                 subscription_data["trial_period_days"] = trial_period_days
             
-            stripe_subscription = stripe.Subscription.create(**subscription_data)
+            stripe_subscription = await stripe_call(
+                "Subscription.create", stripe.Subscription.create,
+                idempotency_key=write_key("Subscription.create", subscription_data, window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS),
+                **subscription_data
+            )
             
             # Store in database
             db_subscription = StripeSubscription(
@@ -256,8 +271,13 @@ class StripeService:
                 )
             
             # Cancel in Stripe
-            stripe.Subscription.modify(
+            await stripe_call(
+                "Subscription.modify", stripe.Subscription.modify,
                 subscription_id,
+                idempotency_key=write_key(
+                    "Subscription.cancel_at_period_end", subscription_id,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
                 cancel_at_period_end=True
             )
             
@@ -294,7 +314,12 @@ class StripeService:
                     detail="Customer not found"
                 )
             
-            session = stripe.billing_portal.Session.create(
+            session = await stripe_call(
+                "billing_portal.Session.create", stripe.billing_portal.Session.create,
+                idempotency_key=write_key(
+                    "billing_portal.Session.create", customer.stripe_customer_id,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
                 customer=customer.stripe_customer_id,
                 return_url=f"{config.BACKEND_URL}/customer/dashboard"
             )
@@ -318,48 +343,16 @@ class StripeService:
         self,
         payload: bytes,
         signature: str,
-        webhook_secret: str
+        webhook_secret: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process Stripe webhook with signature verification"""
+        """Verify and queue a Stripe webhook; handlers run in services.stripe_webhook_worker"""
+        from services.stripe_webhook_worker import webhook_workers
+        
         try:
             # Verify webhook signature
             event = stripe.Webhook.construct_event(
-                payload, signature, webhook_secret
+                payload, signature, webhook_secret or self.webhook_secret
             )
-            
-            # Log webhook event
-            webhook_event = StripeWebhookEvent(
-                stripe_event_id=event.id,
-                event_type=event.type,
-                api_version=event.api_version,
-                created=datetime.fromtimestamp(event.created, tz=timezone.utc),
-                data=event.data,
-                livemode=event.livemode
-            )
-            
-            self.db.add(webhook_event)
-            self.db.commit()
-            
-            # Process based on event type
-            if event.type == "checkout.session.completed":
-                await self._handle_checkout_completed(event.data.object)
-            elif event.type == "invoice.payment_succeeded":
-                await self._handle_payment_succeeded(event.data.object)
-            elif event.type == "invoice.payment_failed":
-                await self._handle_payment_failed(event.data.object)
-            elif event.type == "customer.subscription.updated":
-                await self._handle_subscription_updated(event.data.object)
-            elif event.type == "customer.subscription.deleted":
-                await self._handle_subscription_deleted(event.data.object)
-            
-            # Mark as processed
-            webhook_event.processed = True
-            webhook_event.processed_at = datetime.now(timezone.utc)
-            self.db.commit()
-            
-            logger.info(f"Processed webhook event {event.id} of type {event.type}")
-            return {"status": "success", "event_id": event.id}
-            
         except ValueError as e:
             logger.error(f"Invalid webhook payload: {str(e)}")
             raise HTTPException(
@@ -372,17 +365,67 @@ class StripeService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Webhook signature verification failed"
             )
+        
+        try:
+            data = json.loads(payload)["data"]
+            
+            # Persist once per Stripe event id; redeliveries are acknowledged without requeueing
+            stmt = pg_insert(StripeWebhookEvent).values(
+                stripe_event_id=event.id,
+                event_type=event.type,
+                api_version=event.api_version,
+                event_created_at=datetime.fromtimestamp(event.created, tz=timezone.utc),
+                customer_key=self._event_customer_key(event.type, data.get("object", {})),
+                event_data=data,
+                status="pending"
+            ).on_conflict_do_nothing(index_elements=["stripe_event_id"])
+            
+            queued = self.db.execute(stmt).rowcount > 0
+            self.db.commit()
         except Exception as e:
-            logger.error(f"Error processing webhook: {str(e)}")
-            # Mark webhook as failed
-            if 'webhook_event' in locals():
-                webhook_event.processed = True
-                webhook_event.error_message = str(e)
-                self.db.commit()
+            self.db.rollback()
+            logger.error(f"Error queueing webhook {event.id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
             )
+        
+        if queued:
+            webhook_workers.notify()
+            logger.info(f"Queued webhook event {event.id} of type {event.type}")
+        else:
+            logger.info(f"Duplicate webhook event {event.id} ignored")
+        
+        return {"status": "queued" if queued else "duplicate", "event_id": event.id}
+    
+    @staticmethod
+    def _event_customer_key(event_type: str, data_object: Dict[str, Any]) -> Optional[str]:
+        """Stripe customer an event belongs to, used to order per-customer processing"""
+        if event_type.startswith("customer.") and data_object.get("object") == "customer":
+            return data_object.get("id")
+        customer = data_object.get("customer")
+        if isinstance(customer, dict):
+            return customer.get("id")
+        return customer
+    
+    async def handle_event(self, event_type: str, data_object: Dict[str, Any]) -> None:
+        """Dispatch a stored webhook event to its handler"""
+        if event_type == "checkout.session.completed":
+            await self._handle_checkout_completed(data_object)
+        elif event_type == "invoice.payment_succeeded":
+            await self._handle_payment_succeeded(data_object)
+        elif event_type == "invoice.payment_failed":
+            await self._handle_payment_failed(data_object)
+        elif event_type == "customer.subscription.updated":
+            await self._handle_subscription_updated(data_object)
+        elif event_type == "customer.subscription.deleted":
+            await self._handle_subscription_deleted(data_object)
+        
+        # Keep the local billing mirror current
+        if event_type.startswith("invoice."):
+            StripeBillingCache(self.db).apply_invoice_event(data_object)
+        elif event_type.startswith("payment_method."):
+            StripeBillingCache(self.db).apply_payment_method_event(event_type, data_object)
     
     async def _handle_checkout_completed(self, session: Dict[str, Any]) -> None:
         """Handle successful checkout completion"""
@@ -610,7 +653,11 @@ class StripeService:
                 payment_intent_data["payment_method"] = payment_method_id
                 payment_intent_data["confirm"] = True
             
-            payment_intent = stripe.PaymentIntent.create(**payment_intent_data)
+            payment_intent = await stripe_call(
+                "PaymentIntent.create", stripe.PaymentIntent.create,
+                idempotency_key=write_key("PaymentIntent.create", payment_intent_data, window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS),
+                **payment_intent_data
+            )
             
             # Store payment intent in database
             db_payment_intent = StripePaymentIntent(
@@ -644,9 +691,14 @@ class StripeService:
         self,
         payment_intent_id: str,
         reason: str = "requested_by_customer",
-        amount: Optional[int] = None
+        amount: Optional[int] = None,
+        request_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process a refund for a payment"""
+        """Process a refund for a payment.
+        
+        ``request_id`` identifies this refund request (e.g. the refund or
+        dispute record id); retries with the same id never refund twice.
+        """
         try:
             # Process refund in Stripe
             refund_data = {
@@ -657,7 +709,16 @@ class StripeService:
             if amount:
                 refund_data["amount"] = amount
             
-            refund = stripe.Refund.create(**refund_data)
+            # Keyed on the caller's request id when there is one: two partial
+            # refunds of the same amount are different refunds
+            refund = await stripe_call(
+                "Refund.create", stripe.Refund.create,
+                idempotency_key=(
+                    write_key("Refund.create", request_id) if request_id
+                    else write_key("Refund.create", refund_data, window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS)
+                ),
+                **refund_data
+            )
             
             # Update payment intent status in database
             db_payment_intent = self.db.query(StripePaymentIntent).filter(
@@ -683,8 +744,8 @@ class StripeService:
                 detail="Failed to process refund"
             )
 
-    async def get_customer_billing(self, user_id: int) -> Dict[str, Any]:
-        """Get customer billing information from Stripe"""
+    async def get_customer_billing(self, user_id: int, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get customer billing information from the local Stripe mirror"""
         try:
             # Get Stripe customer
             stripe_customer = self.db.query(StripeCustomer).filter(
@@ -698,51 +759,8 @@ class StripeService:
                     "payment_methods": []
                 }
             
-            # Get invoices from Stripe
-            invoices = stripe.Invoice.list(customer=stripe_customer.stripe_customer_id, limit=100)
-            
-            # Get payment methods from Stripe
-            payment_methods = stripe.PaymentMethod.list(
-                customer=stripe_customer.stripe_customer_id,
-                type="card"
-            )
-            
-            # Get subscriptions from database (already handled by FinancialService)
-            subscriptions = self.db.query(StripeSubscription).filter(
-                StripeSubscription.user_id == user_id
-            ).all()
-            
-            # Format invoice data
-            invoice_data = []
-            for invoice in invoices.data:
-                invoice_data.append({
-                    "id": invoice.id,
-                    "number": invoice.number,
-                    "amount": invoice.amount_due,
-                    "currency": invoice.currency,
-                    "status": invoice.status,
-                    "due_date": invoice.due_date,
-                    "created_at": invoice.created,
-                    "description": invoice.description or "Invoice",
-                    "stripe_invoice_id": invoice.id
-                })
-            
-            # Format payment method data
-            payment_method_data = []
-            for method in payment_methods.data:
-                payment_method_data.append({
-                    "id": method.id,
-                    "type": method.type,
-                    "last4": method.card.last4,
-                    "brand": method.card.brand,
-                    "exp_month": method.card.exp_month,
-                    "exp_year": method.card.exp_year
-                })
-            
-            return {
-                "invoices": invoice_data,
-                "payment_methods": payment_method_data
-            }
+            # Invoices and payment methods are served from Postgres, refreshed from Stripe when stale
+            return await StripeBillingCache(self.db).get_billing(stripe_customer, force_refresh=force_refresh)
             
         except Exception as e:
             logger.error(f"Error getting customer billing: {str(e)}")
@@ -767,7 +785,7 @@ class StripeService:
                 )
             
             # Get invoice from Stripe
-            invoice = stripe.Invoice.retrieve(invoice_id)
+            invoice = await stripe_call("Invoice.retrieve", stripe.Invoice.retrieve, invoice_id)
             
             if invoice.customer != stripe_customer.stripe_customer_id:
                 raise HTTPException(
@@ -776,7 +794,7 @@ class StripeService:
                 )
             
             # Generate invoice PDF
-            invoice_pdf = stripe.Invoice.retrieve_pdf(invoice_id)
+            invoice_pdf = await stripe_call("Invoice.retrieve_pdf", stripe.Invoice.retrieve_pdf, invoice_id)
             
             return {
                 "pdf_data": invoice_pdf,
@@ -806,8 +824,13 @@ class StripeService:
                 )
             
             # Cancel subscription in Stripe
-            stripe_subscription = stripe.Subscription.modify(
+            stripe_subscription = await stripe_call(
+                "Subscription.modify", stripe.Subscription.modify,
                 subscription_id,
+                idempotency_key=write_key(
+                    "Subscription.cancel_at_period_end", subscription_id,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
                 cancel_at_period_end=True
             )
             
@@ -857,8 +880,13 @@ class StripeService:
             if quantity:
                 update_data["quantity"] = quantity
             
-            stripe_subscription = stripe.Subscription.modify(
+            stripe_subscription = await stripe_call(
+                "Subscription.modify", stripe.Subscription.modify,
                 subscription_id,
+                idempotency_key=write_key(
+                    "Subscription.modify", subscription_id, update_data,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
                 **update_data
             )
             
@@ -891,8 +919,13 @@ class StripeService:
         """Update a payment method"""
         try:
             # Update payment method in Stripe
-            stripe.PaymentMethod.modify(
+            await stripe_call(
+                "PaymentMethod.modify", stripe.PaymentMethod.modify,
                 payment_method_id,
+                idempotency_key=write_key(
+                    "PaymentMethod.modify", payment_method_id, card_data,
+                    window_seconds=config.STRIPE_IDEMPOTENCY_WINDOW_SECONDS
+                ),
                 card=card_data
             )
             
@@ -912,7 +945,11 @@ class StripeService:
         """Delete a payment method"""
         try:
             # Detach payment method in Stripe
-            stripe.PaymentMethod.detach(payment_method_id)
+            await stripe_call(
+                "PaymentMethod.detach", stripe.PaymentMethod.detach,
+                payment_method_id,
+                idempotency_key=write_key("PaymentMethod.detach", payment_method_id)
+            )
             
             return {
                 "message": "Payment method deleted successfully",
@@ -0,0 +1,296 @@
+"""
+Durable Stripe webhook queue.
+
+The webhook endpoint only verifies the signature and inserts the event into
+stripe_webhook_events (deduplicated on stripe_event_id) before acknowledging.
+A pool of worker threads then claims pending events with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and runs the StripeService handlers.
+
+Ordering: an event is only claimable when no earlier unfinished event exists
+for the same Stripe customer, so one customer's events are handled in Stripe's
+``created`` order while different customers are processed in parallel.
+Failures are retried with exponential backoff up to STRIPE_WEBHOOK_MAX_ATTEMPTS,
+then parked as ``failed``. Events left in ``processing`` by a crashed worker
+are returned to the queue after PROCESSING_TIMEOUT.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import exists, func, tuple_, update
+from sqlalchemy.orm import Session, aliased
+
+from config import config
+from database import SessionLocal
+from models.stripe_models import StripeWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+PROCESSED = "processed"
+FAILED = "failed"
+
+CLAIM_BATCH_SIZE = 10
+POLL_INTERVAL = 5.0  # seconds; ingestion wakes the workers immediately in-process
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+RETRY_BASE_DELAY = 30  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 3600
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY))
+
+
+def claim_events(db: Session, limit: int = CLAIM_BATCH_SIZE) -> List[int]:
+    """Lock and mark up to ``limit`` due events as processing, oldest first; returns their ids.
+
+    Rows already locked by another worker are skipped; events queued behind an
+    unfinished event of the same customer are not eligible yet.
+    """
+    now = datetime.now(timezone.utc)
+    earlier = aliased(StripeWebhookEvent)
+
+    blocked = exists().where(
+        earlier.customer_key == StripeWebhookEvent.customer_key,
+        earlier.status.in_((PENDING, PROCESSING)),
+        tuple_(func.coalesce(earlier.event_created_at, earlier.created_at), earlier.id)
+        < tuple_(func.coalesce(StripeWebhookEvent.event_created_at, StripeWebhookEvent.created_at), StripeWebhookEvent.id)
+    )
+
+    events = db.query(StripeWebhookEvent).filter(
+        StripeWebhookEvent.status == PENDING,
+        StripeWebhookEvent.next_attempt_at <= now,
+        ~blocked
+    ).order_by(
+        func.coalesce(StripeWebhookEvent.event_created_at, StripeWebhookEvent.created_at),
+        StripeWebhookEvent.id
+    ).limit(limit).with_for_update(skip_locked=True, of=StripeWebhookEvent).all()
+
+    event_ids = []
+    for event in events:
+        event.status = PROCESSING
+        event.claimed_at = now
+        event.attempts = (event.attempts or 0) + 1
+        event_ids.append(event.id)
+    db.commit()
+    return event_ids
+
+
+def release_stale_events(db: Session) -> int:
+    """Return events stuck in processing (worker died mid-event) to the queue"""
+    cutoff = datetime.now(timezone.utc) - PROCESSING_TIMEOUT
+    result = db.execute(
+        update(StripeWebhookEvent).where(
+            StripeWebhookEvent.status == PROCESSING,
+            StripeWebhookEvent.claimed_at < cutoff
+        ).values(status=PENDING, next_attempt_at=func.now())
+    )
+    db.commit()
+    if result.rowcount:
+        logger.warning(f"Released {result.rowcount} stale Stripe webhook events")
+    return result.rowcount
+
+
+class WebhookQueueMetrics:
+    """In-process counters for the webhook workers (per API process)"""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._completions = deque()
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.total_processing_seconds = 0.0
+
+    def record(self, outcome: str, duration: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._completions.append(now)
+            self._trim(now)
+            self.total_processing_seconds += duration
+            if outcome == PROCESSED:
+                self.processed += 1
+            elif outcome == FAILED:
+                self.failed += 1
+            else:
+                self.retried += 1
+
+    def _trim(self, now: float) -> None:
+        while self._completions and now - self._completions[0] > self.window_seconds:
+            self._completions.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            handled = self.processed + self.failed + self.retried
+            return {
+                "processed": self.processed,
+                "failed": self.failed,
+                "retried": self.retried,
+                "throughput_per_minute": len(self._completions) * 60 / self.window_seconds,
+                "avg_processing_ms": round(self.total_processing_seconds / handled * 1000, 1) if handled else 0.0
+            }
+
+
+metrics = WebhookQueueMetrics()
+
+
+def get_queue_stats(db: Session) -> Dict[str, Any]:
+    """Queue depth and lag from the database, plus this process's worker counters"""
+    now = datetime.now(timezone.utc)
+    counts = dict(
+        db.query(StripeWebhookEvent.status, func.count(StripeWebhookEvent.id))
+        .filter(StripeWebhookEvent.status.in_((PENDING, PROCESSING, FAILED)))
+        .group_by(StripeWebhookEvent.status)
+        .all()
+    )
+    oldest_pending = db.query(func.min(StripeWebhookEvent.created_at)).filter(
+        StripeWebhookEvent.status == PENDING
+    ).scalar()
+
+    return {
+        "pending": counts.get(PENDING, 0),
+        "processing": counts.get(PROCESSING, 0),
+        "failed": counts.get(FAILED, 0),
+        "lag_seconds": round((now - oldest_pending).total_seconds(), 1) if oldest_pending else 0.0,
+        "workers": webhook_workers.size if webhook_workers.running else 0,
+        **metrics.snapshot()
+    }
+
+
+class StripeWebhookWorkerPool:
+    """Background threads draining the webhook queue.
+
+    Each thread owns an event loop for the async StripeService handlers, so
+    slow handlers never run on the API's event loop.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, size: int) -> None:
+        if self.running or size <= 0:
+            return
+        self.size = size
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"stripe-webhook-worker-{n}", daemon=True)
+            for n in range(size)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Started {size} Stripe webhook worker(s)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a new event was queued"""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        last_stale_check = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - last_stale_check > PROCESSING_TIMEOUT.total_seconds() / 2:
+                    last_stale_check = time.monotonic()
+                    self._with_session(release_stale_events)
+
+                claimed = self._with_session(claim_events) or []
+                for event_id in claimed:
+                    loop.run_until_complete(process_event(event_id))
+
+                if not claimed:
+                    self._wakeup.wait(POLL_INTERVAL)
+                    self._wakeup.clear()
+        finally:
+            loop.close()
+
+    @staticmethod
+    def _with_session(fn):
+        db = SessionLocal()
+        try:
+            return fn(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Stripe webhook queue error: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+
+webhook_workers = StripeWebhookWorkerPool()
+
+
+async def process_event(event_id: int) -> str:
+    """Run the handler for a claimed event and record the outcome"""
+    from services.stripe_service import StripeService
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        event = db.query(StripeWebhookEvent).filter(StripeWebhookEvent.id == event_id).first()
+        if not event or event.status != PROCESSING:
+            return PROCESSED
+
+        try:
+            data_object = (event.event_data or {}).get("object", {})
+            await StripeService(db).handle_event(event.event_type, data_object)
+        except Exception as e:
+            db.rollback()
+            event = db.query(StripeWebhookEvent).filter(StripeWebhookEvent.id == event_id).first()
+            event.error_message = str(e)
+            if event.attempts >= config.STRIPE_WEBHOOK_MAX_ATTEMPTS:
+                event.status = FAILED
+                event.processed = True
+                event.processed_at = datetime.now(timezone.utc)
+                outcome = FAILED
+                logger.error(f"Stripe webhook {event.stripe_event_id} failed permanently: {str(e)}")
+            else:
+                event.status = PENDING
+                event.next_attempt_at = datetime.now(timezone.utc) + retry_delay(event.attempts)
+                outcome = PENDING
+                logger.warning(f"Stripe webhook {event.stripe_event_id} failed (attempt {event.attempts}), will retry: {str(e)}")
+            db.commit()
+        else:
+            event.status = PROCESSED
+            event.processed = True
+            event.processed_at = datetime.now(timezone.utc)
+            event.error_message = None
+            db.commit()
+            outcome = PROCESSED
+            logger.info(f"Processed webhook event {event.stripe_event_id} of type {event.event_type}")
+
+        metrics.record(outcome, time.perf_counter() - started)
+        return outcome
+    finally:
+        db.close()
+
+
+def retry_failed_events(db: Session, event_ids: Optional[List[int]] = None) -> int:
+    """Re-queue failed events (all, or the given ids) for another round of attempts"""
+    stmt = update(StripeWebhookEvent).where(StripeWebhookEvent.status == FAILED)
+    if event_ids:
+        stmt = stmt.where(StripeWebhookEvent.id.in_(event_ids))
+    result = db.execute(stmt.values(status=PENDING, attempts=0, processed=False, next_attempt_at=func.now()))
+    db.commit()
+    webhook_workers.notify()
+    return result.rowcount
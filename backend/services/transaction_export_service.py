@@ -0,0 +1,147 @@
+"""
+Streaming export of credit transactions as CSV or NDJSON.
+
+Rows are read through a server-side cursor (``yield_per``) and encoded in
+batches, so memory use stays flat no matter how many rows are exported.
+The generators open their own session: with FastAPI's yield dependencies the
+request's ``get_db`` session is closed before a StreamingResponse body is sent.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import CreditTransaction, User
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_FIELDS = [
+    "id",
+    "created_at",
+    "user_id",
+    "user_email",
+    "transaction_type",
+    "amount",
+    "dollar_amount",
+    "description",
+    "job_id",
+    "stripe_payment_intent_id",
+]
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 2000
+
+
+def build_export_query(
+    user_id: Optional[int] = None,
+    transaction_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Select the exported columns (no ORM entities) with the given filters, oldest first"""
+    stmt = select(
+        CreditTransaction.id,
+        CreditTransaction.created_at,
+        CreditTransaction.user_id,
+        User.email.label("user_email"),
+        CreditTransaction.transaction_type,
+        CreditTransaction.amount,
+        CreditTransaction.dollar_amount,
+        CreditTransaction.description,
+        CreditTransaction.job_id,
+        CreditTransaction.stripe_payment_intent_id,
+    ).outerjoin(User, User.id == CreditTransaction.user_id)
+
+    if user_id is not None:
+        stmt = stmt.where(CreditTransaction.user_id == user_id)
+    if transaction_type:
+        stmt = stmt.where(CreditTransaction.transaction_type == transaction_type)
+    if start_date:
+        stmt = stmt.where(CreditTransaction.created_at >= start_date)
+    if end_date:
+        stmt = stmt.where(CreditTransaction.created_at < end_date)
+
+    return stmt.order_by(CreditTransaction.created_at, CreditTransaction.id)
+
+
+def export_filename(export_format: str, user_id: Optional[int] = None) -> str:
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    scope = f"user-{user_id}" if user_id is not None else "all"
+    return f"credit-transactions-{scope}-{stamp}.{export_format}"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class TransactionExportService:
+    """Encodes credit transaction exports chunk by chunk"""
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def _batches(self, stmt) -> Iterator[Sequence[Any]]:
+        """Yield lists of rows from a server-side cursor, on a dedicated session"""
+        db = SessionLocal()
+        try:
+            result = db.execute(stmt.execution_options(yield_per=self.batch_size))
+            for partition in result.partitions():
+                yield partition
+        finally:
+            db.close()
+
+    def iter_csv(self, stmt) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue()
+
+        for rows in self._batches(stmt):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+
+    def iter_ndjson(self, stmt) -> Iterator[str]:
+        for rows in self._batches(stmt):
+            yield "".join(
+                json.dumps({field: _json_value(value) for field, value in zip(EXPORT_FIELDS, row)}) + "\n"
+                for row in rows
+            )
+
+    def stream(self, export_format: str, **filters) -> Iterator[str]:
+        """Generator of encoded chunks for a StreamingResponse"""
+        stmt = build_export_query(**filters)
+        if export_format == "csv":
+            return self.iter_csv(stmt)
+        return self.iter_ndjson(stmt)
+
+
+def streaming_export_headers(export_format: str, user_id: Optional[int] = None) -> Dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="{export_filename(export_format, user_id)}"',
+        "Cache-Control": "no-store",
+    }
@@ -4,13 +4,15 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, func, desc
 from schemas.user import (
     UserCreate, UserUpdate, UserResponse, CustomerResponse, AdminResponse,
     UserListResponse, UserFilter, UserStats, BulkUserUpdate, BulkUserStatusUpdate,
     UserType, UserStatus, LeadStatus
 )
 from services.auth_service import AuthService
+from services.search_service import match_clause
+from models.load_profiles import user_list_profile
 from typing import Optional, List, Dict, Any, Union
 
 logger = logging.getLogger(__name__)
@@ -172,7 +174,7 @@ class UserService:
         if not current_user.get('is_admin', False):
             raise PermissionError("Access denied - admin only")
         
-        query = self.db.query(User)
+        query = self.db.query(User).options(user_list_profile())
         
         # Apply filters
         if filters:
@@ -193,15 +195,9 @@ class UserService:
                     query = query.filter(User.credits > 0)
                 else:
                     query = query.filter(User.credits == 0)
-            if filters.search:
-                search_term = f"%{filters.search}%"
-                query = query.filter(
-                    or_(
-                        User.name.ilike(search_term),
-                        User.email.ilike(search_term),
-                        User.business_type.ilike(search_term)
-                    )
-                )
+            search_filter = match_clause(User, filters.search)
+            if search_filter is not None:
+                query = query.filter(search_filter)
         
         # Apply pagination and ordering
         users = query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
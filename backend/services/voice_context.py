@@ -0,0 +1,217 @@
+"""
+Per-call context bundle for the voice agent.
+
+The first turn of a call that identifies the customer loads everything the
+read intents need: the customer, their upcoming appointments, active jobs and
+open change requests. It is one statement, with the collections aggregated as
+JSON in correlated subqueries. The bundle is cached by session_id for the call,
+so later turns answer from memory.
+
+A committed change to a customer's user row, appointments, jobs or change
+requests drops their bundles (after_commit hook below). That covers the voice
+agent's own writes and edits made elsewhere in the app. Bulk query.update()
+calls bypass the hook; VOICE_CONTEXT_TTL_SECONDS bounds how stale those can get.
+
+The cache and the hook are per worker process. A commit in one worker does not
+reach bundles cached by another, so with several workers a call routed
+elsewhere can see data up to VOICE_CONTEXT_TTL_SECONDS old.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from config import config
+from models import Appointment, CustomerChangeRequest, Job, User
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+UPCOMING_DAYS = 30
+ACTIVE_JOB_STATUSES = ("planning", "in_progress")
+OPEN_CHANGE_REQUEST_STATUSES = ("pending", "reviewing", "approved")
+
+
+@dataclass(frozen=True)
+class VoiceCustomer:
+    id: int
+    name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    business_type: Optional[str]
+
+
+@dataclass(frozen=True)
+class VoiceAppointment:
+    id: int
+    scheduled_date: datetime
+    duration_minutes: Optional[int]
+    appointment_type: Optional[str]
+    status: Optional[str]
+
+
+@dataclass(frozen=True)
+class VoiceJob:
+    id: int
+    title: str
+    status: Optional[str]
+    priority: Optional[str]
+    progress_percentage: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class VoiceChangeRequest:
+    id: int
+    job_id: int
+    title: str
+    status: Optional[str]
+    priority: Optional[str]
+
+
+@dataclass
+class VoiceContext:
+    customer: VoiceCustomer
+    appointments: List[VoiceAppointment] = field(default_factory=list)
+    jobs: List[VoiceJob] = field(default_factory=list)
+    change_requests: List[VoiceChangeRequest] = field(default_factory=list)
+
+
+voice_contexts = TTLCache(config.VOICE_CONTEXT_CACHE_SIZE, config.VOICE_CONTEXT_TTL_SECONDS)
+
+
+def _json_list(columns: Dict[str, Any], order_by, *criteria):
+    """Correlated subquery returning matching rows as a JSON array (NULL when empty)"""
+    row = func.json_build_object(*[part for key, column in columns.items() for part in (key, column)])
+    return select(func.json_agg(aggregate_order_by(row, order_by))).where(*criteria).scalar_subquery()
+
+
+def _context_query(customer_id: int, now: datetime):
+    appointments = _json_list(
+        {
+            "id": Appointment.id,
+            "scheduled_date": Appointment.scheduled_date,
+            "duration_minutes": Appointment.duration_minutes,
+            "appointment_type": Appointment.appointment_type,
+            "status": Appointment.status,
+        },
+        Appointment.scheduled_date,
+        Appointment.customer_id == User.id,
+        Appointment.status == "scheduled",
+        Appointment.scheduled_date >= now,
+        Appointment.scheduled_date <= now + timedelta(days=UPCOMING_DAYS),
+    )
+    jobs = _json_list(
+        {
+            "id": Job.id,
+            "title": Job.title,
+            "status": Job.status,
+            "priority": Job.priority,
+            "progress_percentage": Job.progress_percentage,
+        },
+        Job.id,
+        Job.customer_id == User.id,
+        Job.status.in_(ACTIVE_JOB_STATUSES),
+    )
+    change_requests = _json_list(
+        {
+            "id": CustomerChangeRequest.id,
+            "job_id": CustomerChangeRequest.job_id,
+            "title": CustomerChangeRequest.title,
+            "status": CustomerChangeRequest.status,
+            "priority": CustomerChangeRequest.priority,
+        },
+        CustomerChangeRequest.created_at.desc(),
+        CustomerChangeRequest.customer_id == User.id,
+        CustomerChangeRequest.status.in_(OPEN_CHANGE_REQUEST_STATUSES),
+    )
+    return select(
+        User.id, User.name, User.email, User.phone, User.business_type,
+        appointments.label("appointments"),
+        jobs.label("jobs"),
+        change_requests.label("change_requests"),
+    ).where(User.id == customer_id)
+
+
+def load_voice_context(db: Session, customer_id: int) -> Optional[VoiceContext]:
+    """Load a customer's call context in one statement"""
+    row = db.execute(_context_query(customer_id, datetime.now())).first()
+    if row is None:
+        return None
+
+    return VoiceContext(
+        customer=VoiceCustomer(row.id, row.name, row.email, row.phone, row.business_type),
+        appointments=[
+            VoiceAppointment(
+                id=item["id"],
+                scheduled_date=datetime.fromisoformat(item["scheduled_date"]),
+                duration_minutes=item["duration_minutes"],
+                appointment_type=item["appointment_type"],
+                status=item["status"],
+            )
+            for item in row.appointments or []
+        ],
+        jobs=[VoiceJob(**item) for item in row.jobs or []],
+        change_requests=[VoiceChangeRequest(**item) for item in row.change_requests or []],
+    )
+
+
+def get_voice_context(db: Session, session_id: Optional[str], customer_id: int) -> Optional[VoiceContext]:
+    """The call's cached context, loading it for customer_id on a miss"""
+    if session_id:
+        context = voice_contexts.get(session_id)
+        if context is not None and context.customer.id == customer_id:
+            return context
+
+    context = load_voice_context(db, customer_id)
+    if context is not None and session_id:
+        voice_contexts.put(session_id, context)
+    return context
+
+
+def cached_voice_context(session_id: Optional[str]) -> Optional[VoiceContext]:
+    """The call's context if an earlier turn loaded it"""
+    return voice_contexts.get(session_id) if session_id else None
+
+
+def invalidate_customer_contexts(customer_ids: Set[int]) -> int:
+    """Drop cached contexts for these customers across all calls in this worker"""
+    if not customer_ids or not len(voice_contexts):
+        return 0
+    return voice_contexts.discard_where(lambda context: context.customer.id in customer_ids)
+
+
+# Commit-time invalidation
+
+_TRACKED_KEY = "voice_context_customers"
+
+
+def _customer_id(instance) -> Optional[int]:
+    if isinstance(instance, User):
+        return instance.id
+    if isinstance(instance, (Appointment, Job, CustomerChangeRequest)):
+        return instance.customer_id
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_customer_writes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        customer_id = _customer_id(instance)
+        if customer_id is not None:
+            session.info.setdefault(_TRACKED_KEY, set()).add(customer_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    customer_ids = session.info.pop(_TRACKED_KEY, None)
+    if customer_ids:
+        invalidate_customer_contexts(customer_ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop(_TRACKED_KEY, None)
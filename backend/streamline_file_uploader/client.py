@@ -2,14 +2,22 @@
 Streamline File Uploader Client
 """
 
-import aiohttp
 import base64
 import hashlib
+import importlib.util
 import json
 import logging
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 from .models import UploadResult, FileInfo
 
+if TYPE_CHECKING:
+    import aiohttp
+
+# aiohttp is imported when a session opens; fail the package import here if it
+# is missing so callers' SDK_AVAILABLE checks still work
+if importlib.util.find_spec("aiohttp") is None:
+    raise ImportError("streamline_file_uploader requires aiohttp")
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,10 +35,12 @@ class StreamlineFileUploader:
         self.base_url = base_url.rstrip('/')
         self.service_token = service_token
         self.default_user_email = default_user_email
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional["aiohttp.ClientSession"] = None
     
     async def __aenter__(self):
         """Async context manager entry"""
+        import aiohttp  # Loaded on first use rather than at application startup
+
         self._session = aiohttp.ClientSession()
         return self
     
@@ -0,0 +1,38 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.credits as credits_api
+from api.auth import get_current_user
+
+
+def make_client(monkeypatch, captured):
+    def fake_stream(self, export_format, **filters):
+        captured["format"] = export_format
+        captured["filters"] = filters
+        return iter(["id,created_at\n", "tx-1,2025-09-01T00:00:00\n"])
+
+    monkeypatch.setattr(credits_api.TransactionExportService, "stream", fake_stream)
+
+    app = FastAPI()
+    app.include_router(credits_api.router, prefix="/api")
+    # get_current_user returns the token payload as a dict
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 42, "email": "user@example.com", "user_type": "customer"}
+    return TestClient(app)
+
+
+def test_export_streams_the_current_users_transactions(monkeypatch):
+    captured = {}
+    response = make_client(monkeypatch, captured).get("/api/credits/transactions/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.text == "id,created_at\ntx-1,2025-09-01T00:00:00\n"
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "credit-transactions-user-42-" in response.headers["content-disposition"]
+    assert captured["format"] == "csv"
+    assert captured["filters"]["user_id"] == 42
+
+
+def test_export_rejects_unknown_format(monkeypatch):
+    response = make_client(monkeypatch, {}).get("/api/credits/transactions/export?format=xml")
+
+    assert response.status_code == 422
@@ -0,0 +1,25 @@
+import pytest
+
+from utils.twilio_helpers import TwilioVoiceHelper
+
+
+@pytest.mark.parametrize("speech_text, intent", [
+    ("what is the status of my project", "jobs_lookup"),
+    ("what's the status of my project", "jobs_lookup"),
+    ("how is my project progress", "jobs_lookup"),
+    ("what are my active jobs", "jobs_lookup"),
+    ("status of my change requests", "list_change_requests"),
+    ("show my pending requests", "list_change_requests"),
+    ("I want to see my change requests", "list_change_requests"),
+    ("I want to change my website", "create_change_request"),
+    ("can you add a contact form", "create_change_request"),
+    ("book an appointment tomorrow at 3pm", "schedule_appointment"),
+    ("check my upcoming appointments", "get_customer_appointments"),
+    ("what times are available", "available_slots"),
+    ("what's available tomorrow", "available_slots"),
+    ("I want to reschedule my meeting", "reschedule_appointment"),
+    ("cancel my appointment", "delete_appointment"),
+    ("hi this is John", "find_or_create_customer"),
+])
+def test_common_phrases_route_to_intent(speech_text, intent):
+    assert TwilioVoiceHelper.extract_intent(speech_text) == intent
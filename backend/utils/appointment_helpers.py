@@ -11,7 +11,7 @@ from models import Appointment, User
 from services.appointment_service import AppointmentService
 from services.google_calendar_service import google_calendar_service
 from services.email_service import email_service
-from api.appointments import send_appointment_confirmation_email, send_appointment_update_email
+from services.appointment_emails import send_appointment_confirmation_email
 
 logger = logging.getLogger(__name__)
 
@@ -1,19 +1,40 @@
 """
 Idempotency utilities for preventing duplicate operations, especially important for payment processing.
+
+Claim protocol: the first request with a key inserts its row as in_progress
+in one ``INSERT ... ON CONFLICT ... RETURNING`` statement and runs the
+operation; its response is then stored and the row marked completed. A
+repeat of a completed key gets the stored response, answered from a small
+per-worker LRU when it is recent. A repeat while the first is still running
+is refused rather than run twice. A key whose row expired, or whose
+in_progress claim is older than IDEMPOTENCY_LOCK_TIMEOUT_SECONDS (the
+process died mid-operation), is taken over by the same statement.
+
+Expired rows are deleted in batches by the maintenance scheduler
+(services.maintenance).
 """
 import hashlib
 import json
 import logging
+from dataclasses import dataclass
 from typing import Any, Dict, Optional
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, String, DateTime, Boolean, Text
+from sqlalchemy import Column, String, DateTime, Text, and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 
+from config import config
+from utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
 
 class IdempotencyKey(Base):
     """Stores idempotency keys to prevent duplicate operations"""
@@ -22,12 +43,65 @@ class IdempotencyKey(Base):
     id = Column(String(255), primary_key=True)
     operation_type = Column(String(100), nullable=False, index=True)
     request_hash = Column(String(255), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default=IN_PROGRESS, server_default=IN_PROGRESS)  # in_progress, completed
     response_data = Column(Text, nullable=True)  # JSON response data
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # When the current claim was taken
     
     def __repr__(self):
-        return f"<IdempotencyKey(id='{self.id}', operation_type='{self.operation_type}')>"
+        return f"<IdempotencyKey(id='{self.id}', operation_type='{self.operation_type}', status='{self.status}')>"
+
+
+class IdempotencyError(Exception):
+    """The idempotency store could not decide; the operation must not run"""
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """Another request with the same key is still running"""
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """The key was already used for a different request"""
+
+
+@dataclass
+class IdempotencyClaim:
+    key: str
+    request_hash: str
+    claimed: bool  # True: run the operation; False: response holds the stored result
+    response: Optional[Any] = None
+
+
+# Recently completed keys on this worker: key -> (request_hash, response, expires_at)
+completed_responses = TTLCache(config.IDEMPOTENCY_CACHE_SIZE, config.IDEMPOTENCY_CACHE_TTL_SECONDS)
+
+
+def request_fingerprint(operation_type: str, request_data: Dict[str, Any]) -> str:
+    request_str = json.dumps(request_data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{operation_type}:{request_str}".encode()).hexdigest()
+
+
+def purge_expired_keys(db: Session, batch_size: int, max_batches: Optional[int] = None) -> int:
+    """Delete expired keys oldest first, committing every batch_size rows; returns rows deleted.
+
+    Each batch is a range scan of the expires_at index. Rows locked by a
+    concurrent takeover are skipped.
+    """
+    table = IdempotencyKey.__table__
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        expired = select(table.c.id).where(
+            table.c.expires_at < datetime.now(timezone.utc)
+        ).order_by(table.c.expires_at).limit(batch_size).with_for_update(skip_locked=True)
+        deleted = db.execute(delete(table).where(table.c.id.in_(expired))).rowcount
+        db.commit()
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+    if total:
+        logger.info(f"Purged {total} expired idempotency keys")
+    return total
 
 
 class IdempotencyManager:
@@ -40,9 +114,7 @@ class IdempotencyManager:
     def generate_key(self, operation_type: str, request_data: Dict[str, Any]) -> str:
         """Generate a unique idempotency key for an operation"""
         # Create a hash of the operation type and request data
-        request_str = json.dumps(request_data, sort_keys=True)
-        hash_input = f"{operation_type}:{request_str}"
-        request_hash = hashlib.sha256(hash_input.encode()).hexdigest()
+        request_hash = request_fingerprint(operation_type, request_data)
         
         # Generate the idempotency key
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -50,6 +122,126 @@ class IdempotencyManager:
         
         return key
     
+    def claim(
+        self,
+        idempotency_key: str,
+        operation_type: str,
+        request_data: Dict[str, Any],
+        ttl: Optional[timedelta] = None
+    ) -> IdempotencyClaim:
+        """
+        Claim a key for this request, or return the stored response of the request that did.
+        
+        Raises:
+            IdempotencyInProgress: the same key is being processed right now
+            IdempotencyKeyReused: the key belongs to a different request
+            IdempotencyError: the store is unavailable
+        """
+        request_hash = request_fingerprint(operation_type, request_data)
+        
+        cached = completed_responses.get(idempotency_key)
+        if cached is not None and cached[2] > datetime.now(timezone.utc):
+            if cached[0] != request_hash:
+                raise IdempotencyKeyReused(f"Idempotency key {idempotency_key} was used for a different request")
+            return IdempotencyClaim(idempotency_key, request_hash, claimed=False, response=cached[1])
+        
+        try:
+            # A key can vanish between the insert and the lookup (purged or released); retry once
+            for _ in range(2):
+                if self._insert_claim(idempotency_key, operation_type, request_hash, ttl or self.default_ttl):
+                    self.db.commit()
+                    return IdempotencyClaim(idempotency_key, request_hash, claimed=True)
+                
+                existing = self.db.execute(
+                    select(IdempotencyKey.request_hash, IdempotencyKey.status,
+                           IdempotencyKey.response_data, IdempotencyKey.expires_at)
+                    .where(IdempotencyKey.id == idempotency_key)
+                ).first()
+                self.db.commit()
+                if existing is not None:
+                    break
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Error in idempotency check: {str(e)}")
+            raise IdempotencyError(f"Idempotency store unavailable for key {idempotency_key}") from e
+        
+        if existing is None:
+            raise IdempotencyError(f"Could not claim idempotency key {idempotency_key}")
+        if existing.request_hash != request_hash:
+            raise IdempotencyKeyReused(f"Idempotency key {idempotency_key} was used for a different request")
+        if existing.status != COMPLETED:
+            raise IdempotencyInProgress(f"Request with idempotency key {idempotency_key} is already in progress")
+        
+        response = None
+        if existing.response_data:
+            try:
+                response = json.loads(existing.response_data)
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid JSON in idempotency key {idempotency_key}")
+        completed_responses.put(idempotency_key, (request_hash, response, existing.expires_at))
+        return IdempotencyClaim(idempotency_key, request_hash, claimed=False, response=response)
+    
+    def _insert_claim(self, idempotency_key: str, operation_type: str, request_hash: str, ttl: timedelta) -> bool:
+        now = datetime.now(timezone.utc)
+        table = IdempotencyKey.__table__
+        stmt = pg_insert(table).values(
+            id=idempotency_key,
+            operation_type=operation_type,
+            request_hash=request_hash,
+            status=IN_PROGRESS,
+            response_data=None,
+            expires_at=now + ttl,
+            created_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                name: stmt.excluded[name]
+                for name in ("operation_type", "request_hash", "status", "response_data", "expires_at", "created_at")
+            },
+            # Only expired keys and abandoned claims are taken over
+            where=or_(
+                table.c.expires_at < now,
+                and_(
+                    table.c.status == IN_PROGRESS,
+                    table.c.created_at < now - timedelta(seconds=config.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+                )
+            )
+        ).returning(table.c.id)
+        return self.db.execute(stmt).first() is not None
+    
+    def complete(self, claim: IdempotencyClaim, response_data: Any) -> bool:
+        """Store the response for a claimed key and mark it completed"""
+        try:
+            result = self.db.execute(
+                update(IdempotencyKey.__table__)
+                .where(IdempotencyKey.id == claim.key, IdempotencyKey.status == IN_PROGRESS)
+                .values(status=COMPLETED, response_data=json.dumps(response_data, default=str))
+                .returning(IdempotencyKey.expires_at)
+            ).first()
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Error storing response for idempotency key {claim.key}: {str(e)}")
+            return False
+        
+        if result is None:
+            return False
+        completed_responses.put(claim.key, (claim.request_hash, response_data, result.expires_at))
+        return True
+    
+    def release(self, claim: IdempotencyClaim) -> None:
+        """Give up a claim after the operation failed, so the client can retry with the same key"""
+        try:
+            self.db.execute(
+                delete(IdempotencyKey.__table__)
+                .where(IdempotencyKey.id == claim.key, IdempotencyKey.status == IN_PROGRESS)
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Error releasing idempotency key {claim.key}: {str(e)}")
+    
     def check_and_store(
         self,
         idempotency_key: str,
@@ -59,97 +251,33 @@ class IdempotencyManager:
     ) -> Optional[Dict[str, Any]]:
         """
         Check if an idempotency key exists and return cached response if it does.
-        If not, store the key for future use.
+        If not, claim the key for this request; call store_response when done.
         
         Returns:
             Cached response data if key exists, None if this is a new request
         """
-        try:
-            # Check if key already exists
-            existing_key = self.db.query(IdempotencyKey).filter(
-                IdempotencyKey.id == idempotency_key
-            ).first()
-            
-            if existing_key:
-                # Check if key has expired
-                if existing_key.expires_at < datetime.now(timezone.utc):
-                    # Remove expired key
-                    self.db.delete(existing_key)
-                    self.db.commit()
-                else:
-                    # Return cached response
-                    if existing_key.response_data:
-                        try:
-                            return json.loads(existing_key.response_data)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Invalid JSON in idempotency key {idempotency_key}")
-                            return None
-            
-            # Store new key
-            expires_at = datetime.now(timezone.utc) + (ttl or self.default_ttl)
-            request_hash = hashlib.sha256(
-                json.dumps(request_data, sort_keys=True).encode()
-            ).hexdigest()
-            
-            new_key = IdempotencyKey(
-                id=idempotency_key,
-                operation_type=operation_type,
-                request_hash=request_hash,
-                expires_at=expires_at,
-                created_at=datetime.now(timezone.utc)
-            )
-            
-            self.db.add(new_key)
-            self.db.commit()
-            
-            return None  # New request
-            
-        except Exception as e:
-            logger.error(f"Error in idempotency check: {str(e)}")
-            # In case of error, allow the operation to proceed
-            return None
+        claim = self.claim(idempotency_key, operation_type, request_data, ttl)
+        return None if claim.claimed else claim.response
     
     def store_response(
         self,
         idempotency_key: str,
         response_data: Dict[str, Any]
     ) -> bool:
-        """Store response data for an idempotency key"""
-        try:
-            key = self.db.query(IdempotencyKey).filter(
-                IdempotencyKey.id == idempotency_key
-            ).first()
-            
-            if key:
-                key.response_data = json.dumps(response_data)
-                self.db.commit()
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error storing response for idempotency key {idempotency_key}: {str(e)}")
+        """Store response data for an idempotency key claimed with check_and_store"""
+        request_hash = self.db.execute(
+            select(IdempotencyKey.request_hash).where(IdempotencyKey.id == idempotency_key)
+        ).scalar()
+        if request_hash is None:
             return False
+        return self.complete(IdempotencyClaim(idempotency_key, request_hash, claimed=True), response_data)
     
     def cleanup_expired_keys(self) -> int:
         """Remove expired idempotency keys and return count of removed keys"""
         try:
-            expired_keys = self.db.query(IdempotencyKey).filter(
-                IdempotencyKey.expires_at < datetime.now(timezone.utc)
-            ).all()
-            
-            count = len(expired_keys)
-            for key in expired_keys:
-                self.db.delete(key)
-            
-            self.db.commit()
-            
-            if count > 0:
-                logger.info(f"Cleaned up {count} expired idempotency keys")
-            
-            return count
-            
-        except Exception as e:
+            return purge_expired_keys(self.db, config.MAINTENANCE_BATCH_SIZE)
+        except SQLAlchemyError as e:
+            self.db.rollback()
             logger.error(f"Error cleaning up expired idempotency keys: {str(e)}")
             return 0
 
@@ -166,44 +294,40 @@ def with_idempotency(
         def create_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
             # Function implementation
             pass
+    
+    Raises IdempotencyInProgress while a call with the same key is running.
     """
     def decorator(func):
         async def wrapper(self, *args, **kwargs):
             # Extract idempotency key from kwargs or generate one
             idempotency_key = kwargs.pop('idempotency_key', None)
+            request_data = {
+                'args': args,
+                'kwargs': kwargs
+            }
+            manager = IdempotencyManager(self.db)
             
             if not idempotency_key:
                 # Generate key from function arguments
-                request_data = {
-                    'args': args,
-                    'kwargs': kwargs
-                }
-                idempotency_key = IdempotencyManager(self.db).generate_key(
-                    operation_type, request_data
-                )
+                idempotency_key = manager.generate_key(operation_type, request_data)
             
             # Check idempotency
-            manager = IdempotencyManager(self.db)
-            cached_response = manager.check_and_store(
-                idempotency_key, operation_type, {'args': args, 'kwargs': kwargs}, ttl
-            )
-            
-            if cached_response:
+            claim = manager.claim(idempotency_key, operation_type, request_data, ttl)
+            if not claim.claimed:
                 logger.info(f"Returning cached response for idempotency key {idempotency_key}")
-                return cached_response
+                return claim.response
             
             # Execute function
             try:
                 result = await func(self, *args, **kwargs)
-                
-                # Store response
-                manager.store_response(idempotency_key, result)
-                
-                return result
-                
             except Exception as e:
+                manager.release(claim)
                 logger.error(f"Error in idempotent function {func.__name__}: {str(e)}")
                 raise
+            
+            # Store response
+            manager.complete(claim, result)
+            return result
         
         return wrapper
     return decorator
@@ -0,0 +1,109 @@
+"""
+Deferred imports for heavy SDKs.
+
+lazy_module("stripe") returns a stand-in module that imports the real one on
+first attribute access, so importing a service does not pay for its SDK until
+a request actually uses it. when_imported("aiohttp", callback) runs a callback
+once a module is imported by anyone (immediately if it already is), which lets
+instrumentation patch a library without importing it at startup.
+"""
+import importlib
+import importlib.abc
+import sys
+import threading
+import types
+from typing import Callable, Dict, List, Optional
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_on_load"] = on_load
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    on_load = self.__dict__["_lazy_on_load"]
+                    if on_load is not None:
+                        on_load(module)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None) -> LazyModule:
+    """Defer ``import name`` until first use; ``on_load`` configures the module once"""
+    return LazyModule(name, on_load)
+
+
+_post_import_hooks: Dict[str, List[Callable[[types.ModuleType], None]]] = {}
+
+
+class _PostImportFinder(importlib.abc.MetaPathFinder):
+    """Wraps the loader of watched modules so their hooks run right after import"""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in _post_import_hooks:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+
+        loader = spec.loader
+        exec_module = loader.exec_module
+
+        def exec_and_notify(module):
+            try:
+                exec_module(module)
+            finally:
+                del loader.exec_module
+            _run_hooks(fullname, module)
+
+        loader.exec_module = exec_and_notify
+        return spec
+
+
+_finder = _PostImportFinder()
+
+
+def _run_hooks(name: str, module: types.ModuleType) -> None:
+    with _lock:
+        hooks = _post_import_hooks.pop(name, [])
+    for hook in hooks:
+        hook(module)
+
+
+def when_imported(name: str, callback: Callable[[types.ModuleType], None]) -> None:
+    """Call ``callback(module)`` once ``name`` is imported (now, if it already is)"""
+    with _lock:
+        module = sys.modules.get(name)
+        if module is None:
+            _post_import_hooks.setdefault(name, []).append(callback)
+            if _finder not in sys.meta_path:
+                sys.meta_path.insert(0, _finder)
+            return
+    callback(module)
@@ -0,0 +1,38 @@
+"""
+Phone number normalization.
+
+users.phone is free text ("(555) 123-4567", "555.123.4567", "+1 555 123 4567").
+PostgreSQL keeps users.phone_e164 as a STORED generated column using
+PHONE_E164_EXPRESSION (models/user_models.py). normalize_phone is the same rule
+in Python and is used to build lookup keys, so the two must stay in step:
+
+- a leading "+" with 8-15 digits is taken as already international
+- 10 digits are a North American number and get +1
+- 11 digits starting with 1 are a North American number with its country code
+- anything else (extensions, partial numbers) has no E.164 form
+"""
+import re
+from typing import Optional
+
+DEFAULT_COUNTRY_CODE = "1"
+MIN_SUFFIX_DIGITS = 4
+
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def phone_digits(raw: Optional[str]) -> str:
+    return _NON_DIGITS.sub("", raw or "")
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """E.164 form of a phone number, or None when it can't be determined"""
+    if not raw:
+        return None
+    digits = phone_digits(raw)
+    if raw.strip(" ").startswith("+") and 8 <= len(digits) <= 15:
+        return "+" + digits
+    if len(digits) == 10:
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    if len(digits) == 11 and digits.startswith(DEFAULT_COUNTRY_CODE):
+        return "+" + digits
+    return None
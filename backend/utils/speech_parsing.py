@@ -0,0 +1,302 @@
+"""
+Compiled intent, date and time extraction for voice transcripts.
+
+Everything here is built once at import:
+
+- KeywordIntentMatcher folds every intent keyword into one trie-shaped regex.
+  Shared prefixes are factored out, so a transcript is scanned once in C and
+  the longest phrase wins at each position ("change requests" rather than
+  "change"). Keywords match whole words only.
+- Dates and times are parsed by ordered tables of precompiled patterns. The
+  first rule that matches wins, most explicit forms first. Each rule is
+  gated on a word or character its pattern cannot match without, so rules
+  that cannot apply are skipped with a set or ``in`` check instead of a
+  regex scan.
+
+Relative dates resolve against ``now`` (defaults to the current local time).
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8, "sep": 9, "sept": 9,
+    "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+MINUTE_WORDS = {"o'clock": 0, "fifteen": 15, "thirty": 30, "forty five": 45, "forty-five": 45}
+DAY_PERIODS = {"morning": "09:00", "afternoon": "14:00", "evening": "18:00", "noon": "12:00", "midday": "12:00", "midnight": "00:00"}
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex alternation over phrases with shared prefixes factored out, longest match first"""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = []
+        for char, child in sorted(node.items()):
+            if char == "":
+                continue
+            if char == " ":
+                token = r"\s+"
+            elif char == "'":
+                token = "['’]"
+            else:
+                token = re.escape(char)
+            branches.append(token + build(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+class KeywordIntentMatcher:
+    """Resolves a transcript to the intent with the most keyword hits.
+
+    Ties go to the intent listed first in ``priority``. A keyword listed under
+    several intents counts for each of them.
+    """
+
+    def __init__(self, keywords: Dict[str, Sequence[str]], priority: Sequence[str], default: str):
+        self.priority = list(priority)
+        self.default = default
+        rank = {intent: index for index, intent in enumerate(self.priority)}
+        intents_by_keyword: Dict[str, List[int]] = {}
+        for intent, phrases in keywords.items():
+            for phrase in phrases:
+                intents_by_keyword.setdefault(self._key(phrase), []).append(rank[intent])
+        self._intents_by_keyword = {key: tuple(ranks) for key, ranks in intents_by_keyword.items()}
+        self._pattern = re.compile(r"(?<![\w'’])(?:" + _trie_pattern(self._intents_by_keyword) + r")(?![\w'’])")
+
+    @staticmethod
+    def _key(phrase: str) -> str:
+        return " ".join(phrase.lower().replace("’", "'").split())
+
+    def match(self, text: str) -> str:
+        hits = self._pattern.findall(text.lower())
+        if not hits:
+            return self.default
+
+        scores: Dict[int, int] = {}
+        for hit in hits:
+            ranks = self._intents_by_keyword.get(hit) or self._intents_by_keyword[self._key(hit)]
+            for rank in ranks:
+                scores[rank] = scores.get(rank, 0) + 1
+        best = min(scores, key=lambda rank: (-scores[rank], rank))
+        return self.priority[best]
+
+
+# ---------- dates ----------
+
+# Rule gates: a substring the pattern needs, a frozenset of words of which it
+# needs at least one, or DIGIT
+DIGIT = object()
+_DIGIT_PATTERN = re.compile(r"\d")
+_WORD_BREAKS = ",.?!'"
+
+_DateRule = Tuple[object, "re.Pattern[str]", Callable[["re.Match[str]", datetime], Optional[date]]]
+
+_MONTH_NAME = r"(?P<month>" + _alternation(MONTHS) + r")\.?"
+_DAY_NUMBER = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_COUNT = r"(?P<count>\d{1,3}|" + _alternation(NUMBER_WORDS) + r")"
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(month: int, day: int, year: Optional[str], now: datetime) -> Optional[date]:
+    """A month/day without a year means its next occurrence"""
+    if year:
+        year_value = int(year)
+        return _safe_date(year_value + 2000 if year_value < 100 else year_value, month, day)
+    candidate = _safe_date(now.year, month, day)
+    if candidate and candidate < now.date():
+        candidate = _safe_date(now.year + 1, month, day)
+    return candidate
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _count(value: str) -> int:
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+
+def _offset(match: "re.Match[str]", now: datetime) -> Optional[date]:
+    count, unit = _count(match["count"]), match["unit"]
+    if unit == "day":
+        return now.date() + timedelta(days=count)
+    if unit == "week":
+        return now.date() + timedelta(weeks=count)
+    return _add_months(now.date(), count)
+
+
+def _relative_day(match: "re.Match[str]", now: datetime) -> date:
+    word = " ".join(match["word"].split())
+    days = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2, "next week": 7}[word]
+    return now.date() + timedelta(days=days)
+
+
+def _weekday(match: "re.Match[str]", now: datetime) -> date:
+    days_ahead = (WEEKDAYS.index(match["weekday"]) - now.weekday()) % 7
+    if days_ahead == 0 and match["modifier"] != "this":
+        days_ahead = 7  # "Tuesday" said on a Tuesday means next week's
+    return now.date() + timedelta(days=days_ahead)
+
+
+DATE_RULES: List[_DateRule] = [
+    # 2025-09-30
+    ("-", re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b"),
+     lambda m, now: _safe_date(int(m["year"]), int(m["month"]), int(m["day"]))),
+    # 9/30, 9-30-2025, 9/30/25
+    (DIGIT, re.compile(r"\b(?P<month>\d{1,2})[/-](?P<day>\d{1,2})(?:[/-](?P<year>\d{4}|\d{2}))?\b"),
+     lambda m, now: _upcoming(int(m["month"]), int(m["day"]), m["year"], now)),
+    # September 30th, Sept. 30 2025
+    (frozenset(MONTHS), re.compile(r"\b" + _MONTH_NAME + r"\s+" + _DAY_NUMBER + r"(?:,?\s+(?P<year>\d{4}))?\b"),
+     lambda m, now: _upcoming(MONTHS[m["month"]], int(m["day"]), m["year"], now)),
+    # the 30th of September
+    (frozenset({"of"}), re.compile(r"\b" + _DAY_NUMBER + r"\s+of\s+" + _MONTH_NAME + r"(?:,?\s+(?P<year>\d{4}))?\b"),
+     lambda m, now: _upcoming(MONTHS[m["month"]], int(m["day"]), m["year"], now)),
+    # in two weeks, in 3 days, in a month
+    (frozenset({"in"}), re.compile(r"\bin\s+" + _COUNT + r"\s+(?P<unit>day|week|month)s?\b"), _offset),
+    # day after tomorrow, tomorrow, today, tonight, next week
+    (frozenset({"today", "tomorrow", "tonight", "week"}), re.compile(r"\b(?P<word>day\s+after\s+tomorrow|tomorrow|today|tonight|next\s+week)\b"), _relative_day),
+    # next Tuesday, this Friday, Monday
+    (frozenset(WEEKDAYS), re.compile(r"\b(?:(?P<modifier>next|this|coming)\s+)?(?P<weekday>" + "|".join(WEEKDAYS) + r")\b"), _weekday),
+]
+
+
+def _open_rules(rules: list, text: str):
+    """Rules whose gate passes for text, in order"""
+    spaced = text
+    for char in _WORD_BREAKS:
+        if char in spaced:
+            spaced = spaced.replace(char, " ")
+    words = frozenset(spaced.split())
+    has_digit = None
+    for rule in rules:
+        gate = rule[0]
+        if gate is DIGIT:
+            if has_digit is None:
+                has_digit = _DIGIT_PATTERN.search(text) is not None
+            if not has_digit:
+                continue
+        elif isinstance(gate, str):
+            if gate not in text:
+                continue
+        elif gate.isdisjoint(words):
+            continue
+        yield rule
+
+
+def extract_date(text: str, now: Optional[datetime] = None) -> Optional[str]:
+    """First date mentioned in a transcript, as YYYY-MM-DD"""
+    if not text:
+        return None
+    lowered = text.lower()
+    now = now or datetime.now()
+    for _, pattern, resolve in _open_rules(DATE_RULES, lowered):
+        match = pattern.search(lowered)
+        if match:
+            resolved = resolve(match, now)
+            if resolved:
+                return resolved.isoformat()
+    return None
+
+
+# ---------- times ----------
+
+_MERIDIEM = r"(?P<meridiem>a\.?\s?m\.?|p\.?\s?m\.?|in\s+the\s+(?:morning|afternoon|evening)|at\s+night|tonight)"
+_HOUR_WORDS = tuple(word for word in NUMBER_WORDS if word not in ("a", "an"))
+_HOUR_WORD = r"(?P<hour_word>" + _alternation(_HOUR_WORDS) + r")"
+_MINUTE_WORD = r"(?P<minute_word>" + "|".join(re.escape(word).replace(r"\ ", r"\s+") for word in MINUTE_WORDS) + r")"
+
+
+def _clock(hour: int, minute: int, meridiem: Optional[str]) -> Optional[str]:
+    if meridiem:
+        afternoon = meridiem[0] == "p" or any(word in meridiem for word in ("afternoon", "evening", "night"))
+        if not 1 <= hour <= 12:
+            return None
+        if afternoon and hour != 12:
+            hour += 12
+        elif not afternoon and hour == 12:
+            hour = 0
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+TIME_RULES: List[Tuple[object, "re.Pattern[str]", Callable[["re.Match[str]"], Optional[str]]]] = [
+    # 3pm, 3:30 p.m., 3 in the afternoon
+    (DIGIT, re.compile(r"\b(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*" + _MERIDIEM + r"(?![a-z])"),
+     lambda m: _clock(int(m["hour"]), int(m["minute"] or 0), m["meridiem"])),
+    # 15:30
+    (":", re.compile(r"\b(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)\b"),
+     lambda m: _clock(int(m["hour"]), int(m["minute"]), None)),
+    # three thirty pm, four o'clock, ten in the morning
+    (frozenset(_HOUR_WORDS), re.compile(r"\b" + _HOUR_WORD + r"(?:\s+" + _MINUTE_WORD + r")?\s*" + _MERIDIEM + r"(?![a-z])"),
+     lambda m: _clock(NUMBER_WORDS[m["hour_word"]], MINUTE_WORDS.get(" ".join((m["minute_word"] or "o'clock").split()), 0), m["meridiem"])),
+    ("o'clock", re.compile(r"\b(?:" + _HOUR_WORD + r"|(?P<hour>\d{1,2}))\s+o'clock\b"),
+     lambda m: _clock(int(m["hour"]) if m["hour"] else NUMBER_WORDS[m["hour_word"]], 0, None)),
+    # noon, morning, evening
+    (frozenset(DAY_PERIODS), re.compile(r"\b(?P<period>" + _alternation(DAY_PERIODS) + r")\b"),
+     lambda m: DAY_PERIODS[m["period"]]),
+]
+
+# Whole-value formats accepted from API clients: "2:30 PM", "14:30", "14"
+_TIME_VALUE_MERIDIEM = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)")
+_TIME_VALUE_24H = re.compile(r"(\d{1,2})(?::(\d{2}))?")
+
+
+def extract_time(text: str) -> Optional[str]:
+    """First time of day mentioned in a transcript, as HH:MM"""
+    if not text:
+        return None
+    lowered = text.lower().replace("’", "'")
+    for _, pattern, resolve in _open_rules(TIME_RULES, lowered):
+        match = pattern.search(lowered)
+        if match:
+            resolved = resolve(match)
+            if resolved:
+                return resolved
+    return None
+
+
+def parse_time_value(value: Optional[str]) -> Optional[str]:
+    """A time field value ("2:30 pm", "14:30", "14") as HH:MM:SS"""
+    if not value:
+        return None
+    text = value.strip().lower()
+    match = _TIME_VALUE_MERIDIEM.fullmatch(text)
+    if match:
+        clock = _clock(int(match.group(1)), int(match.group(2) or 0), match.group(3))
+        return f"{clock}:00" if clock else None
+    match = _TIME_VALUE_24H.fullmatch(text)
+    if match:
+        clock = _clock(int(match.group(1)), int(match.group(2) or 0), None)
+        return f"{clock}:00" if clock else None
+    return None
@@ -0,0 +1,25 @@
+"""
+Prompt token estimates for chat completions.
+
+Roughly four characters per token for English text with the GPT tokenizers,
+plus a fixed overhead per message for the role and separators. Close enough
+to budget prompt size; not meant to match billing exactly.
+"""
+from typing import Dict, Iterable, Optional
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: Dict[str, str]) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content"))
+
+
+def estimate_prompt_tokens(messages: Iterable[Dict[str, str]]) -> int:
+    return sum(estimate_message_tokens(message) for message in messages)
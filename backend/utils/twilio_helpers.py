@@ -5,7 +5,11 @@ Provides utilities for processing speech input and generating TML responses
 
 from typing import Dict, Any, Optional, List
 import re
-from datetime import datetime, timedelta
+
+from utils.speech_parsing import KeywordIntentMatcher, extract_date, extract_time
+
+EMAIL_PATTERN = re.compile(r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})")
+PHONE_PATTERN = re.compile(r"(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})")
 
 class TwilioVoiceHelper:
     """Helper class for Twilio voice integration with the Voice Agent API"""
@@ -36,107 +40,49 @@ class TwilioVoiceHelper:
             "can you", "add", "remove", "fix"
         ],
         "list_change_requests": [
-            "change requests", "my requests", "pending", "status", "what requests"
+            # No "status": "what is the status of my project" is a jobs lookup
+            "change requests", "my requests", "pending", "what requests"
         ],
         "available_slots": [
             "available", "free", "open", "when can", "what times", "slots"
         ]
     }
     
+    # Tie-break order when two intents have the same number of keyword hits:
+    # the more specific request first ("cancel my meeting" is a cancellation)
+    INTENT_PRIORITY = [
+        "delete_appointment",
+        "reschedule_appointment",
+        "list_change_requests",
+        "get_customer_appointments",
+        "available_slots",
+        "schedule_appointment",
+        "create_change_request",
+        "jobs_lookup",
+    ]
+    
     @staticmethod
     def extract_intent(speech_text: str) -> str:
-        """Extract intent from speech text"""
-        text_lower = speech_text.lower()
-        
-        # Check for each intent's keywords
-        for intent, keywords in TwilioVoiceHelper.INTENT_KEYWORDS.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return intent
-        
-        # Default to customer lookup if no specific intent found
-        return "find_or_create_customer"
+        """Extract intent from speech text (most keyword hits, then INTENT_PRIORITY)"""
+        # Defaults to customer lookup if no specific intent found
+        return _intent_matcher.match(speech_text)
     
     @staticmethod
     def extract_date(speech_text: str) -> Optional[str]:
-        """Extract date from speech text"""
-        text_lower = speech_text.lower()
-        
-        # Common date patterns
-        if "today" in text_lower:
-            return datetime.now().strftime("%Y-%m-%d")
-        if "tomorrow" in text_lower:
-            return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        # Day of week patterns
-        days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
-        for i, day in enumerate(days):
-            if day in text_lower:
-                # Find next occurrence of this day
-                today = datetime.now()
-                days_ahead = (i - today.weekday()) % 7
-                if days_ahead == 0:  # Today is the day
-                    days_ahead = 7  # Get next week's
-                target_date = today + timedelta(days=days_ahead)
-                return target_date.strftime("%Y-%m-%d")
-        
-        # MM/DD or MM/DD/YYYY patterns
-        date_match = re.search(r"(\d{1,2})[\/\-](\d{1,2})(?:[\/\-](\d{4}))?", speech_text)
-        if date_match:
-            month, day, year = date_match.groups()
-            year = year or str(datetime.now().year)
-            try:
-                return f"{year}-{int(month):02d}-{int(day):02d}"
-            except ValueError:
-                pass
-        
-        return None
+        """Extract date from speech text ("tomorrow", "next Tuesday", "in two weeks", "9/30", "September 30th")"""
+        return extract_date(speech_text)
     
     @staticmethod
     def extract_time(speech_text: str) -> Optional[str]:
-        """Extract time from speech text"""
-        text_lower = speech_text.lower()
-        
-        # Time patterns with AM/PM
-        time_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)", text_lower)
-        if time_match:
-            hour, minute, period = time_match.groups()
-            hour = int(hour)
-            minute = int(minute or 0)
-            
-            if period == "pm" and hour != 12:
-                hour += 12
-            elif period == "am" and hour == 12:
-                hour = 0
-                
-            return f"{hour:02d}:{minute:02d}"
-        
-        # 24-hour format
-        time_match = re.search(r"(\d{1,2}):(\d{2})", speech_text)
-        if time_match:
-            hour, minute = time_match.groups()
-            return f"{int(hour):02d}:{int(minute):02d}"
-        
-        # Common time expressions
-        time_expressions = {
-            "morning": "09:00",
-            "afternoon": "14:00", 
-            "evening": "18:00",
-            "noon": "12:00",
-            "midnight": "00:00"
-        }
-        
-        for expr, time_val in time_expressions.items():
-            if expr in text_lower:
-                return time_val
-        
-        return None
+        """Extract time from speech text ("3pm", "3:30 p.m.", "15:30", "ten in the morning", "noon")"""
+        return extract_time(speech_text)
     
     @staticmethod
     def extract_customer_info(speech_text: str) -> Dict[str, Optional[str]]:
         """Extract customer information from speech"""
         # Simple extraction - could be enhanced with NLP
-        email_match = re.search(r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})", speech_text)
-        phone_match = re.search(r"(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})", speech_text)
+        email_match = EMAIL_PATTERN.search(speech_text)
+        phone_match = PHONE_PATTERN.search(speech_text)
         
         return {
             "email": email_match.group(1) if email_match else None,
@@ -180,6 +126,13 @@ class TwilioVoiceHelper:
         
         return request
 
+# Compiled once from the keyword table
+_intent_matcher = KeywordIntentMatcher(
+    TwilioVoiceHelper.INTENT_KEYWORDS,
+    TwilioVoiceHelper.INTENT_PRIORITY,
+    default="find_or_create_customer"
+)
+
 def generate_twiml_response(api_response: Dict[str, Any], 
                           continue_conversation: bool = True) -> str:
     """Generate TwiML response from Voice Agent API response"""